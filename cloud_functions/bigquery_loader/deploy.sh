@@ -30,6 +30,8 @@ gcloud functions deploy $FUNCTION_NAME \
   --set-env-vars GCP_PROJECT_ID=$PROJECT_ID,BIGQUERY_DATASET_ID=vendor_risk \
   --timeout 300s \
   --memory 256MB \
+  --cpu 1 \
+  --concurrency 80 \
   --max-instances 10 \
   --allow-unauthenticated
 
@@ -7,12 +7,17 @@ Trigger: Pub/Sub topic 'simulation-results'
 """
 
 import json
+import hashlib
 import logging
 import os
 import base64
 import sys
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from google.cloud import bigquery
 from google.cloud import pubsub_v1
 
@@ -26,71 +31,261 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Micro-batching: concurrent invocations on one instance share a streaming insert.
+# A batch is written when it reaches BATCH_MAX_ROWS / BATCH_MAX_BYTES, or
+# BATCH_MAX_AGE_SECONDS after its first row arrived.
+BATCH_MAX_ROWS = int(os.getenv('BQ_BATCH_MAX_ROWS', '500'))
+BATCH_MAX_BYTES = int(os.getenv('BQ_BATCH_MAX_BYTES', str(5 * 1024 * 1024)))
+BATCH_MAX_AGE_SECONDS = float(os.getenv('BQ_BATCH_MAX_AGE_SECONDS', '1.0'))
+
+# BigQuery client reused across invocations on a warm instance
+_client: Optional[bigquery.Client] = None
+_client_project: Optional[str] = None
+_client_lock = threading.Lock()
+
+# table_id -> RowBatcher
+_batchers: Dict[str, 'RowBatcher'] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_client(project_id: str) -> bigquery.Client:
+    """
+    Get the module-level BigQuery client, creating it on first use
+    
+    Args:
+        project_id: GCP project ID
+    
+    Returns:
+        Shared BigQuery client
+    """
+    global _client, _client_project
+    
+    with _client_lock:
+        if _client is None or _client_project != project_id:
+            _client = bigquery.Client(project=project_id)
+            _client_project = project_id
+        return _client
+
+
+def write_rows(client: bigquery.Client, table_id: str, rows: List[Dict[str, Any]], row_ids: List[str]) -> None:
+    """
+    Write rows with streaming inserts of at most BATCH_MAX_ROWS rows each
+    
+    Args:
+        client: BigQuery client
+        table_id: Fully-qualified table ID
+        rows: Rows to write
+        row_ids: Deterministic insertIds (BigQuery drops retried duplicates)
+    """
+    for start in range(0, len(rows), BATCH_MAX_ROWS):
+        errors = client.insert_rows_json(
+            table_id,
+            rows[start:start + BATCH_MAX_ROWS],
+            row_ids=row_ids[start:start + BATCH_MAX_ROWS]
+        )
+        if errors:
+            raise Exception(f"BigQuery insert errors: {errors}")
+    logger.info(f"✅ Streamed {len(rows)} rows into {table_id}")
+
+
+class RowBatcher:
+    """
+    Group-commit buffer for one table
+    
+    submit() returns only once the row's batch has been written (or raises if
+    the write failed), so a Pub/Sub message is never acknowledged before its
+    row is in BigQuery. The first row of a batch waits up to max_age_seconds
+    for other invocations to join, then writes the whole batch at once.
+    """
+    
+    def __init__(self, client: bigquery.Client, table_id: str,
+                 max_rows: int = BATCH_MAX_ROWS,
+                 max_bytes: int = BATCH_MAX_BYTES,
+                 max_age_seconds: float = BATCH_MAX_AGE_SECONDS):
+        """
+        Initialize batcher
+        
+        Args:
+            client: BigQuery client
+            table_id: Fully-qualified table ID
+            max_rows: Write once this many rows are pending
+            max_bytes: Write once the pending rows reach this JSON size
+            max_age_seconds: Longest a row waits for a batch to fill
+        """
+        self.client = client
+        self.table_id = table_id
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._pending: List[Tuple[Dict[str, Any], str, Future]] = []
+        self._pending_bytes = 0
+        self._cond = threading.Condition()
+    
+    def submit(self, row: Dict[str, Any], row_id: str) -> None:
+        """
+        Add a row and block until it has been written
+        
+        Args:
+            row: Row to insert
+            row_id: Deterministic insertId
+        """
+        future = Future()
+        with self._cond:
+            self._pending.append((row, row_id, future))
+            self._pending_bytes += len(json.dumps(row))
+            
+            if self._is_full():
+                batch = self._take()
+                self._cond.notify_all()
+            elif len(self._pending) == 1:
+                # First row of a new batch: wait for company, then write
+                deadline = time.monotonic() + self.max_age_seconds
+                while self._leads(future) and not self._is_full():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take() if self._leads(future) else None
+            else:
+                batch = None
+        
+        if batch:
+            self._write(batch)
+        future.result()
+    
+    def _leads(self, future: Future) -> bool:
+        """Check whether future's row still heads the pending batch"""
+        return bool(self._pending) and self._pending[0][2] is future
+    
+    def _is_full(self) -> bool:
+        """Check whether the pending batch reached its row or byte limit"""
+        return len(self._pending) >= self.max_rows or self._pending_bytes >= self.max_bytes
+    
+    def _take(self) -> List[Tuple[Dict[str, Any], str, Future]]:
+        """Detach the pending batch (caller holds the lock)"""
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        return batch
+    
+    def _write(self, batch: List[Tuple[Dict[str, Any], str, Future]]) -> None:
+        """Write a detached batch and resolve its waiters"""
+        try:
+            write_rows(self.client, self.table_id, [row for row, _, _ in batch], [row_id for _, row_id, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+        else:
+            for _, _, future in batch:
+                future.set_result(None)
+
+
+def get_batcher(project_id: str, table_id: str) -> RowBatcher:
+    """Get the shared RowBatcher for a table"""
+    with _batchers_lock:
+        batcher = _batchers.get(table_id)
+        if batcher is None:
+            batcher = _batchers[table_id] = RowBatcher(get_client(project_id), table_id)
+        return batcher
+
+
+def simulation_row(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a simulation result into a simulations table row
+    
+    Args:
+        result: Simulation result dictionary
+    
+    Returns:
+        Row dictionary
+    """
+    # Extract data
+    simulation_id = result.get('simulation_id', f"sim_{result.get('vendor', 'unknown').lower()}")
+    vendor_name = result.get('vendor', 'Unknown')
+    duration_hours = result.get('duration_hours', 0)
+    
+    operational = result.get('operational_impact', {})
+    financial = result.get('financial_impact', {})
+    compliance = result.get('compliance_impact', {})
+    
+    # Parse timestamp
+    timestamp_str = result.get('timestamp', '')
+    if isinstance(timestamp_str, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00')).isoformat()
+        except:
+            timestamp = datetime.now(timezone.utc).isoformat()
+    else:
+        timestamp = datetime.now(timezone.utc).isoformat()
+    
+    return {
+        'simulation_id': simulation_id,
+        'vendor_name': vendor_name,
+        'duration_hours': duration_hours,
+        'operational_impact': operational.get('impact_score', 0.0),
+        'financial_impact': financial.get('impact_score', 0.0),
+        'compliance_impact': compliance.get('impact_score', 0.0),
+        'overall_score': result.get('overall_impact_score', 0.0),
+        'services_affected': operational.get('service_count', 0),
+        'customers_affected': operational.get('customers_affected', 0),
+        'revenue_loss': financial.get('revenue_loss', 0.0),
+        'total_cost': financial.get('total_cost', 0.0),
+        'timestamp': timestamp,
+        'created_at': timestamp,  # Use same timestamp for created_at
+    }
+
+
+def row_insert_id(row: Dict[str, Any]) -> str:
+    """
+    Deterministic insertId for a row
+    
+    Derived from the row content, so a redelivered Pub/Sub message maps to the
+    same insertId and BigQuery drops the duplicate.
+    """
+    return hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
 
 def load_simulation_to_bigquery(result: Dict[str, Any], project_id: str, dataset_id: str = 'vendor_risk') -> None:
     """
     Load simulation result into BigQuery
     
+    The row joins the instance's current micro-batch; this returns once that
+    batch has been written.
+    
     Args:
         result: Simulation result dictionary
         project_id: GCP project ID
         dataset_id: BigQuery dataset ID
     """
     try:
-        client = bigquery.Client(project=project_id)
         table_id = f"{project_id}.{dataset_id}.simulations"
+        row = simulation_row(result)
+        get_batcher(project_id, table_id).submit(row, row_insert_id(row))
         
-        # Extract data
-        simulation_id = result.get('simulation_id', f"sim_{result.get('vendor', 'unknown').lower()}")
-        vendor_name = result.get('vendor', 'Unknown')
-        duration_hours = result.get('duration_hours', 0)
-        
-        operational = result.get('operational_impact', {})
-        financial = result.get('financial_impact', {})
-        compliance = result.get('compliance_impact', {})
-        
-        # Parse timestamp
-        timestamp_str = result.get('timestamp', '')
-        if isinstance(timestamp_str, str):
-            from datetime import datetime
-            try:
-                timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00')).isoformat()
-            except:
-                from datetime import datetime, timezone
-                timestamp = datetime.now(timezone.utc).isoformat()
-        else:
-            from datetime import datetime, timezone
-            timestamp = datetime.now(timezone.utc).isoformat()
-        
-        row = {
-            'simulation_id': simulation_id,
-            'vendor_name': vendor_name,
-            'duration_hours': duration_hours,
-            'operational_impact': operational.get('impact_score', 0.0),
-            'financial_impact': financial.get('impact_score', 0.0),
-            'compliance_impact': compliance.get('impact_score', 0.0),
-            'overall_score': result.get('overall_impact_score', 0.0),
-            'services_affected': operational.get('service_count', 0),
-            'customers_affected': operational.get('customers_affected', 0),
-            'revenue_loss': financial.get('revenue_loss', 0.0),
-            'total_cost': financial.get('total_cost', 0.0),
-            'timestamp': timestamp,
-            'created_at': timestamp,  # Use same timestamp for created_at
-        }
-        
-        # Insert row
-        errors = client.insert_rows_json(table_id, [row])
-        
-        if errors:
-            raise Exception(f"BigQuery insert errors: {errors}")
-        
-        logger.info(f"✅ Loaded simulation result into BigQuery: {simulation_id}")
+        logger.info(f"✅ Loaded simulation result into BigQuery: {row['simulation_id']}")
         
     except Exception as e:
         logger.error(f"Failed to load into BigQuery: {e}", exc_info=True)
         raise
 
 
+def load_simulations_to_bigquery(results: List[Dict[str, Any]], project_id: str, dataset_id: str = 'vendor_risk') -> int:
+    """
+    Load a batch of simulation results into BigQuery in one write
+    
+    Args:
+        results: Simulation result dictionaries
+        project_id: GCP project ID
+        dataset_id: BigQuery dataset ID
+    
+    Returns:
+        Number of rows written
+    """
+    table_id = f"{project_id}.{dataset_id}.simulations"
+    rows = [simulation_row(result) for result in results]
+    if rows:
+        write_rows(get_client(project_id), table_id, rows, [row_insert_id(row) for row in rows])
+    return len(rows)
+
+
 def load_simulation_result(event: Dict[str, Any], context) -> None:
     """
     Cloud Function entry point for Pub/Sub trigger
@@ -113,6 +308,12 @@ def load_simulation_result(event: Dict[str, Any], context) -> None:
         if not project_id:
             raise ValueError("project_id not found in event or environment")
         
+        # Batched messages carry a list of results and are written in one go
+        if isinstance(event_data.get('results'), list):
+            count = load_simulations_to_bigquery(event_data['results'], project_id, dataset_id)
+            logger.info(f"✅ Loaded {count} simulation results into BigQuery")
+            return
+        
         # Get full result from event
         result = event_data.get('full_result', event_data)
         
@@ -34,6 +34,12 @@ fi
 echo "☁️  Deploying Cloud Function..."
 cd "$(dirname "$0")"
 
+# Stage the shared vendor matcher and signature file into the function source
+cp ../../scripts/gcp/vendor_matcher.py .
+cp ../../config/vendor_patterns.json .
+cp ../../scripts/gcp/discovery_format.py .
+cp ../../scripts/gcp/discovery_manifest.py .
+
 gcloud functions deploy ${FUNCTION_NAME} \
   --gen2 \
   --runtime python311 \
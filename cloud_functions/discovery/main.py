@@ -8,15 +8,31 @@ Supports:
 - Pub/Sub triggers (scheduled scans)
 """
 
+import hashlib
 import json
 import logging
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, List, Optional
 from google.cloud import storage
 from google.cloud import functions_v1, run_v2
 from google.cloud import pubsub_v1
 
+try:
+    # Staged next to main.py by deploy.sh / cloudbuild.yaml
+    from vendor_matcher import VendorPatternMatcher, load_vendor_patterns
+    from discovery_format import write_discovery_ndjson, NDJSON_SUFFIX, JSON_SUFFIX, NDJSON_CONTENT_TYPE
+    from discovery_manifest import record_discovery
+except ImportError:
+    # Running from the repository checkout
+    sys.path.append(str(Path(__file__).parent.parent.parent))
+    from scripts.gcp.vendor_matcher import VendorPatternMatcher, load_vendor_patterns
+    from scripts.gcp.discovery_format import write_discovery_ndjson, NDJSON_SUFFIX, JSON_SUFFIX, NDJSON_CONTENT_TYPE
+    from scripts.gcp.discovery_manifest import record_discovery
+
 # Configure logging for Cloud Functions
 logging.basicConfig(
     level=logging.INFO,
@@ -25,17 +41,29 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# Vendor detection patterns
-VENDOR_PATTERNS = {
-    'Stripe': ['STRIPE_', 'stripe'],
-    'Auth0': ['AUTH0_', 'auth0'],
-    'SendGrid': ['SENDGRID_', 'sendgrid'],
-    'Twilio': ['TWILIO_', 'twilio'],
-    'Datadog': ['DATADOG_', 'DD_'],
-    'MongoDB': ['MONGO', 'mongodb'],
-    'PayPal': ['PAYPAL_', 'paypal'],
-    'Okta': ['OKTA_', 'okta']
-}
+# Vendor detection patterns (signature file staged at deploy time, built-in defaults otherwise)
+VENDOR_PATTERNS = load_vendor_patterns(
+    os.getenv('VENDOR_PATTERNS_FILE', str(Path(__file__).parent / 'vendor_patterns.json'))
+)
+VENDOR_MATCHER = VendorPatternMatcher(VENDOR_PATTERNS)
+# Cached vendor hits are only valid for the signature set that produced them
+PATTERNS_FINGERPRINT = hashlib.sha1(json.dumps(VENDOR_PATTERNS, sort_keys=True).encode('utf-8')).hexdigest()
+
+# Concurrency and timeouts for resource listing
+MAX_WORKERS = int(os.getenv('DISCOVERY_MAX_WORKERS', '8'))
+CALL_TIMEOUT = float(os.getenv('DISCOVERY_CALL_TIMEOUT', '60'))
+TOTAL_TIMEOUT = float(os.getenv('DISCOVERY_TOTAL_TIMEOUT', '480'))
+
+# Reuse vendor hits of resources whose revision is unchanged since the last scan
+INCREMENTAL_DISCOVERY = os.getenv('DISCOVERY_INCREMENTAL', 'true').lower() == 'true'
+
+# Result format: 'ndjson' (gzip-compressed NDJSON, streamable) or 'json' (pretty-printed)
+RESULT_FORMAT = os.getenv('DISCOVERY_FORMAT', 'ndjson').lower()
+
+
+def _split_env_list(value: Optional[str]) -> List[str]:
+    """Parse a comma-separated environment variable into a list"""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
 
 
 def discover_vendors(request):
@@ -64,8 +92,15 @@ def discover_vendors(request):
         
         logger.info(f"Starting vendor discovery for project: {project_id}")
         
+        # Optional fan-out across extra projects / specific regions
+        project_ids = None
+        regions = None
+        if hasattr(request, 'args'):
+            project_ids = _split_env_list(request.args.get('project_ids')) or None
+            regions = _split_env_list(request.args.get('regions')) or None
+        
         # Run discovery
-        results = run_discovery(project_id)
+        results = run_discovery(project_id, project_ids=project_ids, regions=regions)
         
         # Store results in Cloud Storage
         storage_path = store_results(results, project_id)
@@ -122,18 +157,22 @@ def discover_vendors_pubsub(event, context):
             logger.error("GCP_PROJECT_ID not set")
             return
         
-        # Get project from Pub/Sub message if provided
+        # Get project (and optional extra projects / regions) from Pub/Sub message if provided
+        project_ids = None
+        regions = None
         if event and 'data' in event:
             import base64
             message_data = base64.b64decode(event['data']).decode('utf-8')
             message_json = json.loads(message_data)
             if 'project_id' in message_json:
                 project_id = message_json['project_id']
+            project_ids = message_json.get('project_ids')
+            regions = message_json.get('regions')
         
         logger.info(f"Starting scheduled vendor discovery for project: {project_id}")
         
         # Run discovery
-        results = run_discovery(project_id)
+        results = run_discovery(project_id, project_ids=project_ids, regions=regions)
         
         # Store results in Cloud Storage
         storage_path = store_results(results, project_id)
@@ -148,17 +187,40 @@ def discover_vendors_pubsub(event, context):
         raise
 
 
-def run_discovery(project_id: str) -> Dict[str, Any]:
+def run_discovery(
+    project_id: str,
+    project_ids: Optional[List[str]] = None,
+    regions: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Run vendor dependency discovery
     
+    Every (project, resource type, region) listing runs as its own task on a
+    bounded thread pool, with a per-call timeout on each list RPC. Results are
+    merged in resource-name order, so the output does not depend on which
+    listing finishes first. Listings that fail or time out are recorded under
+    'discovery_errors' (the graph loader then skips removals for that run).
+    
+    With DISCOVERY_INCREMENTAL (default), per-resource revisions and vendor
+    hits from the previous scan are kept in Cloud Storage, and only resources
+    whose revision changed have their environment variables re-analyzed.
+    
     Args:
-        project_id: GCP project ID
+        project_id: GCP project ID (results and storage are keyed on this project)
+        project_ids: Projects to scan (default: DISCOVERY_PROJECT_IDS or project_id)
+        regions: Regions to scan (default: DISCOVERY_REGIONS or all locations '-')
     
     Returns:
         Dictionary with discovery results
     """
-    logger.info(f"Discovering vendor dependencies for project: {project_id}")
+    projects = list(dict.fromkeys(
+        project_ids or _split_env_list(os.getenv('DISCOVERY_PROJECT_IDS')) or [project_id]
+    ))
+    locations = list(dict.fromkeys(regions or _split_env_list(os.getenv('DISCOVERY_REGIONS')) or ['-']))
+    logger.info(
+        f"Discovering vendor dependencies for project: {project_id} "
+        f"({len(projects)} project(s), {len(locations)} location(s))"
+    )
     
     results = {
         'project_id': project_id,
@@ -168,106 +230,200 @@ def run_discovery(project_id: str) -> Dict[str, Any]:
         'cloud_run_services': []
     }
     
-    # Initialize GCP clients
+    # Initialize GCP clients (thread-safe, shared by all listing tasks)
     functions_client = functions_v1.CloudFunctionsServiceClient()
     run_client = run_v2.ServicesClient()
     
-    # Discover Cloud Functions
-    logger.info("Discovering Cloud Functions...")
-    functions = discover_cloud_functions(functions_client, project_id)
-    results['cloud_functions'] = functions
+    tasks = []
+    for pid in projects:
+        for location in locations:
+            tasks.append(('cloud_functions', pid, location, list_cloud_functions, functions_client))
+            tasks.append(('cloud_run_services', pid, location, list_cloud_run, run_client))
+    
+    logger.info(f"Running {len(tasks)} listing tasks on up to {MAX_WORKERS} workers...")
+    executor = ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(tasks))))
+    try:
+        futures = {
+            executor.submit(fn, client, pid, location, CALL_TIMEOUT): (kind, pid, location)
+            for kind, pid, location, fn, client in tasks
+        }
+        done, not_done = wait(futures, timeout=TOTAL_TIMEOUT)
+    finally:
+        # Don't block on listings that overran the overall deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    merged = {'cloud_functions': {}, 'cloud_run_services': {}}
+    errors = []
+    for future, (kind, pid, location) in futures.items():
+        if future in not_done:
+            error = f"timed out after {TOTAL_TIMEOUT:.0f}s"
+        elif future.exception() is not None:
+            error = str(future.exception())
+        else:
+            # Overlapping regions can return the same resource twice; keyed by name
+            for resource in future.result():
+                merged[kind][resource['name']] = resource
+            continue
+        logger.warning(f"⚠️  Error discovering {kind} in {pid}/{location}: {error}")
+        errors.append({'resource_type': kind, 'project_id': pid, 'location': location, 'error': error})
     
-    # Discover Cloud Run services
-    logger.info("Discovering Cloud Run services...")
-    services = discover_cloud_run(run_client, project_id)
+    functions = [merged['cloud_functions'][name] for name in sorted(merged['cloud_functions'])]
+    services = [merged['cloud_run_services'][name] for name in sorted(merged['cloud_run_services'])]
+    results['cloud_functions'] = functions
     results['cloud_run_services'] = services
+    if errors:
+        results['discovery_errors'] = sorted(
+            errors, key=lambda e: (e['resource_type'], e['project_id'], e['location'])
+        )
     
     # Analyze vendor dependencies
     logger.info("Analyzing vendor dependencies...")
-    vendors = analyze_vendors(functions, services)
+    previous_state = load_discovery_state(project_id) if INCREMENTAL_DISCOVERY else None
+    current_state = {} if INCREMENTAL_DISCOVERY else None
+    vendors = analyze_vendors(functions, services, previous_state, current_state)
     results['vendors'] = vendors
     
-    logger.info(f"Discovery complete. Found {len(vendors)} vendors")
+    if current_state is not None:
+        reused = sum(
+            1 for name, entry in current_state.items()
+            if entry['revision'] and previous_state.get(name, {}).get('revision') == entry['revision']
+        )
+        results['incremental'] = {'reused': reused, 'reanalyzed': len(current_state) - reused}
+        logger.info(f"Incremental analysis: {reused} resources unchanged, {len(current_state) - reused} re-analyzed")
+        
+        if errors:
+            # Keep state for resources a failed listing could not return
+            for name, entry in previous_state.items():
+                current_state.setdefault(name, entry)
+        save_discovery_state(project_id, current_state)
+    
+    logger.info(
+        f"Discovery complete. Found {len(vendors)} vendors "
+        f"({len(functions)} functions, {len(services)} services, {len(errors)} failed listings)"
+    )
     return results
 
 
-def discover_cloud_functions(client: functions_v1.CloudFunctionsServiceClient, project_id: str) -> list:
-    """Discover Cloud Functions"""
-    functions = []
+def list_cloud_functions(
+    client: functions_v1.CloudFunctionsServiceClient,
+    project_id: str,
+    location: str = '-',
+    timeout: Optional[float] = None
+) -> list:
+    """
+    List Cloud Functions in one project/location (raises on API errors)
     
-    try:
-        parent = f"projects/{project_id}/locations/-"
-        request = functions_v1.ListFunctionsRequest(parent=parent)
-        
-        for function in client.list_functions(request=request):
-            func_data = {
-                'name': function.name,
-                'runtime': function.runtime,
-                'entry_point': function.entry_point,
-                'environment_variables': dict(function.environment_variables or {}),
-                'status': function.status.name if function.status else 'UNKNOWN'
-            }
-            functions.append(func_data)
-            logger.debug(f"Found function: {function.name}")
+    Args:
+        client: Cloud Functions client
+        project_id: GCP project ID
+        location: Region, or '-' for all locations
+        timeout: Timeout in seconds for each list (page) call
     
-    except Exception as e:
-        logger.warning(f"Error discovering Cloud Functions: {e}")
+    Returns:
+        List of function dictionaries
+    """
+    functions = []
+    parent = f"projects/{project_id}/locations/{location}"
+    request = functions_v1.ListFunctionsRequest(parent=parent)
+    
+    for function in client.list_functions(request=request, timeout=timeout):
+        func_data = {
+            'name': function.name,
+            'runtime': function.runtime,
+            'entry_point': function.entry_point,
+            'environment_variables': dict(function.environment_variables or {}),
+            'status': function.status.name if function.status else 'UNKNOWN',
+            'revision': _revision(function.version_id, function.update_time)
+        }
+        functions.append(func_data)
+        logger.debug(f"Found function: {function.name}")
     
     return functions
 
 
-def discover_cloud_run(client: run_v2.ServicesClient, project_id: str) -> list:
-    """Discover Cloud Run services"""
+def list_cloud_run(
+    client: run_v2.ServicesClient,
+    project_id: str,
+    location: str = '-',
+    timeout: Optional[float] = None
+) -> list:
+    """
+    List Cloud Run services in one project/location (raises on API errors)
+    
+    Args:
+        client: Cloud Run services client
+        project_id: GCP project ID
+        location: Region, or '-' for all locations
+        timeout: Timeout in seconds for each list (page) call
+    
+    Returns:
+        List of service dictionaries
+    """
     services = []
+    parent = f"projects/{project_id}/locations/{location}"
+    request = run_v2.ListServicesRequest(parent=parent)
     
-    try:
-        parent = f"projects/{project_id}/locations/-"
-        request = run_v2.ListServicesRequest(parent=parent)
+    for service in client.list_services(request=request, timeout=timeout):
+        # Extract environment variables from containers
+        env_vars = {}
+        if service.template and service.template.containers:
+            for container in service.template.containers:
+                for env in container.env:
+                    env_vars[env.name] = env.value or ""
         
-        for service in client.list_services(request=request):
-            # Extract environment variables from containers
-            env_vars = {}
-            if service.template and service.template.containers:
-                for container in service.template.containers:
-                    for env in container.env:
-                        env_vars[env.name] = env.value or ""
-            
-            service_data = {
-                'name': service.name,
-                'uri': service.uri,
-                'environment_variables': env_vars,
-                'description': service.description or ""
-            }
-            services.append(service_data)
-            logger.debug(f"Found service: {service.name}")
-    
-    except Exception as e:
-        logger.warning(f"Error discovering Cloud Run services: {e}")
+        service_data = {
+            'name': service.name,
+            'uri': service.uri,
+            'environment_variables': env_vars,
+            'description': service.description or "",
+            'revision': _revision(service.etag, service.update_time)
+        }
+        services.append(service_data)
+        logger.debug(f"Found service: {service.name}")
     
     return services
 
 
-def analyze_vendors(functions: list, services: list) -> list:
-    """Analyze discovered resources for vendor dependencies"""
-    vendor_dependencies = {}
+def _revision(*parts) -> str:
+    """Build a revision token from update metadata (empty when none is available)"""
+    return ':'.join(str(part) for part in parts if part)
+
+
+def analyze_vendors(
+    functions: list,
+    services: list,
+    previous_state: Optional[Dict[str, Dict[str, Any]]] = None,
+    current_state: Optional[Dict[str, Dict[str, Any]]] = None
+) -> list:
+    """
+    Analyze discovered resources for vendor dependencies
     
-    # Analyze Cloud Functions
-    for func in functions:
-        extract_vendor_deps(
-            vendor_dependencies,
-            func.get('environment_variables', {}),
-            func.get('name', ''),
-            'cloud_function'
-        )
+    Args:
+        functions: Discovered Cloud Functions
+        services: Discovered Cloud Run services
+        previous_state: Resource name -> {revision, hits} from the last scan (reused when unchanged)
+        current_state: Dictionary filled with the state for this scan
     
-    # Analyze Cloud Run services
-    for service in services:
-        extract_vendor_deps(
-            vendor_dependencies,
-            service.get('environment_variables', {}),
-            service.get('name', ''),
-            'cloud_run'
-        )
+    Returns:
+        List of detected vendors with dependencies
+    """
+    vendor_dependencies = {}
+    
+    for resource_type, resources in (('cloud_function', functions), ('cloud_run', services)):
+        for resource in resources:
+            resource_name = resource.get('name', '')
+            hits = resource_vendor_hits(resource, previous_state)
+            if current_state is not None:
+                current_state[resource_name] = {
+                    'revision': resource.get('revision', ''),
+                    'hits': [list(hit) for hit in hits]
+                }
+            for vendor, env_var_name in hits:
+                vendor_dependencies.setdefault(vendor, []).append({
+                    'resource_name': resource_name,
+                    'resource_type': resource_type,
+                    'env_variable': env_var_name
+                })
     
     # Format vendor list
     vendors = []
@@ -281,19 +437,78 @@ def analyze_vendors(functions: list, services: list) -> list:
     return vendors
 
 
-def extract_vendor_deps(vendor_deps: dict, env_vars: dict, resource_name: str, resource_type: str):
-    """Extract vendor dependencies from environment variables"""
-    for vendor, patterns in VENDOR_PATTERNS.items():
-        for env_var_name in env_vars.keys():
-            if any(pattern.lower() in env_var_name.lower() for pattern in patterns):
-                if vendor not in vendor_deps:
-                    vendor_deps[vendor] = []
-                
-                vendor_deps[vendor].append({
-                    'resource_name': resource_name,
-                    'resource_type': resource_type,
-                    'env_variable': env_var_name
-                })
+def resource_vendor_hits(resource: Dict[str, Any], previous_state: Optional[Dict[str, Dict[str, Any]]] = None) -> list:
+    """
+    Get (vendor, env_variable) hits for one resource
+    
+    Args:
+        resource: Discovered resource
+        previous_state: Resource state from the last scan
+    
+    Returns:
+        List of (vendor, env_variable) pairs
+    """
+    revision = resource.get('revision')
+    cached = (previous_state or {}).get(resource.get('name', ''))
+    if revision and cached and cached.get('revision') == revision:
+        return [tuple(hit) for hit in cached['hits']]
+    return VENDOR_MATCHER.find_hits(resource.get('environment_variables', {}))
+
+
+def _state_blob(project_id: str):
+    """Cloud Storage blob holding the incremental discovery state for a project"""
+    bucket_name = os.getenv('STORAGE_BUCKET', f'{project_id}-discovery-results')
+    storage_client = storage.Client(project=project_id)
+    return storage_client.bucket(bucket_name).blob(f'discovery_state/{project_id}.json')
+
+
+def load_discovery_state(project_id: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load per-resource state from the previous scan
+    
+    Args:
+        project_id: GCP project ID
+    
+    Returns:
+        Resource name -> {revision, hits}; empty when there is no usable state
+        (first run, read error, or vendor signatures changed since)
+    """
+    try:
+        blob = _state_blob(project_id)
+        if not blob.exists():
+            return {}
+        state = json.loads(blob.download_as_bytes())
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to load discovery state, analyzing all resources: {e}")
+        return {}
+    
+    if state.get('patterns_fingerprint') != PATTERNS_FINGERPRINT:
+        logger.info("Vendor signatures changed since last scan, analyzing all resources")
+        return {}
+    return state.get('resources', {})
+
+
+def save_discovery_state(project_id: str, resources: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Store per-resource state for the next scan
+    
+    Args:
+        project_id: GCP project ID
+        resources: Resource name -> {revision, hits}
+    """
+    state = {
+        'patterns_fingerprint': PATTERNS_FINGERPRINT,
+        'updated_at': datetime.utcnow().isoformat(),
+        'resources': resources
+    }
+    try:
+        _state_blob(project_id).upload_from_string(
+            json.dumps(state, separators=(',', ':')),
+            content_type='application/json'
+        )
+    except Exception as e:
+        # Only costs a full analysis on the next scan
+        logger.warning(f"⚠️  Failed to save discovery state: {e}")
 
 
 def publish_discovery_event(project_id: str, storage_path: str, results: Dict[str, Any]) -> None:
@@ -346,7 +561,8 @@ def store_results(results: Dict[str, Any], project_id: str) -> str:
     """
     bucket_name = os.getenv('STORAGE_BUCKET', f'{project_id}-discovery-results')
     timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-    blob_name = f'discoveries/{timestamp}_discovery.json'
+    suffix = NDJSON_SUFFIX if RESULT_FORMAT == 'ndjson' else JSON_SUFFIX
+    blob_name = f'discoveries/{timestamp}{suffix}'
     
     try:
         storage_client = storage.Client(project=project_id)
@@ -367,13 +583,34 @@ def store_results(results: Dict[str, Any], project_id: str) -> str:
         
         # Upload results
         blob = bucket.blob(blob_name)
-        blob.upload_from_string(
-            json.dumps(results, indent=2),
-            content_type='application/json'
-        )
+        if RESULT_FORMAT == 'ndjson':
+            # Compressed while streaming to Cloud Storage (resumable upload in chunks)
+            with blob.open('wb', content_type=NDJSON_CONTENT_TYPE, ignore_flush=True) as writer:
+                write_discovery_ndjson(results, writer)
+        else:
+            blob.upload_from_string(
+                json.dumps(results, indent=2),
+                content_type='application/json'
+            )
         
         storage_path = f'gs://{bucket_name}/{blob_name}'
         logger.info(f"Results stored in Cloud Storage: {storage_path}")
+        
+        # Register in discoveries/LATEST and the date index (readers never list the bucket)
+        try:
+            record_discovery(bucket, blob_name, {
+                'storage_path': storage_path,
+                'discovery_timestamp': results.get('discovery_timestamp'),
+                'complete': not results.get('discovery_errors'),
+                'summary': {
+                    'cloud_functions': len(results.get('cloud_functions', [])),
+                    'cloud_run_services': len(results.get('cloud_run_services', [])),
+                    'vendors_found': len(results.get('vendors', []))
+                }
+            })
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to update discovery manifest: {e}")
+        
         return storage_path
     
     except Exception as e:
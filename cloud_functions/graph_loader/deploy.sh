@@ -32,6 +32,18 @@ else
     echo "✅ Neo4j credentials fetched successfully"
 fi
 
+# Neo4j driver pool settings from config/config.yaml
+CONFIG_FILE="../../config/config.yaml"
+MAX_POOL_SIZE=$(grep -E '^\s*max_connection_pool_size:' "$CONFIG_FILE" | awk '{print $2}')
+MAX_LIFETIME=$(grep -E '^\s*max_connection_lifetime:' "$CONFIG_FILE" | awk '{print $2}')
+BATCH_SIZE=$(grep -E '^\s*batch_size:' "$CONFIG_FILE" | awk '{print $2}')
+MAX_POOL_SIZE=${MAX_POOL_SIZE:-50}
+MAX_LIFETIME=${MAX_LIFETIME:-3600}
+BATCH_SIZE=${BATCH_SIZE:-1000}
+
+# Stage the shared discovery result reader, graph converter/write plan and schema bootstrap into the function source
+cp ../../scripts/gcp/discovery_format.py ../../scripts/gcp/discovery_graph.py ../../scripts/neo4j/schema.py .
+
 # Deploy the function
 gcloud functions deploy $FUNCTION_NAME \
   --gen2 \
@@ -40,7 +52,7 @@ gcloud functions deploy $FUNCTION_NAME \
   --source . \
   --entry-point load_discovery_to_neo4j \
   --trigger-topic $TOPIC_NAME \
-  --set-env-vars GCP_PROJECT_ID=$PROJECT_ID \
+  --set-env-vars GCP_PROJECT_ID=$PROJECT_ID,NEO4J_MAX_CONNECTION_POOL_SIZE=$MAX_POOL_SIZE,NEO4J_MAX_CONNECTION_LIFETIME=$MAX_LIFETIME,NEO4J_BATCH_SIZE=$BATCH_SIZE \
   --set-secrets NEO4J_URI=neo4j-uri:latest,NEO4J_USER=neo4j-user:latest,NEO4J_PASSWORD=neo4j-password:latest \
   --timeout 540s \
   --memory 512MB \
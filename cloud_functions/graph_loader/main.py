@@ -11,15 +11,28 @@ import logging
 import os
 import base64
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from google.cloud import storage
 from google.cloud import pubsub_v1
 from neo4j import GraphDatabase
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+try:
+    # Staged next to main.py by deploy.sh / cloudbuild.yaml
+    from discovery_format import is_ndjson_path, read_discovery_records, assemble_discovery
+    from discovery_graph import convert_to_neo4j_format, sync_discovery_data, write_discovery_data
+    from schema import ensure_schema
+except ImportError:
+    # Running from the repository checkout
+    from scripts.gcp.discovery_format import is_ndjson_path, read_discovery_records, assemble_discovery
+    from scripts.gcp.discovery_graph import convert_to_neo4j_format, sync_discovery_data, write_discovery_data
+    from scripts.neo4j.schema import ensure_schema
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +40,76 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Driver pool settings (deploy.sh passes neo4j.max_connection_pool_size and
+# neo4j.max_connection_lifetime from config/config.yaml)
+MAX_CONNECTION_POOL_SIZE = int(os.getenv('NEO4J_MAX_CONNECTION_POOL_SIZE', '50'))
+MAX_CONNECTION_LIFETIME = int(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME', '3600'))
+# Pooled connections idle longer than this are pinged before reuse
+LIVENESS_CHECK_TIMEOUT = int(os.getenv('NEO4J_LIVENESS_CHECK_TIMEOUT', '60'))
+MAX_LOAD_ATTEMPTS = 2
+
+# 'incremental' writes only what changed since the last sync; 'full' re-MERGEs everything
+GRAPH_SYNC_MODE = os.getenv('GRAPH_SYNC_MODE', 'incremental').lower()
+# Rows per UNWIND statement (deploy.sh passes neo4j.batch_size from config/config.yaml)
+BATCH_SIZE = int(os.getenv('NEO4J_BATCH_SIZE', '1000'))
+
+# Module-level driver, reused across warm invocations of this instance
+_driver = None
+_driver_key: Optional[Tuple[str, str, str]] = None
+_driver_lock = threading.Lock()
+_schema_ensured = False
+
+
+def get_driver(credentials: Dict[str, str]):
+    """
+    Get the shared Neo4j driver, creating it on first use (or if credentials changed)
+    
+    Args:
+        credentials: Neo4j connection credentials
+    
+    Returns:
+        Neo4j driver instance
+    """
+    global _driver, _driver_key
+    
+    key = (credentials['uri'], credentials['user'], credentials['password'])
+    with _driver_lock:
+        if _driver is not None and _driver_key != key:
+            logger.info("Neo4j credentials changed, recreating driver")
+            _close_driver()
+        
+        if _driver is None:
+            _driver = GraphDatabase.driver(
+                credentials['uri'],
+                auth=(credentials['user'], credentials['password']),
+                max_connection_pool_size=MAX_CONNECTION_POOL_SIZE,
+                max_connection_lifetime=MAX_CONNECTION_LIFETIME,
+                liveness_check_timeout=LIVENESS_CHECK_TIMEOUT
+            )
+            _driver_key = key
+            logger.info("✅ Created Neo4j driver (reused across invocations)")
+        
+        return _driver
+
+
+def reset_driver() -> None:
+    """Close the shared driver so the next get_driver() call reconnects"""
+    with _driver_lock:
+        _close_driver()
+
+
+def _close_driver() -> None:
+    """Close and forget the shared driver (caller holds _driver_lock)"""
+    global _driver, _driver_key
+    
+    if _driver is not None:
+        try:
+            _driver.close()
+        except Exception as e:
+            logger.warning(f"⚠️  Error closing Neo4j driver: {e}")
+    _driver = None
+    _driver_key = None
+
 
 def get_neo4j_credentials() -> Dict[str, str]:
     """Get Neo4j credentials from environment variables (injected from Secret Manager)"""
@@ -72,8 +155,13 @@ def fetch_discovery_from_storage(storage_path: str, project_id: str) -> Dict[str
         bucket = storage_client.bucket(bucket_name)
         blob = bucket.blob(blob_name)
         
-        content = blob.download_as_text()
-        results = json.loads(content)
+        if is_ndjson_path(blob_name):
+            # Stream-decode record by record (chunked download, no full-text copy)
+            with blob.open('rb') as reader:
+                results = assemble_discovery(read_discovery_records(reader))
+        else:
+            content = blob.download_as_text()
+            results = json.loads(content)
         
         logger.info(f"✅ Fetched discovery results from {storage_path}")
         return results
@@ -83,133 +171,54 @@ def fetch_discovery_from_storage(storage_path: str, project_id: str) -> Dict[str
         raise
 
 
-def convert_to_neo4j_format(discovery_data: Dict[str, Any], project_id: str) -> Dict[str, Any]:
-    """
-    Convert GCP discovery format to Neo4j graph format
-    
-    Args:
-        discovery_data: Raw discovery results
-        project_id: GCP project ID
-    
-    Returns:
-        Neo4j-compatible format
+def load_into_neo4j(
+    data: Dict[str, Any],
+    credentials: Dict[str, str],
+    project_id: Optional[str] = None,
+    prune: bool = True
+) -> None:
     """
-    # Convert discovery format to Neo4j format inline (avoid import issues)
-    vendors = []
+    Load vendor dependency data into Neo4j
     
-    for vendor_data in discovery_data.get('vendors', []):
-        vendor_name = vendor_data.get('name', 'Unknown')
-        vendor_id = vendor_name.lower().replace(' ', '_')
-        
-        # Extract services from dependencies
-        services = []
-        for dep in vendor_data.get('dependencies', []):
-            service_name = dep.get('service_name', 'Unknown')
-            # Extract just the service name from full GCP resource path
-            if '/' in service_name:
-                service_name = service_name.split('/')[-1]
-            
-            service_id = service_name.lower().replace(' ', '_').replace('-', '_')
-            
-            services.append({
-                'service_id': service_id,
-                'name': service_name,
-                'type': dep.get('resource_type', 'unknown'),
-                'business_processes': []  # Can be enhanced later
-            })
-        
-        vendors.append({
-            'vendor_id': vendor_id,
-            'name': vendor_name,
-            'category': vendor_data.get('category', 'unknown'),
-            'criticality': vendor_data.get('criticality', 'medium'),
-            'services': services
-        })
+    Reuses the module-level driver; if its connections have gone stale (e.g.
+    Aura closed them while the instance was idle) the driver is rebuilt and the
+    load retried once. All writes are MERGEs, so retrying is safe.
     
-    return {'vendors': vendors}
-
-
-def load_into_neo4j(data: Dict[str, Any], credentials: Dict[str, str]) -> None:
-    """
-    Load vendor dependency data into Neo4j
+    In incremental mode (GRAPH_SYNC_MODE, default) only changes since the last
+    sync for project_id are written; otherwise the whole data set is re-MERGEd.
     
     Args:
         data: Vendor dependency data in Neo4j format
         credentials: Neo4j connection credentials
+        project_id: GCP project the discovery covers (required for incremental sync)
+        prune: Remove services missing from the snapshot during incremental sync
     """
-    driver = None
-    try:
-        driver = GraphDatabase.driver(
-            credentials['uri'],
-            auth=(credentials['user'], credentials['password'])
-        )
-        
-        with driver.session() as session:
-            # Load vendors and services
-            for vendor in data.get('vendors', []):
-                vendor_id = vendor.get('vendor_id', vendor.get('name', '').lower().replace(' ', '_'))
-                vendor_name = vendor.get('name', '')
-                # Normalize vendor name to lowercase for case-insensitive matching
-                normalized_name = vendor_name.lower().strip()
-                
-                # Create vendor node - use normalized name for MERGE to prevent duplicates
-                # This matches the strategy used in scripts/neo4j/load_graph.py
-                session.run(
-                    """
-                    MERGE (v:Vendor {name: $normalized_name})
-                    ON CREATE SET v.vendor_id = $vendor_id,
-                        v.category = $category,
-                        v.criticality = $criticality,
-                        v.display_name = $display_name
-                    ON MATCH SET v.vendor_id = COALESCE(v.vendor_id, $vendor_id),
-                        v.category = COALESCE(v.category, $category),
-                        v.criticality = COALESCE(v.criticality, $criticality),
-                        v.display_name = COALESCE(v.display_name, $display_name)
-                    """,
-                    normalized_name=normalized_name,
-                    vendor_id=vendor_id,
-                    display_name=vendor_name,
-                    category=vendor.get('category', 'unknown'),
-                    criticality=vendor.get('criticality', 'medium')
-                )
-                
-                # Create services and relationships
-                for service in vendor.get('services', []):
-                    service_id = service.get('service_id', service.get('name', '').lower().replace(' ', '_'))
-                    service_name = service.get('name', '')
-                    
-                    # Create service node
-                    session.run(
-                        """
-                        MERGE (s:Service {service_id: $service_id})
-                        SET s.name = $name,
-                            s.type = $type
-                        """,
-                        service_id=service_id,
-                        name=service_name,
-                        type=service.get('type', 'unknown')
-                    )
-                    
-                    # Create DEPENDS_ON relationship
-                    # Use normalized name to match vendor (consistent with MERGE strategy)
-                    session.run(
-                        """
-                        MATCH (v:Vendor {name: $normalized_vendor_name})
-                        MATCH (s:Service {service_id: $service_id})
-                        MERGE (s)-[:DEPENDS_ON]->(v)
-                        """,
-                        normalized_vendor_name=normalized_name,
-                        service_id=service_id
-                    )
-        
-        logger.info("✅ Successfully loaded discovery data into Neo4j")
-        
-    except Exception as e:
-        logger.error(f"Failed to load into Neo4j: {e}", exc_info=True)
-        raise
-    finally:
-        if driver:
-            driver.close()
+    global _schema_ensured
+    
+    for attempt in range(1, MAX_LOAD_ATTEMPTS + 1):
+        driver = get_driver(credentials)
+        try:
+            # Schema only needs checking once per instance
+            if not _schema_ensured:
+                ensure_schema(driver)
+                _schema_ensured = True
+            
+            with driver.session() as session:
+                if GRAPH_SYNC_MODE == 'incremental' and project_id:
+                    sync_discovery_data(session, data, project_id, prune=prune, batch_size=BATCH_SIZE)
+                else:
+                    write_discovery_data(session, data, batch_size=BATCH_SIZE)
+            logger.info("✅ Successfully loaded discovery data into Neo4j")
+            return
+        except (ServiceUnavailable, SessionExpired) as e:
+            if attempt == MAX_LOAD_ATTEMPTS:
+                logger.error(f"Failed to load into Neo4j: {e}", exc_info=True)
+                raise
+            logger.warning(f"⚠️  Neo4j connection lost ({e}), reconnecting...")
+            reset_driver()
+        except Exception as e:
+            logger.error(f"Failed to load into Neo4j: {e}", exc_info=True)
+            raise
 
 
 def load_discovery_to_neo4j(event: Dict[str, Any], context) -> None:
@@ -248,8 +257,16 @@ def load_discovery_to_neo4j(event: Dict[str, Any], context) -> None:
         # Convert to Neo4j format
         neo4j_data = convert_to_neo4j_format(discovery_data, project_id)
         
+        # A partial discovery (failed/timed-out listings) must not delete services
+        discovery_errors = discovery_data.get('discovery_errors') or []
+        if discovery_errors:
+            logger.warning(
+                f"⚠️  Discovery had {len(discovery_errors)} failed listings - "
+                f"skipping removal of missing services"
+            )
+        
         # Load into Neo4j
-        load_into_neo4j(neo4j_data, credentials)
+        load_into_neo4j(neo4j_data, credentials, project_id=project_id, prune=not discovery_errors)
         
         logger.info("✅ Discovery data successfully loaded into Neo4j")
         
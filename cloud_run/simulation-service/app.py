@@ -6,7 +6,11 @@ Deployed as a containerized service on Google Cloud Run.
 
 Endpoints:
     POST /simulate - Run a vendor failure simulation
-    GET /simulate/{simulation_id} - Get simulation results (future)
+    POST /simulate/batch - Run vendors x durations, streamed as NDJSON
+    GET /simulate/{simulation_id} - Get stored simulation results
+    GET /simulations - List stored simulations by vendor/time (paginated)
+    POST /snapshot/refresh - Reload the in-memory dependency graph snapshot
+    GET /cache/stats - Result cache and Pub/Sub publisher counters
     GET /health - Health check endpoint
     GET /vendors - List available vendors
 
@@ -17,12 +21,17 @@ import os
 import logging
 import sys
 import json
+import re
+import time
+import uuid
+import atexit
+import signal
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
-from flask import Flask, request, jsonify
+from typing import Dict, Any, Iterator, List, Optional
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from google.cloud import pubsub_v1
 
 # Add app directory to path for imports
 # In Docker: app.py is at /app/app.py, scripts/ is at /app/scripts/
@@ -39,12 +48,26 @@ print(f"✅ Import path: scripts.simulation.simulate_failure")
 # Import simulation module (updated path: scripts/simulation/simulate_failure.py)
 # Fixed import path: scripts.simulation.simulate_failure (not scripts.simulate_failure)
 from scripts.simulation.simulate_failure import VendorFailureSimulator
+from scripts.simulation.graph_snapshot import DependencyGraphSnapshot
+from scripts.simulation.result_cache import (
+    SimulationResultCache,
+    GraphVersionTracker,
+    make_cache_key
+)
+from scripts.simulation.result_store import (
+    SimulationResultStore,
+    create_result_store,
+    new_simulation_id,
+    vendor_slug,
+    DEFAULT_PAGE_SIZE
+)
 from scripts.utils import (
     setup_logging,
     load_config,
     validate_env_vars
 )
 from scripts.gcp.gcp_secrets import get_secret
+from scripts.gcp.pubsub_publisher import BatchingPublisher
 
 # Configure logging
 logging.basicConfig(
@@ -60,23 +83,127 @@ CORS(app)  # Enable CORS for all routes
 # Global simulator instance (initialized on first use)
 simulator: Optional[VendorFailureSimulator] = None
 
+# Answer simulations from an in-memory graph snapshot instead of querying Neo4j per request
+USE_GRAPH_SNAPSHOT = os.getenv('SIMULATION_SNAPSHOT_MODE', 'false').lower() == 'true'
+
+# Result cache and graph version tracking (initialized with the simulator).
+# Cache entries are {'result': ..., 'simulation_id': ID it is stored under, or None}.
+result_cache: Optional[SimulationResultCache] = None
+graph_version: Optional[GraphVersionTracker] = None
+snapshot_version: Optional[str] = None
+
+# Upper bound on vendors x durations cells per /simulate/batch request
+MAX_BATCH_CELLS = int(os.getenv('SIMULATION_MAX_BATCH_CELLS', '10000'))
+# Simulation results per Pub/Sub message when publishing a batch
+PUBLISH_BATCH_SIZE = 500
+
+# Process-wide Pub/Sub publisher (batched, non-blocking; flushed on shutdown)
+result_publisher: Optional[BatchingPublisher] = None
+_publisher_lock = threading.Lock()
+
+# Persistent result store behind GET /simulate/<id> (created on first use)
+result_store: Optional[SimulationResultStore] = None
+_result_store_ready = False
+_result_store_lock = threading.Lock()
+SIMULATION_ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._+-]{0,199}$')
+
+
+def get_result_publisher() -> Optional[BatchingPublisher]:
+    """
+    Get the process-wide simulation results publisher (created on first use)
+    
+    Returns:
+        BatchingPublisher, or None if GCP_PROJECT_ID is not set
+    """
+    global result_publisher
+    
+    if result_publisher is not None:
+        return result_publisher
+    
+    project_id = os.getenv('GCP_PROJECT_ID')
+    if not project_id:
+        return None
+    
+    with _publisher_lock:
+        if result_publisher is None:
+            publisher_config = simulator.config['simulation'].get('publisher', {}) if simulator else {}
+            result_publisher = BatchingPublisher.from_config(
+                project_id,
+                publisher_config.get('topic', 'simulation-results'),
+                publisher_config
+            )
+            logger.info(f"✅ Pub/Sub publisher ready: {result_publisher.topic_path}")
+    return result_publisher
+
+
+def shutdown_result_publisher() -> None:
+    """Flush queued Pub/Sub messages before the process exits"""
+    if result_publisher is None:
+        return
+    publisher_config = simulator.config['simulation'].get('publisher', {}) if simulator else {}
+    result_publisher.close(timeout=publisher_config.get('shutdown_timeout_seconds', 8))
+
+
+def get_result_store() -> Optional[SimulationResultStore]:
+    """
+    Get the configured simulation result store (created on first use)
+    
+    Returns:
+        Result store, or None if storing results is disabled
+    """
+    global result_store, _result_store_ready
+    
+    if _result_store_ready:
+        return result_store
+    
+    with _result_store_lock:
+        if not _result_store_ready:
+            config = simulator.config if simulator else load_config()
+            result_store = create_result_store(
+                config['simulation'].get('result_store', {}),
+                project_id=os.getenv('GCP_PROJECT_ID')
+            )
+            _result_store_ready = True
+            logger.info(f"✅ Result store: {result_store.backend if result_store else 'disabled'}")
+    return result_store
+
+
+def store_simulation_result(vendor_key: str, result: Dict[str, Any]) -> bool:
+    """
+    Persist a simulation result under its simulation_id
+    
+    Args:
+        vendor_key: Normalized vendor name used for listing
+        result: Simulation result dictionary (with simulation_id)
+    
+    Returns:
+        True if stored
+    """
+    try:
+        store = get_result_store()
+        if store is None:
+            return False
+        store.put(result['simulation_id'], vendor_key, result)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to store simulation result: {e}")
+        # Don't fail the simulation if storing fails
+        return False
+
 
 def publish_simulation_result(result: Dict[str, Any]) -> None:
     """
-    Publish simulation result event to Pub/Sub
+    Queue a simulation result event for Pub/Sub (returns without waiting)
     
     Args:
         result: Simulation result dictionary
     """
     try:
-        project_id = os.getenv('GCP_PROJECT_ID')
-        if not project_id:
+        publisher = get_result_publisher()
+        if publisher is None:
             logger.warning("GCP_PROJECT_ID not set, skipping Pub/Sub publish")
             return
         
-        publisher = pubsub_v1.PublisherClient()
-        topic_path = publisher.topic_path(project_id, 'simulation-results')
-        
         # Create event message (only essential data for BigQuery)
         event_data = {
             'simulation_id': result.get('simulation_id'),
@@ -90,18 +217,46 @@ def publish_simulation_result(result: Dict[str, Any]) -> None:
             'full_result': result  # Include full result for BigQuery loader
         }
         
-        # Publish message
-        message_data = json.dumps(event_data).encode('utf-8')
-        future = publisher.publish(topic_path, message_data)
-        message_id = future.result()
-        
-        logger.info(f"✅ Published simulation result to Pub/Sub: {message_id}")
+        if publisher.publish(event_data):
+            logger.info(f"✅ Queued simulation result for Pub/Sub: {result.get('simulation_id')}")
         
     except Exception as e:
         logger.warning(f"⚠️  Failed to publish simulation result: {e}")
         # Don't fail the simulation if publishing fails
 
 
+def publish_simulation_results(results: List[Dict[str, Any]]) -> None:
+    """
+    Queue a batch of simulation results for Pub/Sub in bulk
+    
+    Results are grouped PUBLISH_BATCH_SIZE per message under a 'results' list,
+    which the BigQuery loader writes in a single insert.
+    
+    Args:
+        results: Simulation result dictionaries
+    """
+    try:
+        publisher = get_result_publisher()
+        if publisher is None:
+            logger.warning("GCP_PROJECT_ID not set, skipping Pub/Sub publish")
+            return
+        if not results:
+            return
+        
+        project_id = os.getenv('GCP_PROJECT_ID')
+        queued = 0
+        for start in range(0, len(results), PUBLISH_BATCH_SIZE):
+            chunk = results[start:start + PUBLISH_BATCH_SIZE]
+            if publisher.publish({'project_id': project_id, 'results': chunk}):
+                queued += len(chunk)
+        
+        logger.info(f"✅ Queued {queued}/{len(results)} simulation results for Pub/Sub")
+        
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to publish simulation results: {e}")
+        # Don't fail the batch if publishing fails
+
+
 def get_neo4j_credentials() -> Dict[str, str]:
     """
     Get Neo4j credentials from GCP Secret Manager or environment variables
@@ -134,17 +289,36 @@ def get_neo4j_credentials() -> Dict[str, str]:
 
 def init_simulator():
     """Initialize the simulator (lazy initialization)"""
-    global simulator
+    global simulator, result_cache, graph_version, snapshot_version
     
     if simulator is None:
         try:
             credentials = get_neo4j_credentials()
-            simulator = VendorFailureSimulator(
+            sim = VendorFailureSimulator(
                 neo4j_uri=credentials['uri'],
                 neo4j_user=credentials['user'],
-                neo4j_password=credentials['password']
+                neo4j_password=credentials['password'],
+                use_snapshot=USE_GRAPH_SNAPSHOT
+            )
+            
+            cache_config = sim.config['simulation'].get('result_cache', {})
+            graph_version = GraphVersionTracker(
+                sim.driver,
+                check_interval_seconds=cache_config.get('version_check_seconds', 30)
+            )
+            if cache_config.get('enabled', True):
+                result_cache = SimulationResultCache(
+                    max_entries=cache_config.get('max_entries', 1024),
+                    ttl_seconds=cache_config.get('ttl_seconds', 900)
+                )
+            if sim.snapshot is not None:
+                snapshot_version = graph_version.current()
+            
+            simulator = sim
+            logger.info(
+                f"Simulator initialized successfully (snapshot mode: {USE_GRAPH_SNAPSHOT}, "
+                f"result cache: {result_cache is not None})"
             )
-            logger.info("Simulator initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize simulator: {e}", exc_info=True)
             raise
@@ -152,6 +326,26 @@ def init_simulator():
     return simulator
 
 
+def current_graph_version(sim: VendorFailureSimulator) -> str:
+    """
+    Get the graph version token, reloading the snapshot if the graph has changed
+    
+    Args:
+        sim: Initialized simulator
+    
+    Returns:
+        Graph version token used in result cache keys
+    """
+    global snapshot_version
+    
+    version = graph_version.current()
+    if sim.snapshot is not None and version != snapshot_version:
+        logger.info(f"Graph version changed ({snapshot_version} -> {version}), refreshing snapshot")
+        sim.refresh_snapshot()
+        snapshot_version = version
+    return version
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -213,6 +407,12 @@ def run_simulation():
             "duration": 4
         }
     
+        A correlated multi-vendor failure can be simulated with
+        "vendors": ["Stripe", "Auth0"] instead of "vendor".
+    
+        With "inline": false only the simulation_id and scores are returned;
+        the full result is fetched later from GET /simulate/<simulation_id>.
+    
     Returns:
         Simulation results with impact analysis
     """
@@ -222,12 +422,16 @@ def run_simulation():
             return jsonify({'error': 'Content-Type must be application/json'}), 400
         
         data = request.get_json()
-        vendor = data.get('vendor')
+        vendor = data.get('vendor') or data.get('vendors')
         duration = data.get('duration', 4)
         
         if not vendor:
             return jsonify({'error': 'vendor field is required'}), 400
         
+        if not isinstance(vendor, str):
+            if not isinstance(vendor, list) or not all(isinstance(v, str) and v for v in vendor):
+                return jsonify({'error': 'vendors must be a list of vendor names'}), 400
+        
         if not isinstance(duration, (int, float)) or duration <= 0:
             return jsonify({'error': 'duration must be a positive number'}), 400
         
@@ -235,6 +439,28 @@ def run_simulation():
         
         # Initialize simulator
         sim = init_simulator()
+        vendor_key = vendor.lower() if isinstance(vendor, str) else '+'.join(v.lower() for v in vendor)
+        
+        # Checking the graph version also reloads a loaded snapshot that has gone
+        # stale, so it runs whenever one is loaded, not only with the cache on
+        version = current_graph_version(sim) if result_cache is not None or sim.snapshot is not None else None
+        
+        # Serve repeat requests from the cache (key includes the graph version,
+        # so results computed before a discovery load are never reused)
+        cache_key = None
+        if result_cache is not None:
+            cache_key = make_cache_key(vendor, duration_hours, version)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Cache hit: {vendor} for {duration_hours} hours")
+                result, stored = cached['result'], cached['simulation_id'] is not None
+                if not stored:
+                    # Cached by a batch run (or storing failed): store it now under its own ID
+                    result = dict(result, simulation_id=new_simulation_id(vendor_key))
+                    stored = store_simulation_result(vendor_key, result)
+                    if stored:
+                        result_cache.put(cache_key, {'result': result, 'simulation_id': result['simulation_id']})
+                return _simulation_response(result, data, stored, 'HIT')
         
         # Run simulation
         # Note: vendor comes in as lowercase (normalized), but simulate_vendor_failure
@@ -243,7 +469,7 @@ def run_simulation():
         result = sim.simulate_vendor_failure(vendor, duration_hours)
         
         # Add simulation metadata
-        result['simulation_id'] = f"{vendor.lower()}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+        result['simulation_id'] = new_simulation_id(vendor_key)
         result['service'] = 'simulation-service'
         result['deployed_at'] = os.getenv('K_SERVICE', 'local')
         
@@ -253,10 +479,18 @@ def run_simulation():
         logger.info(f"Compliance frameworks: {len(compliance.get('affected_frameworks', {}))}")
         logger.info(f"Compliance summary: {len(compliance.get('summary', {}))}")
         
-        # Publish event to Pub/Sub
+        # Persist for GET /simulate/<id>, then publish event to Pub/Sub
+        stored = store_simulation_result(vendor_key, result)
         publish_simulation_result(result)
         
-        return jsonify(result), 200
+        if cache_key is not None:
+            # The simulation_id is kept only if the result was stored under it
+            result_cache.put(cache_key, {
+                'result': result,
+                'simulation_id': result['simulation_id'] if stored else None
+            })
+        
+        return _simulation_response(result, data, stored, 'MISS' if cache_key is not None else 'BYPASS')
         
     except ValueError as e:
         logger.error(f"Validation error: {e}")
@@ -269,19 +503,336 @@ def run_simulation():
         }), 500
 
 
+def _simulation_response(result: Dict[str, Any], data: Dict[str, Any], stored: bool, cache_status: str):
+    """
+    Build the POST /simulate response
+    
+    With "inline": false (and the result stored) only the summary is
+    returned; the full result is fetched from the Location header.
+    """
+    if stored and data.get('inline', True) is False:
+        response = jsonify({
+            'simulation_id': result['simulation_id'],
+            'vendor': result.get('vendor'),
+            'duration_hours': result.get('duration_hours'),
+            'overall_impact_score': result.get('overall_impact_score')
+        })
+    else:
+        response = jsonify(result)
+    response.headers['X-Cache'] = cache_status
+    if stored:
+        response.headers['Location'] = f"/simulate/{result['simulation_id']}"
+    return response, 200
+
+
+@app.route('/simulate/batch', methods=['POST'])
+def run_simulation_batch():
+    """
+    Run simulations for a grid of vendors x durations, streamed as NDJSON
+    
+    Request Body:
+        {
+            "vendors": ["Stripe", "Auth0"] or "all",
+            "durations": [1, 4, 24],
+            "detail": "summary",
+            "publish": true,
+            "store": false
+        }
+    
+        "summary" (default) scores the whole grid in one vectorized pass over
+        the in-memory graph snapshot; "full" runs a complete simulation per
+        cell (served from the result cache where possible). "store": true
+        also persists every result for GET /simulate/<simulation_id>.
+    
+    Returns:
+        application/x-ndjson stream: a 'batch' header line, one 'result' (or
+        'error') line per cell as it completes, and a final 'summary' line
+    """
+    if not request.is_json:
+        return jsonify({'error': 'Content-Type must be application/json'}), 400
+    
+    data = request.get_json()
+    vendors = data.get('vendors', 'all')
+    durations = data.get('durations', [4])
+    detail = data.get('detail', 'summary')
+    publish = data.get('publish', True)
+    store = data.get('store', False)
+    
+    if vendors != 'all' and (
+        not isinstance(vendors, list) or not vendors or not all(isinstance(v, str) and v for v in vendors)
+    ):
+        return jsonify({'error': 'vendors must be "all" or a list of vendor names'}), 400
+    if not isinstance(durations, list) or not durations or not all(
+        isinstance(d, (int, float)) and not isinstance(d, bool) and d > 0 for d in durations
+    ):
+        return jsonify({'error': 'durations must be a list of positive numbers'}), 400
+    if detail not in ('summary', 'full'):
+        return jsonify({'error': 'detail must be "summary" or "full"'}), 400
+    
+    durations = list(dict.fromkeys(int(d) for d in durations))
+    
+    try:
+        sim = init_simulator()
+        version = current_graph_version(sim) if graph_version is not None else None
+        snapshot = None
+        if detail == 'summary' or vendors == 'all':
+            # Use the shared snapshot in snapshot mode (kept current by the version
+            # check above); otherwise read one for this batch only, so /simulate
+            # keeps querying the live graph
+            snapshot = sim.snapshot if sim.snapshot is not None else sim.backend.snapshot()
+        if vendors == 'all':
+            vendors = list(snapshot.vendor_names)
+    except Exception as e:
+        logger.error(f"Batch simulation failed: {e}", exc_info=True)
+        return jsonify({'error': 'Simulation failed', 'message': str(e)}), 500
+    
+    if len(vendors) * len(durations) > MAX_BATCH_CELLS:
+        return jsonify({'error': f'batch exceeds {MAX_BATCH_CELLS} vendor x duration cells'}), 400
+    
+    batch_id = f"batch-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    
+    def generate() -> Iterator[str]:
+        started = time.perf_counter()
+        yield json.dumps({
+            'type': 'batch',
+            'batch_id': batch_id,
+            'vendor_count': len(vendors),
+            'durations': durations,
+            'detail': detail,
+            'graph_version': version
+        }) + '\n'
+        
+        completed = []
+        errors = 0
+        stored = 0
+        if detail == 'summary':
+            cells = _batch_summary_cells(sim, snapshot, vendors, durations, version)
+        else:
+            cells = _batch_full_cells(sim, vendors, durations, version)
+        
+        for line in cells:
+            if line['type'] == 'result':
+                vendor_key = line['result']['vendor'].lower()
+                line['result']['simulation_id'] = (
+                    f"{batch_id}-{vendor_slug(vendor_key)}-{line['result']['duration_hours']}h"
+                )
+                completed.append(line['result'])
+                if store and store_simulation_result(vendor_key, line['result']):
+                    stored += 1
+            else:
+                errors += 1
+            yield json.dumps(line) + '\n'
+        
+        if publish:
+            publish_simulation_results(completed)
+        
+        yield json.dumps({
+            'type': 'summary',
+            'batch_id': batch_id,
+            'results': len(completed),
+            'errors': errors,
+            'stored': stored,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _batch_summary_cells(
+    sim: VendorFailureSimulator,
+    snapshot: DependencyGraphSnapshot,
+    vendors: List[str],
+    durations: List[int],
+    version: Optional[str]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Score every requested vendor x duration cell with one vectorized sweep
+    
+    Yields:
+        'result' lines shaped like /simulate results (scores and key figures
+        only), or 'error' lines for vendors missing from the graph
+    """
+    sweep = sim.sweep_all_vendors(durations, snapshot=snapshot)
+    by_id = {entry['vendor_id']: entry for entry in sweep['results']}
+    
+    for vendor in vendors:
+        vendor_id = snapshot.vendor_index.get(vendor.lower().strip())
+        entry = by_id.get(vendor_id)
+        if entry is None:
+            for duration in durations:
+                yield {'type': 'error', 'vendor': vendor, 'duration_hours': duration,
+                       'error': f"Vendor '{vendor}' not found in dependency graph"}
+            continue
+        
+        for scenario in entry['scenarios']:
+            yield {
+                'type': 'result',
+                'result': {
+                    'vendor': entry['vendor'],
+                    'duration_hours': scenario['duration_hours'],
+                    'timestamp': sweep['timestamp'],
+                    'overall_impact_score': scenario['overall_impact_score'],
+                    'operational_impact': entry['operational_impact'],
+                    'financial_impact': {
+                        'impact_score': scenario['financial_impact_score'],
+                        'revenue_loss': scenario['revenue_loss'],
+                        'failed_transactions': scenario['failed_transactions'],
+                        'customer_impact_cost': scenario['customer_impact_cost'],
+                        'total_cost': scenario['total_cost'],
+                        'total_cost_formatted': scenario['total_cost_formatted']
+                    },
+                    'compliance_impact': entry['compliance_impact'],
+                    'graph_version': version
+                }
+            }
+
+
+def _batch_full_cells(
+    sim: VendorFailureSimulator,
+    vendors: List[str],
+    durations: List[int],
+    version: Optional[str]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run a full simulation per vendor x duration cell, reusing cached results
+    
+    Yields:
+        'result' lines with complete /simulate results, or 'error' lines
+    """
+    for vendor in vendors:
+        for duration in durations:
+            cache_key = make_cache_key(vendor, duration, version) if result_cache is not None else None
+            try:
+                cached = result_cache.get(cache_key) if cache_key is not None else None
+                if cached is not None:
+                    result = cached['result']
+                else:
+                    result = sim.simulate_vendor_failure(vendor, duration)
+                    result['service'] = 'simulation-service'
+                    result['deployed_at'] = os.getenv('K_SERVICE', 'local')
+                    if cache_key is not None:
+                        # Not stored under an ID of its own (POST /simulate stores it on a hit)
+                        result_cache.put(cache_key, {'result': result, 'simulation_id': None})
+                # Cached results are shared: tag a copy with this batch's ID
+                yield {'type': 'result', 'result': dict(result)}
+            except Exception as e:
+                logger.warning(f"⚠️  Batch cell failed ({vendor}, {duration}h): {e}")
+                yield {'type': 'error', 'vendor': vendor, 'duration_hours': duration, 'error': str(e)}
+
+
+@app.route('/snapshot/refresh', methods=['POST'])
+def refresh_snapshot():
+    """
+    Reload the in-memory dependency graph snapshot from Neo4j
+    
+    Intended to be called after a discovery load has updated the graph.
+    """
+    try:
+        global snapshot_version
+        
+        sim = init_simulator()
+        graph_version.invalidate()
+        snapshot = sim.refresh_snapshot()
+        snapshot_version = graph_version.current()
+        if result_cache is not None:
+            result_cache.clear()
+        
+        return jsonify({
+            'status': 'refreshed',
+            'snapshot': snapshot.stats()
+        }), 200
+    except Exception as e:
+        logger.error(f"Failed to refresh snapshot: {e}", exc_info=True)
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Result cache and publisher counters for tuning cache and batch settings"""
+    try:
+        init_simulator()
+        
+        return jsonify({
+            'enabled': result_cache is not None,
+            'graph_version': graph_version.current(),
+            'cache': result_cache.stats() if result_cache is not None else {},
+            'publisher': result_publisher.stats() if result_publisher is not None else {}
+        }), 200
+    except Exception as e:
+        logger.error(f"Failed to get cache stats: {e}", exc_info=True)
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+
 @app.route('/simulate/<simulation_id>', methods=['GET'])
 def get_simulation(simulation_id: str):
     """
-    Get simulation results by ID (placeholder for future implementation)
+    Get stored simulation results by ID
     
-    For now, returns a message indicating this feature is not yet implemented.
-    Future: Store results in Cloud Storage or Firestore and retrieve by ID.
+    Returns:
+        The full simulation result as returned by POST /simulate
     """
-    return jsonify({
-        'message': 'Simulation result retrieval not yet implemented',
-        'simulation_id': simulation_id,
-        'note': 'Results are returned immediately from POST /simulate endpoint'
-    }), 501
+    if not SIMULATION_ID_PATTERN.match(simulation_id):
+        return jsonify({'error': 'invalid simulation_id'}), 400
+    
+    try:
+        store = get_result_store()
+        if store is None:
+            return jsonify({'error': 'Result store is disabled'}), 503
+        
+        result = store.get(simulation_id)
+        if result is None:
+            return jsonify({'error': 'Simulation not found', 'simulation_id': simulation_id}), 404
+        
+        response = jsonify(result)
+        # Stored results never change
+        response.headers['Cache-Control'] = 'private, max-age=86400, immutable'
+        return response, 200
+    except Exception as e:
+        logger.error(f"Failed to get simulation {simulation_id}: {e}", exc_info=True)
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+
+@app.route('/simulations', methods=['GET'])
+def list_simulations():
+    """
+    List stored simulations, newest first
+    
+    Query Parameters:
+        vendor: Vendor name ('stripe', or 'stripe+auth0' for multi-vendor runs)
+        since / until: ISO-8601 UTC bounds on when results were stored
+        limit: Page size (default 50, max 500)
+        cursor: next_cursor from the previous page
+    
+    Returns:
+        Result summaries and the cursor for the next page
+    """
+    try:
+        store = get_result_store()
+        if store is None:
+            return jsonify({'error': 'Result store is disabled'}), 503
+        
+        vendor = request.args.get('vendor')
+        page = store.list_results(
+            vendor=vendor.lower().strip() if vendor else None,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+            cursor=request.args.get('cursor')
+        )
+        return jsonify(page), 200
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query parameter: {e}'}), 400
+    except Exception as e:
+        logger.error(f"Failed to list simulations: {e}", exc_info=True)
+        return jsonify({
+            'error': str(e)
+        }), 500
 
 
 @app.route('/', methods=['GET'])
@@ -292,7 +843,11 @@ def root():
         'version': '1.0.0',
         'endpoints': {
             'POST /simulate': 'Run a vendor failure simulation',
-            'GET /simulate/{id}': 'Get simulation results (future)',
+            'POST /simulate/batch': 'Run vendors x durations, streamed as NDJSON',
+            'GET /simulate/{id}': 'Get stored simulation results',
+            'GET /simulations': 'List stored simulations by vendor/time (paginated)',
+            'POST /snapshot/refresh': 'Reload the in-memory dependency graph snapshot',
+            'GET /cache/stats': 'Result cache and Pub/Sub publisher counters',
             'GET /vendors': 'List available vendors',
             'GET /health': 'Health check',
             'GET /': 'This endpoint'
@@ -301,7 +856,19 @@ def root():
     }), 200
 
 
+def handle_sigterm(signum, frame) -> None:
+    """Cloud Run sends SIGTERM before stopping an instance: drain Pub/Sub, then exit"""
+    logger.info("🔄 SIGTERM received, flushing Pub/Sub publisher")
+    shutdown_result_publisher()
+    sys.exit(0)
+
+
+atexit.register(shutdown_result_publisher)
+
+
 if __name__ == '__main__':
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    
     # Get port from environment (Cloud Run sets PORT automatically)
     port = int(os.environ.get('PORT', 8080))
     
@@ -41,7 +41,7 @@ gcloud builds submit \
 echo "✅ Image built successfully: ${IMAGE_NAME}"
 
 # Prepare environment variables
-ENV_VARS="GCP_PROJECT_ID=${PROJECT_ID}"
+ENV_VARS="GCP_PROJECT_ID=${PROJECT_ID},SIMULATION_RESULT_STORE=gcs"
 if [ -n "$NEO4J_URI" ]; then
     ENV_VARS="${ENV_VARS},NEO4J_URI=${NEO4J_URI}"
 fi
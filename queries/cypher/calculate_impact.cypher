@@ -108,6 +108,18 @@ RETURN vendor_name,
        size(processes) as process_count
 ORDER BY process_count DESC;
 
+// 11b. Multi-vendor failure with union semantics (shared services counted once)
+// Mirrors VendorFailureSimulator.simulate_vendor_failure([...]); query 11 reports per vendor
+MATCH (v:Vendor)<-[:DEPENDS_ON]-(s:Service)
+WHERE v.name IN ['stripe', 'auth0', 'mongodb atlas']
+WITH collect(DISTINCT s) as services
+UNWIND services as s
+OPTIONAL MATCH (s)-[:SUPPORTS]->(bp:BusinessProcess)
+WITH services, collect(DISTINCT bp.name) as processes
+RETURN size(services) as services_affected,
+       processes,
+       reduce(total = 0, svc IN services | total + coalesce(svc.rpm, 0)) as total_rpm;
+
 // 12. Find redundant vendor coverage (good for resilience)
 MATCH (bp:BusinessProcess)<-[:SUPPORTS]-(s:Service)-[:DEPENDS_ON]->(v:Vendor)
 WHERE v.category = 'payment_processor'
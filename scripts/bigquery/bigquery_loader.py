@@ -7,8 +7,9 @@ Usage:
     # Load simulation results
     python scripts/bigquery/bigquery_loader.py --type simulation --data-file data/outputs/simulation_result.json
     
-    # Load discovery results
+    # Load discovery results (JSON, or streamed from gzip NDJSON)
     python scripts/bigquery/bigquery_loader.py --type dependencies --data-file data/outputs/discovered_dependencies.json
+    python scripts/bigquery/bigquery_loader.py --type dependencies --data-file 20240101_000000_discovery.ndjson.gz
 """
 
 import argparse
@@ -16,7 +17,7 @@ import logging
 import sys
 import uuid
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Iterator
 from datetime import datetime
 from google.cloud import bigquery
 from google.cloud.exceptions import NotFound
@@ -29,6 +30,10 @@ from scripts.utils import (
     load_config,
     load_json_file,
 )
+from scripts.gcp.discovery_format import is_ndjson_path, read_discovery_records
+
+# Rows per insert_rows_json request when loading dependencies
+DEPENDENCY_INSERT_BATCH_SIZE = 500
 
 
 def load_simulation_results(
@@ -115,43 +120,108 @@ def load_dependencies(
     Returns:
         Number of rows inserted
     """
-    table_id = f"{project_id}.{dataset_id}.dependencies"
+    source_project_id = discovery_data.get('project_id', project_id)
+    return _insert_dependency_rows(
+        client,
+        f"{project_id}.{dataset_id}.dependencies",
+        source_project_id,
+        discovery_data.get('vendors', [])
+    )
+
+
+def load_dependencies_stream(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    records: Iterator[Dict[str, Any]]
+) -> int:
+    """
+    Load vendor dependencies from streamed NDJSON discovery records
     
-    rows = []
+    Vendors are consumed one record at a time and rows are inserted in
+    batches, so the whole discovery never has to be held in memory.
+    
+    Args:
+        client: BigQuery client
+        project_id: GCP project ID
+        dataset_id: Dataset ID
+        records: Records from read_discovery_records (header first)
+    
+    Returns:
+        Number of rows inserted
+    """
+    header = next(records, {})
+    source_project_id = header.get('project_id', project_id)
+    vendors = (record for record in records if record.get('record_type') == 'vendor')
+    return _insert_dependency_rows(
+        client,
+        f"{project_id}.{dataset_id}.dependencies",
+        source_project_id,
+        vendors
+    )
+
+
+def _insert_dependency_rows(
+    client: bigquery.Client,
+    table_id: str,
+    source_project_id: str,
+    vendors: Iterable[Dict[str, Any]]
+) -> int:
+    """
+    Insert one row per vendor dependency, DEPENDENCY_INSERT_BATCH_SIZE rows at a time
+    
+    Args:
+        client: BigQuery client
+        table_id: Fully-qualified dependencies table ID
+        source_project_id: Project the discovery covers
+        vendors: Vendor entries (each with 'dependencies' or discovery 'resources')
+    
+    Returns:
+        Number of rows inserted
+    """
     discovered_at = datetime.utcnow().isoformat()  # ISO format string for BigQuery
-    source_project_id = discovery_data.get('project_id', project_id)
+    rows = []
+    row_count = 0
+    vendor_count = 0
     
-    # Process vendors and their dependencies
-    vendors = discovery_data.get('vendors', [])
+    def flush():
+        errors = client.insert_rows_json(table_id, rows)
+        if errors:
+            raise Exception(f"BigQuery insert errors: {errors}")
     
+    # Process vendors and their dependencies
     for vendor in vendors:
+        vendor_count += 1
         vendor_name = vendor.get('name', 'Unknown')
-        dependencies = vendor.get('dependencies', [])
+        # Discovery output lists 'resources'; hand-built files use 'dependencies'
+        dependencies = vendor.get('dependencies') or vendor.get('resources', [])
         
         for dep in dependencies:
-            row = {
+            resource_name = dep.get('resource_name', '')
+            rows.append({
                 'vendor_name': vendor_name,
-                'service_name': dep.get('service_name', 'Unknown'),
+                'service_name': dep.get('service_name') or resource_name.split('/')[-1] or 'Unknown',
                 'resource_type': dep.get('resource_type', 'unknown'),
-                'resource_name': dep.get('resource_name', ''),
+                'resource_name': resource_name,
                 'env_variable': dep.get('env_variable'),
                 'project_id': source_project_id,
                 'discovered_at': discovered_at,
-            }
-            rows.append(row)
+            })
+            if len(rows) >= DEPENDENCY_INSERT_BATCH_SIZE:
+                flush()
+                row_count += len(rows)
+                rows = []
+    
+    if rows:
+        flush()
+        row_count += len(rows)
     
-    if not rows:
+    if not row_count:
         logging.warning("No dependencies found in discovery data")
         return 0
     
-    # Insert rows in batches
-    errors = client.insert_rows_json(table_id, rows)
-    
-    if errors:
-        raise Exception(f"BigQuery insert errors: {errors}")
-    
-    logging.info(f"✅ Loaded {len(rows)} dependency records for {len(vendors)} vendors")
-    return len(rows)
+    logging.info(f"✅ Loaded {row_count} dependency records for {vendor_count} vendors")
+    return row_count
 
 
 def main():
@@ -213,14 +283,21 @@ def main():
         logger.info(f"   Dataset: {args.dataset_id}")
         logger.info(f"   File: {args.data_file}")
         
-        # Load data file
-        data = load_json_file(args.data_file)
-        
         # Load based on type
-        if args.type == 'simulation':
-            rows_loaded = load_simulation_results(client, project_id, args.dataset_id, data)
-        elif args.type == 'dependencies':
-            rows_loaded = load_dependencies(client, project_id, args.dataset_id, data)
+        if args.type == 'dependencies' and is_ndjson_path(args.data_file):
+            # Stream-decode compressed NDJSON discovery output
+            with open(args.data_file, 'rb') as f:
+                rows_loaded = load_dependencies_stream(
+                    client, project_id, args.dataset_id, read_discovery_records(f)
+                )
+        else:
+            # Load data file
+            data = load_json_file(args.data_file)
+            
+            if args.type == 'simulation':
+                rows_loaded = load_simulation_results(client, project_id, args.dataset_id, data)
+            elif args.type == 'dependencies':
+                rows_loaded = load_dependencies(client, project_id, args.dataset_id, data)
         
         logger.info("\n" + "="*60)
         logger.info(f"✅ Successfully loaded {rows_loaded} row(s) into BigQuery")
@@ -6,13 +6,21 @@ Creates the necessary BigQuery dataset and tables for storing:
 - Vendor dependencies
 - Historical analytics
 
+Tables are partitioned by day on their event timestamp and clustered by
+vendor_name, so time-bounded and per-vendor queries only scan the matching
+partitions/blocks. Tables created before partitioning was introduced can be
+rebuilt in place with --migrate (pause the loaders first: rows streamed while
+the copy runs would land in the backup table).
+
 Usage:
     python scripts/bigquery/setup_bigquery.py --project-id vendor-risk-digital-twin
+    python scripts/bigquery/setup_bigquery.py --project-id vendor-risk-digital-twin --migrate
 """
 
 import argparse
 import logging
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 from google.cloud import bigquery
 from google.cloud.exceptions import NotFound
@@ -22,6 +30,29 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from scripts.utils import setup_logging
 
+# table -> (day-partitioning TIMESTAMP column, clustering columns)
+TABLE_LAYOUTS = {
+    'simulations': ('timestamp', ['vendor_name']),
+    'dependencies': ('discovered_at', ['vendor_name'])
+}
+
+# Per-vendor daily score rollup, incrementally maintained by BigQuery
+VENDOR_DAILY_SCORES_QUERY = """
+    SELECT
+        DATE(timestamp) as simulation_date,
+        vendor_name,
+        COUNT(*) as simulation_count,
+        AVG(overall_score) as avg_score,
+        MAX(overall_score) as max_score,
+        MIN(overall_score) as min_score,
+        AVG(revenue_loss) as avg_revenue_loss,
+        SUM(revenue_loss) as total_revenue_loss,
+        SUM(customers_affected) as total_customers_affected
+    FROM `{project_id}.{dataset_id}.simulations`
+    GROUP BY simulation_date, vendor_name
+"""
+MATERIALIZED_VIEW_REFRESH_INTERVAL = timedelta(minutes=30)
+
 
 def create_dataset(client: bigquery.Client, project_id: str, dataset_id: str) -> bigquery.Dataset:
     """
@@ -89,6 +120,7 @@ def create_simulations_table(client: bigquery.Client, project_id: str, dataset_i
         
         table = bigquery.Table(table_ref, schema=schema)
         table.description = "Vendor failure simulation results"
+        apply_table_layout(table, 'simulations')
         
         table = client.create_table(table, exists_ok=False)
         logging.info(f"✅ Created table 'simulations'")
@@ -127,12 +159,144 @@ def create_dependencies_table(client: bigquery.Client, project_id: str, dataset_
         
         table = bigquery.Table(table_ref, schema=schema)
         table.description = "Vendor dependencies discovered from GCP resources"
+        apply_table_layout(table, 'dependencies')
         
         table = client.create_table(table, exists_ok=False)
         logging.info(f"✅ Created table 'dependencies'")
         return table
 
 
+def apply_table_layout(table: bigquery.Table, table_name: str) -> None:
+    """
+    Set day partitioning and clustering on a table definition (before creation)
+    
+    Args:
+        table: Table definition
+        table_name: Key in TABLE_LAYOUTS
+    """
+    partition_field, cluster_fields = TABLE_LAYOUTS[table_name]
+    table.time_partitioning = bigquery.TimePartitioning(
+        type_=bigquery.TimePartitioningType.DAY,
+        field=partition_field
+    )
+    table.clustering_fields = cluster_fields
+
+
+def has_table_layout(table: bigquery.Table, table_name: str) -> bool:
+    """Check whether an existing table is partitioned and clustered as in TABLE_LAYOUTS"""
+    partition_field, cluster_fields = TABLE_LAYOUTS[table_name]
+    partitioning = table.time_partitioning
+    return (
+        partitioning is not None
+        and partitioning.field == partition_field
+        and list(table.clustering_fields or []) == cluster_fields
+    )
+
+
+def migrate_table_layout(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    table_name: str,
+    apply: bool = False
+) -> bool:
+    """
+    Bring an existing table to its partitioned/clustered layout
+    
+    Clustering alone can be changed in place. Partitioning cannot, so a new
+    partitioned/clustered table is created from the existing table's schema
+    (keeping column modes and descriptions), filled with INSERT ... SELECT and
+    swapped in by renaming; the original is kept as {table}_unpartitioned_YYYYMMDD.
+    
+    Args:
+        client: BigQuery client
+        project_id: GCP project ID
+        dataset_id: Dataset ID
+        table_name: Key in TABLE_LAYOUTS
+        apply: Perform the migration (otherwise only report what is needed)
+    
+    Returns:
+        True if the table has the target layout afterwards
+    """
+    partition_field, cluster_fields = TABLE_LAYOUTS[table_name]
+    table_id = f"{project_id}.{dataset_id}.{table_name}"
+    table = client.get_table(table_id)
+    
+    if has_table_layout(table, table_name):
+        return True
+    
+    partitioned = table.time_partitioning is not None and table.time_partitioning.field == partition_field
+    if not apply:
+        logging.warning(
+            f"⚠️  Table '{table_name}' is not "
+            f"{'clustered' if partitioned else 'partitioned'} as expected - rerun with --migrate"
+        )
+        return False
+    
+    if partitioned:
+        table.clustering_fields = cluster_fields
+        client.update_table(table, ['clustering_fields'])
+        logging.info(f"✅ Updated clustering of '{table_name}' to {cluster_fields} (applies to new data)")
+        return True
+    
+    staging_name = f"{table_name}__migrated"
+    backup_name = f"{table_name}_unpartitioned_{datetime.utcnow().strftime('%Y%m%d')}"
+    logging.info(f"🔄 Rebuilding '{table_name}' partitioned by DATE({partition_field}), clustered by {cluster_fields}...")
+    
+    staging_id = f"{project_id}.{dataset_id}.{staging_name}"
+    staging = bigquery.Table(staging_id, schema=table.schema)
+    staging.description = table.description
+    staging.labels = table.labels
+    apply_table_layout(staging, table_name)
+    client.create_table(staging)
+    
+    columns = ', '.join(f"`{field.name}`" for field in table.schema)
+    client.query(f"INSERT INTO `{staging_id}` ({columns}) SELECT {columns} FROM `{table_id}`").result()
+    client.query(f"ALTER TABLE `{table_id}` RENAME TO {backup_name}").result()
+    client.query(f"ALTER TABLE `{staging_id}` RENAME TO {table_name}").result()
+    
+    logging.info(f"✅ Migrated '{table_name}' (previous table kept as '{backup_name}')")
+    return True
+
+
+def create_rollup_views(client: bigquery.Client, project_id: str, dataset_id: str) -> None:
+    """
+    Create materialized rollups over the partitioned tables
+    
+    Args:
+        client: BigQuery client
+        project_id: GCP project ID
+        dataset_id: Dataset ID
+    """
+    view_ref = client.dataset(dataset_id, project=project_id).table('vendor_daily_scores')
+    
+    try:
+        client.get_table(view_ref)
+        logging.info(f"✅ Materialized view 'vendor_daily_scores' already exists")
+        return
+    except NotFound:
+        pass
+    
+    # The rollup is partitioned on the base table's partition column
+    if not has_table_layout(client.get_table(f"{project_id}.{dataset_id}.simulations"), 'simulations'):
+        logging.warning("⚠️  Skipping 'vendor_daily_scores' until 'simulations' is partitioned (--migrate)")
+        return
+    
+    view = bigquery.Table(view_ref)
+    view.mview_query = VENDOR_DAILY_SCORES_QUERY.format(project_id=project_id, dataset_id=dataset_id)
+    view.mview_enable_refresh = True
+    view.mview_refresh_interval = MATERIALIZED_VIEW_REFRESH_INTERVAL
+    view.time_partitioning = bigquery.TimePartitioning(
+        type_=bigquery.TimePartitioningType.DAY,
+        field='simulation_date'
+    )
+    view.clustering_fields = ['vendor_name']
+    view.description = "Materialized rollup: per-vendor daily simulation score trends"
+    
+    client.create_table(view, exists_ok=False)
+    logging.info(f"✅ Created materialized view 'vendor_daily_scores'")
+
+
 def create_analytics_views(client: bigquery.Client, project_id: str, dataset_id: str) -> None:
     """
     Create analytics views for common queries
@@ -209,6 +373,11 @@ def main():
         default='vendor_risk',
         help='BigQuery Dataset ID (default: vendor_risk)'
     )
+    parser.add_argument(
+        '--migrate',
+        action='store_true',
+        help='Rebuild existing unpartitioned tables with partitioning and clustering'
+    )
     parser.add_argument(
         '--log-level',
         default='INFO',
@@ -233,8 +402,13 @@ def main():
         create_simulations_table(client, args.project_id, args.dataset_id)
         create_dependencies_table(client, args.project_id, args.dataset_id)
         
+        # Partition/cluster tables created by earlier versions of this script
+        for table_name in TABLE_LAYOUTS:
+            migrate_table_layout(client, args.project_id, args.dataset_id, table_name, apply=args.migrate)
+        
         # Create analytics views
         logger.info("Creating analytics views...")
+        create_rollup_views(client, args.project_id, args.dataset_id)
         create_analytics_views(client, args.project_id, args.dataset_id)
         
         logger.info("\n" + "="*60)
@@ -243,6 +417,7 @@ def main():
         logger.info(f"   Dataset: {args.project_id}.{args.dataset_id}")
         logger.info(f"   Tables: simulations, dependencies")
         logger.info(f"   Views: most_critical_vendors, impact_trends, vendor_dependency_summary")
+        logger.info(f"   Materialized views: vendor_daily_scores")
         logger.info("="*60 + "\n")
         
         return 0
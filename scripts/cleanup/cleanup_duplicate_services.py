@@ -4,10 +4,13 @@ Cleanup Duplicate Services in Neo4j
 Merges duplicate service nodes that have the same GCP resource path but different service_ids.
 This script should be run once to clean up existing duplicates.
 
+Duplicate groups are merged in batched transactions by scripts/neo4j/dedupe.py.
+
 Usage:
-    python scripts/cleanup/cleanup_duplicate_services.py
+    python scripts/cleanup/cleanup_duplicate_services.py [--dry-run] [--batch-size N]
 """
 
+import argparse
 import logging
 import sys
 from pathlib import Path
@@ -17,129 +20,29 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from neo4j import GraphDatabase
 from scripts.utils import setup_logging, load_config, validate_env_vars
+from scripts.neo4j.schema import ensure_schema
+from scripts.neo4j.dedupe import DEFAULT_BATCH_SIZE, merge_duplicates, log_merge_report
 
 logger = logging.getLogger(__name__)
 
 
-def cleanup_duplicate_services(driver):
+def cleanup_duplicate_services(driver, dry_run=False, batch_size=DEFAULT_BATCH_SIZE):
     """
     Merge duplicate services that have the same GCP resource path
     
     Args:
         driver: Neo4j driver instance
+        dry_run: If True, only report what would be merged without making changes
+        batch_size: Duplicates merged per write transaction
     """
     logger.info("🔍 Finding duplicate services (same GCP resource)...")
     
-    with driver.session() as session:
-        # Find all services grouped by GCP resource
-        result = session.run("""
-            MATCH (s:Service)
-            WHERE s.gcp_resource IS NOT NULL AND s.gcp_resource <> ''
-            WITH s.gcp_resource as gcp_resource, collect(s) as services
-            WHERE size(services) > 1
-            RETURN gcp_resource, services
-        """)
-        
-        duplicates = list(result)
-        
-        if not duplicates:
-            logger.info("✅ No duplicate services found!")
-            return
-        
-        logger.info(f"⚠️ Found {len(duplicates)} sets of duplicate services")
-        
-        for record in duplicates:
-            gcp_resource = record['gcp_resource']
-            services = record['services']
-            
-            logger.info(f"\n📋 Merging duplicates for '{gcp_resource}':")
-            for service in services:
-                logger.info(f"   - {service.get('name', 'Unknown')} (service_id: {service.get('service_id', 'N/A')})")
-            
-            # Choose the canonical service (prefer one with more properties set)
-            canonical_service = None
-            max_props = 0
-            for service in services:
-                prop_count = len([k for k in service.keys() if service[k] is not None])
-                if prop_count > max_props:
-                    max_props = prop_count
-                    canonical_service = service
-            
-            if not canonical_service:
-                canonical_service = services[0]
-            
-            canonical_id = canonical_service.id
-            canonical_service_id = canonical_service.get('service_id', 'N/A')
-            
-            logger.info(f"   ✅ Using service_id '{canonical_service_id}' as canonical service")
-            
-            # Merge all relationships and properties to canonical service
-            # Then delete duplicates
-            for service in services:
-                if service.id == canonical_id:
-                    continue
-                
-                service_name = service.get('name', 'Unknown')
-                service_id = service.get('service_id', 'N/A')
-                
-                # Merge DEPENDS_ON relationships
-                session.run("""
-                    MATCH (duplicate:Service)
-                    WHERE id(duplicate) = $duplicate_id
-                    MATCH (canonical:Service)
-                    WHERE id(canonical) = $canonical_id
-                    OPTIONAL MATCH (duplicate)-[r1:DEPENDS_ON]->(v:Vendor)
-                    WITH canonical, duplicate, v, r1
-                    WHERE v IS NOT NULL
-                    MERGE (canonical)-[:DEPENDS_ON]->(v)
-                    DELETE r1
-                """, duplicate_id=service.id, canonical_id=canonical_id)
-                
-                # Merge SUPPORTS relationships
-                session.run("""
-                    MATCH (duplicate:Service)
-                    WHERE id(duplicate) = $duplicate_id
-                    MATCH (canonical:Service)
-                    WHERE id(canonical) = $canonical_id
-                    OPTIONAL MATCH (duplicate)-[r2:SUPPORTS]->(bp:BusinessProcess)
-                    WITH canonical, duplicate, bp, r2
-                    WHERE bp IS NOT NULL
-                    MERGE (canonical)-[:SUPPORTS]->(bp)
-                    DELETE r2
-                """, duplicate_id=service.id, canonical_id=canonical_id)
-                
-                # Update canonical service with best properties
-                session.run("""
-                    MATCH (duplicate:Service)
-                    WHERE id(duplicate) = $duplicate_id
-                    MATCH (canonical:Service)
-                    WHERE id(canonical) = $canonical_id
-                    
-                    SET canonical.gcp_resource = $gcp_resource,
-                        canonical.name = COALESCE(canonical.name, duplicate.name),
-                        canonical.service_id = COALESCE(canonical.service_id, duplicate.service_id),
-                        canonical.type = COALESCE(canonical.type, duplicate.type),
-                        canonical.rpm = COALESCE(canonical.rpm, duplicate.rpm),
-                        canonical.customers_affected = COALESCE(canonical.customers_affected, duplicate.customers_affected)
-                """, duplicate_id=service.id, canonical_id=canonical_id, gcp_resource=gcp_resource)
-                
-                # Delete duplicate
-                session.run("""
-                    MATCH (duplicate:Service)
-                    WHERE id(duplicate) = $duplicate_id
-                    DETACH DELETE duplicate
-                """, duplicate_id=service.id)
-                
-                logger.info(f"   🗑️  Deleted duplicate: '{service_name}' (service_id: {service_id})")
-            
-            # Ensure canonical service has gcp_resource set
-            session.run("""
-                MATCH (s:Service)
-                WHERE id(s) = $canonical_id
-                SET s.gcp_resource = $gcp_resource
-            """, canonical_id=canonical_id, gcp_resource=gcp_resource)
-        
+    report = merge_duplicates(driver, 'service', dry_run=dry_run, batch_size=batch_size)
+    log_merge_report(report)
+    
+    if not dry_run and report['groups']:
         logger.info("\n✅ Duplicate cleanup complete!")
+    return report
 
 
 def verify_cleanup(driver):
@@ -189,6 +92,21 @@ def verify_cleanup(driver):
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Merge duplicate service nodes that share a GCP resource path'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Show what would be merged without making changes'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        help='Duplicates merged per transaction (default: neo4j.batch_size from config.yaml)'
+    )
+    args = parser.parse_args()
+    
     setup_logging('INFO')
     
     # Validate environment
@@ -208,8 +126,14 @@ def main():
     
     try:
         logger.info("🔧 Starting duplicate service cleanup...")
-        cleanup_duplicate_services(driver)
+        batch_size = args.batch_size or neo4j_config.get('batch_size', DEFAULT_BATCH_SIZE)
+        cleanup_duplicate_services(driver, dry_run=args.dry_run, batch_size=batch_size)
+        if args.dry_run:
+            return 0
         verify_cleanup(driver)
+        
+        # With duplicates merged, uniqueness constraints can now be created
+        ensure_schema(driver)
         return 0
     except Exception as e:
         logger.error(f"❌ Cleanup failed: {e}", exc_info=True)
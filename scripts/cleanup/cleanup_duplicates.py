@@ -4,10 +4,13 @@ Cleanup Duplicate Vendors in Neo4j
 Merges duplicate vendor nodes that differ only by case (e.g., "Stripe" and "stripe").
 This script should be run once to clean up existing duplicates before reloading data.
 
+Duplicate groups are merged in batched transactions by scripts/neo4j/dedupe.py.
+
 Usage:
-    python scripts/cleanup/cleanup_duplicates.py
+    python scripts/cleanup/cleanup_duplicates.py [--dry-run] [--batch-size N]
 """
 
+import argparse
 import logging
 import sys
 from pathlib import Path
@@ -17,136 +20,42 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from neo4j import GraphDatabase
 from scripts.utils import setup_logging, load_config, validate_env_vars
+from scripts.neo4j.schema import ensure_schema
+from scripts.neo4j.dedupe import DEFAULT_BATCH_SIZE, merge_duplicates, log_merge_report
 
 logger = logging.getLogger(__name__)
 
 
-def cleanup_duplicate_vendors(driver):
+def cleanup_duplicate_vendors(driver, dry_run=False, batch_size=DEFAULT_BATCH_SIZE):
     """
     Merge duplicate vendors that differ only by case
     
     Args:
         driver: Neo4j driver instance
+        dry_run: If True, only report what would be merged without making changes
+        batch_size: Duplicates merged per write transaction
     """
     logger.info("🔍 Finding duplicate vendors (case variations)...")
     
+    report = merge_duplicates(driver, 'vendor', dry_run=dry_run, batch_size=batch_size)
+    log_merge_report(report)
+    
+    if dry_run:
+        return report
+    
+    # Normalize all remaining vendors to lowercase (even if they weren't duplicates)
+    logger.info("\n🔄 Normalizing all vendor names to lowercase...")
     with driver.session() as session:
-        # Find all vendors grouped by lowercase name
-        result = session.run("""
-            MATCH (v:Vendor)
-            WITH toLower(v.name) as normalized_name, collect(v) as vendors
-            WHERE size(vendors) > 1
-            RETURN normalized_name, vendors
-        """)
-        
-        duplicates = list(result)
-        
-        if not duplicates:
-            logger.info("✅ No duplicate vendors found!")
-            return
-        
-        logger.info(f"⚠️ Found {len(duplicates)} sets of duplicate vendors")
-        
-        for record in duplicates:
-            normalized_name = record['normalized_name']
-            vendors = record['vendors']
-            
-            logger.info(f"\n📋 Merging duplicates for '{normalized_name}':")
-            for vendor in vendors:
-                logger.info(f"   - {vendor['name']} (id: {vendor.id})")
-            
-            # Choose the canonical vendor (prefer one with display_name, or first one)
-            canonical_vendor = None
-            for vendor in vendors:
-                if 'display_name' in vendor:
-                    canonical_vendor = vendor
-                    break
-            if not canonical_vendor:
-                canonical_vendor = vendors[0]
-            
-            canonical_name = canonical_vendor['name']
-            canonical_id = canonical_vendor.id
-            
-            logger.info(f"   ✅ Using '{canonical_name}' as canonical vendor")
-            
-            # Merge all relationships and properties to canonical vendor
-            # Then delete duplicates
-            for vendor in vendors:
-                if vendor.id == canonical_id:
-                    continue
-                
-                vendor_name = vendor['name']
-                
-                # Merge DEPENDS_ON relationships
-                session.run("""
-                    MATCH (duplicate:Vendor)
-                    WHERE id(duplicate) = $duplicate_id
-                    MATCH (canonical:Vendor)
-                    WHERE id(canonical) = $canonical_id
-                    OPTIONAL MATCH (s:Service)-[r1:DEPENDS_ON]->(duplicate)
-                    WITH canonical, duplicate, s, r1
-                    WHERE s IS NOT NULL
-                    MERGE (s)-[:DEPENDS_ON]->(canonical)
-                    DELETE r1
-                """, duplicate_id=vendor.id, canonical_id=canonical_id)
-                
-                # Merge SATISFIES relationships
-                session.run("""
-                    MATCH (duplicate:Vendor)
-                    WHERE id(duplicate) = $duplicate_id
-                    MATCH (canonical:Vendor)
-                    WHERE id(canonical) = $canonical_id
-                    OPTIONAL MATCH (duplicate)-[r2:SATISFIES]->(cc:ComplianceControl)
-                    WITH canonical, duplicate, cc, r2
-                    WHERE cc IS NOT NULL
-                    MERGE (canonical)-[:SATISFIES]->(cc)
-                    DELETE r2
-                """, duplicate_id=vendor.id, canonical_id=canonical_id)
-                
-                # Update canonical vendor with best properties
-                session.run("""
-                    MATCH (duplicate:Vendor)
-                    WHERE id(duplicate) = $duplicate_id
-                    MATCH (canonical:Vendor)
-                    WHERE id(canonical) = $canonical_id
-                    
-                    SET canonical.name = $normalized_name,
-                        canonical.display_name = COALESCE(canonical.display_name, $canonical_name),
-                        canonical.vendor_id = COALESCE(canonical.vendor_id, duplicate.vendor_id),
-                        canonical.category = COALESCE(canonical.category, duplicate.category),
-                        canonical.criticality = COALESCE(canonical.criticality, duplicate.criticality)
-                """, duplicate_id=vendor.id, canonical_id=canonical_id,
-                    normalized_name=normalized_name, canonical_name=canonical_name)
-                
-                # Delete duplicate
-                session.run("""
-                    MATCH (duplicate:Vendor)
-                    WHERE id(duplicate) = $duplicate_id
-                    DETACH DELETE duplicate
-                """, duplicate_id=vendor.id)
-                
-                logger.info(f"   🗑️  Deleted duplicate: '{vendor_name}'")
-            
-            # Ensure canonical vendor has normalized name (lowercase)
-            session.run("""
-                MATCH (v:Vendor)
-                WHERE id(v) = $canonical_id
-                SET v.name = $normalized_name,
-                    v.display_name = COALESCE(v.display_name, $canonical_name)
-            """, canonical_id=canonical_id, normalized_name=normalized_name, 
-                canonical_name=canonical_name)
-        
-        # Normalize all remaining vendors to lowercase (even if they weren't duplicates)
-        logger.info("\n🔄 Normalizing all vendor names to lowercase...")
         session.run("""
             MATCH (v:Vendor)
             WHERE v.name <> toLower(v.name)
             SET v.display_name = COALESCE(v.display_name, v.name),
                 v.name = toLower(v.name)
-        """)
-        logger.info("✅ All vendor names normalized")
-        
-        logger.info("\n✅ Duplicate cleanup complete!")
+        """).consume()
+    logger.info("✅ All vendor names normalized")
+    
+    logger.info("\n✅ Duplicate cleanup complete!")
+    return report
 
 
 def verify_cleanup(driver):
@@ -194,6 +103,21 @@ def verify_cleanup(driver):
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Merge duplicate vendor nodes that differ only by case'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Show what would be merged without making changes'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        help='Duplicates merged per transaction (default: neo4j.batch_size from config.yaml)'
+    )
+    args = parser.parse_args()
+    
     setup_logging('INFO')
     
     # Validate environment
@@ -213,8 +137,14 @@ def main():
     
     try:
         logger.info("🔧 Starting duplicate vendor cleanup...")
-        cleanup_duplicate_vendors(driver)
+        batch_size = args.batch_size or neo4j_config.get('batch_size', DEFAULT_BATCH_SIZE)
+        cleanup_duplicate_vendors(driver, dry_run=args.dry_run, batch_size=batch_size)
+        if args.dry_run:
+            return 0
         verify_cleanup(driver)
+        
+        # With duplicates merged, uniqueness constraints can now be created
+        ensure_schema(driver)
         return 0
     except Exception as e:
         logger.error(f"❌ Cleanup failed: {e}", exc_info=True)
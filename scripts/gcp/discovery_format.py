@@ -0,0 +1,147 @@
+"""
+Discovery Result Format
+
+Discovery results can be stored as pretty-printed JSON (*_discovery.json) or
+as gzip-compressed newline-delimited JSON (*_discovery.ndjson.gz). The NDJSON
+form starts with a header record holding the scalar fields (project_id,
+discovery_timestamp, errors, ...), followed by one record per Cloud Function,
+Cloud Run service and vendor:
+
+    {"record_type": "header", "format": "vendor-discovery-ndjson", "version": 1, ...}
+    {"record_type": "cloud_function", "name": "...", ...}
+    {"record_type": "cloud_run_service", "name": "...", ...}
+    {"record_type": "vendor", "name": "Stripe", "resources": [...], ...}
+
+Readers decode it record by record from a (possibly remote) byte stream, so
+neither the compressed blob nor its decoded text is held in memory at once.
+
+Shared by the discovery and graph_loader Cloud Functions (staged next to
+main.py at deploy time) and the scripts under scripts/.
+"""
+
+import gzip
+import io
+import json
+from typing import Dict, Any, Iterator, Iterable, IO
+
+FORMAT_NAME = 'vendor-discovery-ndjson'
+FORMAT_VERSION = 1
+
+NDJSON_SUFFIX = '_discovery.ndjson.gz'
+JSON_SUFFIX = '_discovery.json'
+NDJSON_CONTENT_TYPE = 'application/gzip'
+
+# Result list key -> record type
+LIST_RECORD_TYPES = {
+    'cloud_functions': 'cloud_function',
+    'cloud_run_services': 'cloud_run_service',
+    'vendors': 'vendor'
+}
+RECORD_LIST_KEYS = {record_type: key for key, record_type in LIST_RECORD_TYPES.items()}
+
+
+def is_ndjson_path(path: str) -> bool:
+    """Check whether a blob name or file path uses the NDJSON format"""
+    return path.endswith('.ndjson.gz')
+
+
+def iter_discovery_records(results: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Split a discovery results dictionary into NDJSON records
+
+    Args:
+        results: Discovery results dictionary
+
+    Yields:
+        Header record, then one record per resource and vendor
+    """
+    header = {
+        key: value for key, value in results.items()
+        if key not in LIST_RECORD_TYPES
+    }
+    header.update({
+        'record_type': 'header',
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'counts': {key: len(results.get(key, [])) for key in LIST_RECORD_TYPES}
+    })
+    yield header
+
+    for key, record_type in LIST_RECORD_TYPES.items():
+        for item in results.get(key, []):
+            yield {'record_type': record_type, **item}
+
+
+def write_discovery_ndjson(results: Dict[str, Any], fileobj: IO[bytes]) -> None:
+    """
+    Write discovery results as gzip-compressed NDJSON
+
+    Args:
+        results: Discovery results dictionary
+        fileobj: Binary file object to write to (e.g. blob.open('wb'))
+    """
+    with gzip.GzipFile(fileobj=fileobj, mode='wb') as gz:
+        for record in iter_discovery_records(results):
+            gz.write(json.dumps(record, separators=(',', ':')).encode('utf-8'))
+            gz.write(b'\n')
+
+
+def read_discovery_records(fileobj: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream-decode gzip-compressed NDJSON discovery records
+
+    Args:
+        fileobj: Binary file object positioned at the start of the gzip stream
+
+    Yields:
+        Decoded records (header first)
+    """
+    with gzip.GzipFile(fileobj=fileobj, mode='rb') as gz:
+        for line_number, line in enumerate(io.TextIOWrapper(gz, encoding='utf-8'), start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if line_number == 1:
+                if record.get('record_type') != 'header' or record.get('format') != FORMAT_NAME:
+                    raise ValueError("Not a discovery NDJSON stream (missing header record)")
+                if record.get('version', 0) > FORMAT_VERSION:
+                    raise ValueError(f"Unsupported discovery format version: {record.get('version')}")
+            yield record
+
+
+def assemble_discovery(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Rebuild the discovery results dictionary from NDJSON records
+
+    Args:
+        records: Records from read_discovery_records
+
+    Returns:
+        Discovery results dictionary (same shape as the JSON format)
+    """
+    results = {key: [] for key in LIST_RECORD_TYPES}
+    for record in records:
+        record_type = record.pop('record_type', None)
+        if record_type == 'header':
+            for key in ('format', 'version', 'counts'):
+                record.pop(key, None)
+            results.update(record)
+        elif record_type in RECORD_LIST_KEYS:
+            results[RECORD_LIST_KEYS[record_type]].append(record)
+    return results
+
+
+def load_discovery_file(file_path: str) -> Dict[str, Any]:
+    """
+    Load a local discovery results file in either format
+
+    Args:
+        file_path: Path to a *.json or *.ndjson.gz file
+
+    Returns:
+        Discovery results dictionary
+    """
+    with open(file_path, 'rb') as f:
+        if is_ndjson_path(file_path):
+            return assemble_discovery(read_discovery_records(f))
+        return json.load(f)
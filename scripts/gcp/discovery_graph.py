@@ -0,0 +1,704 @@
+"""
+Discovery to Graph Conversion and Write Plan
+
+One converter and one set of UNWIND write queries shared by both paths that
+load discovery results into Neo4j: scripts/neo4j/load_graph.py (via
+scripts/gcp/fetch_discovery_results.py) and the graph_loader Cloud Function
+(staged next to main.py at deploy time). Both therefore use the same
+identity keys and never create parallel nodes for the same resource:
+
+    Vendor           name = lowercased, stripped vendor name
+    Service          gcp_resource = full resource name
+                     (projects/P/locations/L/functions|services/NAME)
+    BusinessProcess  name
+
+A write plan groups converted vendors into deduplicated parameter rows (a
+service referenced by several vendors is one row carrying all of them), which
+are written with one UNWIND statement per node label / relationship type in
+chunked transactions. Incremental sync writes the same plan restricted to
+services whose fingerprint changed.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default rows per UNWIND write transaction
+DEFAULT_BATCH_SIZE = 1000
+
+# Vendor metadata (you can extend this with actual vendor data)
+VENDOR_METADATA = {
+    'Stripe': {
+        'category': 'payment_processor',
+        'criticality': 'critical',
+        'business_processes': ['checkout', 'refunds', 'subscription_billing'],
+        'rpm': 500,
+        'customers_affected': 50000
+    },
+    'Auth0': {
+        'category': 'authentication',
+        'criticality': 'critical',
+        'business_processes': ['user_login', 'user_registration', 'password_reset'],
+        'rpm': 300,
+        'customers_affected': 100000
+    },
+    'SendGrid': {
+        'category': 'email_service',
+        'criticality': 'high',
+        'business_processes': ['email_notifications', 'transactional_emails'],
+        'rpm': 200,
+        'customers_affected': 25000
+    },
+    'Twilio': {
+        'category': 'communication',
+        'criticality': 'high',
+        'business_processes': ['sms_notifications', '2fa_verification'],
+        'rpm': 150,
+        'customers_affected': 30000
+    },
+    'Datadog': {
+        'category': 'monitoring',
+        'criticality': 'medium',
+        'business_processes': ['system_monitoring', 'alerting'],
+        'rpm': 100,
+        'customers_affected': 0
+    },
+    'MongoDB': {
+        'category': 'database',
+        'criticality': 'critical',
+        'business_processes': ['data_storage', 'data_retrieval'],
+        'rpm': 1000,
+        'customers_affected': 0
+    },
+    'PayPal': {
+        'category': 'payment_processor',
+        'criticality': 'critical',
+        'business_processes': ['checkout', 'refunds'],
+        'rpm': 400,
+        'customers_affected': 40000
+    },
+    'Okta': {
+        'category': 'authentication',
+        'criticality': 'critical',
+        'business_processes': ['sso', 'user_management'],
+        'rpm': 250,
+        'customers_affected': 80000
+    }
+}
+
+DEFAULT_VENDOR_METADATA = {
+    'category': 'unknown',
+    'criticality': 'medium',
+    'business_processes': ['general'],
+    'rpm': 100,
+    'customers_affected': 0
+}
+
+# Lowercase name -> canonical vendor name
+CANONICAL_VENDOR_NAMES = {name.lower(): name for name in VENDOR_METADATA}
+
+
+def build_resource_index(resources: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Index discovered functions or services by full name and by short name
+    
+    Args:
+        resources: 'cloud_functions' or 'cloud_run_services' from discovery results
+    
+    Returns:
+        Dictionary mapping both the full resource name and its last path
+        segment to the resource (full names win, then the first resource listed)
+    """
+    index = {}
+    for resource in resources:
+        index.setdefault(resource.get('name', ''), resource)
+    for resource in resources:
+        index.setdefault(resource.get('name', '').rsplit('/', 1)[-1], resource)
+    return index
+
+
+def service_resource_path(resource_name: str, resource_type: str, project_id: str, region: str) -> str:
+    """
+    Get the GCP resource path that identifies a Service node
+    
+    Args:
+        resource_name: Resource name from discovery (full path or short name)
+        resource_type: 'cloud_function', 'cloud_run' or other
+        project_id: GCP project ID
+        region: Region assumed for short names
+    
+    Returns:
+        Full resource path
+    """
+    if resource_name.startswith('projects/'):
+        return resource_name
+    if resource_type == 'cloud_function':
+        return f"projects/{project_id}/locations/{region}/functions/{resource_name}"
+    if resource_type == 'cloud_run':
+        return f"projects/{project_id}/locations/{region}/services/{resource_name}"
+    return f"projects/{project_id}/resources/{resource_name}"
+
+
+def stable_service_id(gcp_resource: str) -> str:
+    """Derive a service_id that is the same on every run for the same resource"""
+    return f"svc_{hashlib.sha1(gcp_resource.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _vendor_resources(vendor_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Vendor resources from discovery ('resources', or legacy 'dependencies' entries)"""
+    if 'resources' in vendor_info:
+        return vendor_info['resources']
+    return [
+        {'resource_name': dep.get('service_name', 'unknown'), 'resource_type': dep.get('resource_type', 'unknown')}
+        for dep in vendor_info.get('dependencies', [])
+    ]
+
+
+def iter_neo4j_vendors(discovery_results: Dict[str, Any], project_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Convert discovery results to Neo4j load format, one vendor at a time
+    
+    Functions and services are indexed once up front, so resolving a vendor
+    resource to its environment variables is a dictionary lookup.
+    
+    Args:
+        discovery_results: Raw discovery results from Cloud Function
+        project_id: GCP project ID
+    
+    Yields:
+        Vendor dictionaries in the format expected by load_graph.py
+    """
+    region = discovery_results.get('region', 'us-central1')
+    resource_indexes = {
+        'cloud_function': build_resource_index(discovery_results.get('cloud_functions', [])),
+        'cloud_run': build_resource_index(discovery_results.get('cloud_run_services', []))
+    }
+    
+    # Normalize vendor names (case-insensitive) and merge their resources
+    normalized_vendors = {}
+    for vendor_info in discovery_results.get('vendors', []):
+        vendor_name = vendor_info.get('name', 'Unknown')
+        normalized_name = vendor_name.lower().strip()
+        
+        vendor_data = normalized_vendors.setdefault(normalized_name, {
+            # Prefer the casing from vendor metadata, else the first occurrence
+            'name': CANONICAL_VENDOR_NAMES.get(normalized_name, vendor_name),
+            'resources': []
+        })
+        vendor_data['resources'].extend(_vendor_resources(vendor_info))
+    
+    for normalized_name, vendor_data in normalized_vendors.items():
+        vendor_name = vendor_data['name']
+        metadata = VENDOR_METADATA.get(vendor_name, DEFAULT_VENDOR_METADATA)
+        
+        # Use normalized name for vendor_id to ensure uniqueness
+        vendor_id = f"vendor_{normalized_name.replace(' ', '_').replace('-', '_')}"
+        
+        # Create services from resources - one per GCP resource path
+        services = []
+        seen_gcp_resources = set()
+        
+        for resource in vendor_data['resources']:
+            resource_name = resource.get('resource_name', 'unknown')
+            resource_type = resource.get('resource_type', 'unknown')
+            
+            gcp_resource = service_resource_path(resource_name, resource_type, project_id, region)
+            if gcp_resource in seen_gcp_resources:
+                continue
+            seen_gcp_resources.add(gcp_resource)
+            
+            # Get environment variables from the matching discovered function/service
+            env_vars = []
+            index = resource_indexes.get(resource_type)
+            if index is not None:
+                discovered = index.get(resource_name) or index.get(resource_name.rsplit('/', 1)[-1])
+                if discovered is not None:
+                    env_vars = list(discovered.get('environment_variables', {}).keys())
+            
+            services.append({
+                'service_id': stable_service_id(gcp_resource),
+                'name': gcp_resource.rsplit('/', 1)[-1],  # Short name, not full path
+                'type': resource_type,
+                'gcp_resource': gcp_resource,
+                'environment_variables': env_vars,
+                'business_processes': metadata['business_processes'],
+                'rpm': metadata['rpm'],
+                'customers_affected': metadata['customers_affected']
+            })
+        
+        # If no resources found, create a placeholder service
+        if not services:
+            gcp_resource = f"projects/{project_id}/resources/{vendor_name.lower()}-service"
+            services.append({
+                'service_id': stable_service_id(gcp_resource),
+                'name': f"{vendor_name.lower()}-service",
+                'type': 'unknown',
+                'gcp_resource': gcp_resource,
+                'environment_variables': [],
+                'business_processes': metadata['business_processes'],
+                'rpm': metadata['rpm'],
+                'customers_affected': metadata['customers_affected']
+            })
+        
+        yield {
+            'vendor_id': vendor_id,
+            'name': vendor_name,
+            'category': metadata['category'],
+            'criticality': metadata['criticality'],
+            'services': services
+        }
+
+
+def convert_to_neo4j_format(discovery_results: Dict[str, Any], project_id: str) -> Dict[str, Any]:
+    """
+    Convert discovery results to Neo4j load format
+    
+    Args:
+        discovery_results: Raw discovery results from Cloud Function
+        project_id: GCP project ID
+    
+    Returns:
+        Dictionary in format expected by load_graph.py
+    """
+    logger.info("Converting discovery results to Neo4j format...")
+    
+    vendors = []
+    service_count = 0
+    cloud_functions_count = 0
+    cloud_run_services_count = 0
+    for vendor in iter_neo4j_vendors(discovery_results, project_id):
+        vendors.append(vendor)
+        for service in vendor['services']:
+            service_count += 1
+            if service['type'] == 'cloud_function':
+                cloud_functions_count += 1
+            elif service['type'] == 'cloud_run':
+                cloud_run_services_count += 1
+    
+    # Fall back to counts from the original discovery results
+    original_cf_count = len(discovery_results.get('cloud_functions', []))
+    original_cr_count = len(discovery_results.get('cloud_run_services', []))
+    
+    result = {
+        'vendors': vendors,
+        'discovery_metadata': {
+            'discovery_timestamp': discovery_results.get('discovery_timestamp'),
+            'project_id': project_id,
+            'source': 'gcp_discovery',
+            'cloud_functions_count': cloud_functions_count or original_cf_count,
+            'cloud_run_services_count': cloud_run_services_count or original_cr_count
+        }
+    }
+    
+    logger.info(f"✅ Converted {len(vendors)} vendors with {service_count} services")
+    return result
+
+
+# Write plan queries (one UNWIND statement per node label / relationship type).
+# Discovery syncs pass discovery_project / fingerprint; other loads pass null and
+# leave those properties untouched. Discovery syncs also overwrite the service
+# properties the fingerprint covers, so a stored fingerprint always describes the
+# stored values; other loads only fill missing values. Relationship rows are the
+# service rows, which carry the vendors and business processes of each service.
+MERGE_VENDORS_QUERY = """
+UNWIND $rows AS row
+MERGE (v:Vendor {name: row.normalized_name})
+ON CREATE SET v.vendor_id = row.vendor_id,
+    v.category = row.category,
+    v.criticality = row.criticality,
+    v.display_name = row.display_name
+ON MATCH SET v.vendor_id = COALESCE(v.vendor_id, row.vendor_id),
+             v.category = COALESCE(v.category, row.category),
+             v.criticality = COALESCE(v.criticality, row.criticality),
+             v.display_name = COALESCE(v.display_name, row.display_name)
+"""
+
+MERGE_SERVICES_BY_RESOURCE_QUERY = """
+UNWIND $rows AS row
+MERGE (s:Service {gcp_resource: row.gcp_resource})
+ON CREATE SET s.service_id = row.service_id,
+    s.name = row.name,
+    s.type = row.type,
+    s.rpm = row.rpm,
+    s.customers_affected = row.customers_affected
+ON MATCH SET s.service_id = COALESCE(s.service_id, row.service_id),
+             s.name = COALESCE(s.name, row.name),
+             s.type = COALESCE(s.type, row.type),
+             s.rpm = COALESCE(s.rpm, row.rpm),
+             s.customers_affected = COALESCE(s.customers_affected, row.customers_affected)
+SET s.discovery_project = COALESCE(row.discovery_project, s.discovery_project),
+    s.discovery_fingerprint = COALESCE(row.fingerprint, s.discovery_fingerprint)
+FOREACH (_ IN CASE WHEN row.fingerprint IS NULL THEN [] ELSE [1] END |
+    SET s.name = row.name,
+        s.type = row.type,
+        s.rpm = row.rpm,
+        s.customers_affected = row.customers_affected
+)
+"""
+
+MERGE_SERVICES_BY_ID_QUERY = """
+UNWIND $rows AS row
+MERGE (s:Service {service_id: row.service_id})
+ON CREATE SET s.name = row.name,
+    s.type = row.type,
+    s.rpm = row.rpm,
+    s.customers_affected = row.customers_affected
+ON MATCH SET s.name = COALESCE(s.name, row.name),
+             s.type = COALESCE(s.type, row.type),
+             s.rpm = COALESCE(s.rpm, row.rpm),
+             s.customers_affected = COALESCE(s.customers_affected, row.customers_affected)
+"""
+
+MERGE_BUSINESS_PROCESSES_QUERY = """
+UNWIND $rows AS row
+MERGE (bp:BusinessProcess {name: row.name})
+"""
+
+LINK_VENDOR_SERVICE_BY_RESOURCE_QUERY = """
+UNWIND $rows AS row
+MATCH (s:Service {gcp_resource: row.gcp_resource})
+UNWIND row.vendors AS vendor_name
+MATCH (v:Vendor {name: vendor_name})
+MERGE (s)-[r:DEPENDS_ON]->(v)
+SET r.discovery_project = COALESCE(row.discovery_project, r.discovery_project)
+"""
+
+LINK_VENDOR_SERVICE_BY_ID_QUERY = """
+UNWIND $rows AS row
+MATCH (s:Service {service_id: row.service_id})
+UNWIND row.vendors AS vendor_name
+MATCH (v:Vendor {name: vendor_name})
+MERGE (s)-[:DEPENDS_ON]->(v)
+"""
+
+LINK_SERVICE_PROCESS_BY_RESOURCE_QUERY = """
+UNWIND $rows AS row
+MATCH (s:Service {gcp_resource: row.gcp_resource})
+UNWIND row.business_processes AS process_name
+MATCH (bp:BusinessProcess {name: process_name})
+MERGE (s)-[r:SUPPORTS]->(bp)
+SET r.discovery_project = COALESCE(row.discovery_project, r.discovery_project)
+"""
+
+LINK_SERVICE_PROCESS_BY_ID_QUERY = """
+UNWIND $rows AS row
+MATCH (s:Service {service_id: row.service_id})
+UNWIND row.business_processes AS process_name
+MATCH (bp:BusinessProcess {name: process_name})
+MERGE (s)-[:SUPPORTS]->(bp)
+"""
+
+BUMP_GRAPH_VERSION_QUERY = """
+MERGE (m:GraphMeta {id: 'dependency_graph'})
+SET m.version = randomUUID(),
+    m.updated_at = datetime()
+"""
+
+# (plan key, log label, query) - nodes first, then relationships (MATCH needs both endpoints)
+WRITE_STEPS = [
+    ('vendors', 'vendors', MERGE_VENDORS_QUERY),
+    ('services', 'services', MERGE_SERVICES_BY_RESOURCE_QUERY),
+    ('services_by_id', 'services (by service_id)', MERGE_SERVICES_BY_ID_QUERY),
+    ('business_processes', 'business processes', MERGE_BUSINESS_PROCESSES_QUERY),
+    ('services', 'DEPENDS_ON', LINK_VENDOR_SERVICE_BY_RESOURCE_QUERY),
+    ('services_by_id', 'DEPENDS_ON (by service_id)', LINK_VENDOR_SERVICE_BY_ID_QUERY),
+    ('services', 'SUPPORTS', LINK_SERVICE_PROCESS_BY_RESOURCE_QUERY),
+    ('services_by_id', 'SUPPORTS (by service_id)', LINK_SERVICE_PROCESS_BY_ID_QUERY)
+]
+
+# Incremental sync queries. Everything a sync writes carries discovery_project,
+# so only discovery-managed services and edges are ever removed. The removal
+# queries return the vendors they cut edges from; those left without any
+# relationship are deleted by SYNC_REMOVE_ORPHANED_VENDORS_QUERY.
+EXISTING_FINGERPRINTS_QUERY = """
+MATCH (s:Service {discovery_project: $project_id})
+RETURN s.gcp_resource as gcp_resource, s.discovery_fingerprint as fingerprint
+"""
+
+SYNC_REMOVE_STALE_EDGES_QUERY = """
+UNWIND $rows AS row
+MATCH (s:Service {gcp_resource: row.gcp_resource})-[r:DEPENDS_ON|SUPPORTS]->(n)
+WHERE r.discovery_project = $project_id
+  AND NOT (type(r) = 'DEPENDS_ON' AND n.name IN row.vendors)
+  AND NOT (type(r) = 'SUPPORTS' AND n.name IN row.business_processes)
+DELETE r
+WITH DISTINCT n
+WHERE n:Vendor
+RETURN n.name as vendor_name
+"""
+
+SYNC_REMOVE_SERVICES_QUERY = """
+UNWIND $resources AS gcp_resource
+MATCH (s:Service {gcp_resource: gcp_resource, discovery_project: $project_id})
+OPTIONAL MATCH (s)-[r:DEPENDS_ON|SUPPORTS]->(n)
+WHERE r.discovery_project = $project_id
+DELETE r
+WITH s, collect(CASE WHEN n:Vendor THEN n.name END) AS vendor_names
+REMOVE s.discovery_project, s.discovery_fingerprint
+FOREACH (_ IN CASE WHEN EXISTS { (s)--() } THEN [] ELSE [1] END | DELETE s)
+WITH vendor_names
+UNWIND vendor_names AS vendor_name
+RETURN DISTINCT vendor_name
+"""
+
+# Services written by earlier loader versions, which keyed them by service_id only
+SYNC_REMOVE_LEGACY_SERVICES_QUERY = """
+MATCH (s:Service {discovery_project: $project_id})
+WHERE s.gcp_resource IS NULL
+OPTIONAL MATCH (s)-[r:DEPENDS_ON]->(v:Vendor)
+WHERE r.discovery_project = $project_id
+DELETE r
+WITH s, collect(v.name) AS vendor_names
+REMOVE s.discovery_project, s.discovery_fingerprint
+FOREACH (_ IN CASE WHEN EXISTS { (s)--() } THEN [] ELSE [1] END | DELETE s)
+WITH vendor_names
+UNWIND vendor_names AS vendor_name
+RETURN DISTINCT vendor_name
+"""
+
+SYNC_REMOVE_ORPHANED_VENDORS_QUERY = """
+UNWIND $names AS name
+MATCH (v:Vendor {name: name})
+WHERE NOT EXISTS { (v)--() }
+DELETE v
+RETURN count(*) as removed
+"""
+
+
+def _coalesce_into(target: Dict[str, Any], row: Dict[str, Any]) -> None:
+    """Fill missing values of target from row (COALESCE semantics of the MERGE queries)"""
+    for key, value in row.items():
+        if target.get(key) is None:
+            target[key] = value
+
+
+def build_write_plan(vendors: Iterable[Dict[str, Any]], project_id: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Group vendors into deduplicated UNWIND parameter rows
+    
+    Args:
+        vendors: Vendor dictionaries in Neo4j load format (any iterable,
+            e.g. iter_neo4j_vendors)
+        project_id: Discovery project; when given, service rows carry
+            discovery_project and a fingerprint for incremental sync
+    
+    Returns:
+        Dictionary of row lists keyed like WRITE_STEPS ('vendors',
+        'services', 'services_by_id', 'business_processes')
+    """
+    vendor_rows = {}
+    services = {}
+    services_by_id = {}
+    processes = {}
+    
+    for vendor in vendors:
+        vendor_name = vendor.get('name', 'Unknown')
+        normalized_name = vendor_name.lower().strip()
+        row = {
+            'normalized_name': normalized_name,
+            'vendor_id': vendor.get('vendor_id'),
+            'category': vendor.get('category'),
+            'criticality': vendor.get('criticality'),
+            'display_name': vendor_name
+        }
+        _coalesce_into(vendor_rows.setdefault(normalized_name, row), row)
+        
+        for service in vendor.get('services', []):
+            gcp_resource = service.get('gcp_resource')
+            service_id = service.get('service_id')
+            if gcp_resource:
+                rows, key = services, gcp_resource
+            else:
+                rows, key = services_by_id, service_id
+            
+            service_row = rows.get(key)
+            if service_row is None:
+                # First occurrence wins, as ON CREATE would
+                service_row = rows[key] = {
+                    'gcp_resource': gcp_resource,
+                    'service_id': service_id,
+                    'name': service.get('name'),
+                    'type': service.get('type'),
+                    'rpm': service.get('rpm'),
+                    'customers_affected': service.get('customers_affected'),
+                    'discovery_project': project_id,
+                    'vendors': {},
+                    'business_processes': {}
+                }
+            service_row['vendors'][normalized_name] = None
+            for process in service.get('business_processes', []):
+                service_row['business_processes'][process] = None
+                processes[process] = None
+    
+    for row in list(services.values()) + list(services_by_id.values()):
+        row['vendors'] = sorted(row['vendors'])
+        row['business_processes'] = sorted(row['business_processes'])
+        if project_id:
+            payload = json.dumps([
+                row['name'], row['type'], row['rpm'], row['customers_affected'],
+                row['vendors'], row['business_processes']
+            ])
+            row['fingerprint'] = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        else:
+            row['fingerprint'] = None
+    
+    return {
+        'vendors': list(vendor_rows.values()),
+        'services': list(services.values()),
+        'services_by_id': list(services_by_id.values()),
+        'business_processes': [{'name': name} for name in processes]
+    }
+
+
+def iter_write_batches(
+    plan: Dict[str, List[Dict[str, Any]]],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[Tuple[str, str, List[Dict[str, Any]]]]:
+    """
+    Split a write plan into UNWIND chunks in dependency order
+    
+    Args:
+        plan: Write plan from build_write_plan
+        batch_size: Rows per chunk (0 = one chunk per step)
+    
+    Yields:
+        (log label, query, rows) tuples
+    """
+    for key, label, query in WRITE_STEPS:
+        rows = plan.get(key, [])
+        step = batch_size if batch_size > 0 else max(len(rows), 1)
+        for start in range(0, len(rows), step):
+            yield label, query, rows[start:start + step]
+
+
+def _run_chunk(tx, query: str, rows: List[Dict[str, Any]]) -> None:
+    """Transaction function: run one UNWIND chunk"""
+    tx.run(query, rows=rows).consume()
+
+
+def write_plan(session, plan: Dict[str, List[Dict[str, Any]]], batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+    """
+    Write a plan with one explicit transaction per chunk, then bump the graph version
+    
+    Args:
+        session: Neo4j session
+        plan: Write plan from build_write_plan
+        batch_size: Rows per UNWIND transaction
+    """
+    written = {}
+    for label, query, rows in iter_write_batches(plan, batch_size):
+        session.execute_write(_run_chunk, query, rows)
+        written[label] = written.get(label, 0) + len(rows)
+    
+    for label, count in written.items():
+        logger.info(f"   - Wrote {count} {label} rows in batches of {batch_size}")
+    
+    # Stamp a new graph version so the simulation service drops cached results
+    session.run(BUMP_GRAPH_VERSION_QUERY).consume()
+
+
+def write_discovery_data(session, data: Dict[str, Any], batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+    """
+    Write all vendor dependency data (full re-MERGE)
+    
+    Args:
+        session: Neo4j session
+        data: Vendor dependency data in Neo4j format
+        batch_size: Rows per UNWIND transaction
+    """
+    write_plan(session, build_write_plan(data.get('vendors', [])), batch_size)
+
+
+def sync_discovery_data(
+    session,
+    data: Dict[str, Any],
+    project_id: str,
+    prune: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Dict[str, int]:
+    """
+    Write only the services (and their vendors, processes and edges) that changed
+    since the last sync for this project, in one write transaction
+    
+    Args:
+        session: Neo4j session
+        data: Vendor dependency data in Neo4j format
+        project_id: GCP project the discovery covers (scopes removals)
+        prune: Remove services missing from the snapshot (disable for partial discoveries)
+        batch_size: Rows per UNWIND statement within the transaction
+    
+    Returns:
+        Counts of added, changed, removed, unchanged and legacy services, and of
+        vendors removed because no relationship was left
+    """
+    plan = build_write_plan(data.get('vendors', []), project_id=project_id)
+    
+    existing = {}
+    legacy = 0
+    for record in session.run(EXISTING_FINGERPRINTS_QUERY, project_id=project_id):
+        if record['gcp_resource'] is None:
+            legacy += 1
+        else:
+            existing[record['gcp_resource']] = record['fingerprint']
+    
+    current = {row['gcp_resource'] for row in plan['services']}
+    upserts = [row for row in plan['services'] if existing.get(row['gcp_resource']) != row['fingerprint']]
+    removed = [gcp_resource for gcp_resource in existing if gcp_resource not in current] if prune else []
+    legacy = legacy if prune else 0
+    added_count = sum(1 for row in upserts if row['gcp_resource'] not in existing)
+    stats = {
+        'added': added_count,
+        'changed': len(upserts) - added_count,
+        'removed': len(removed),
+        'unchanged': len(plan['services']) - len(upserts),
+        'legacy_removed': legacy,
+        'vendors_removed': 0
+    }
+    
+    if not upserts and not removed and not legacy and not plan['services_by_id']:
+        logger.info(f"✅ Graph already in sync ({stats['unchanged']} services unchanged)")
+        return stats
+    
+    # Same plan, restricted to what the changed services reference
+    changed = upserts + plan['services_by_id']
+    referenced_vendors = {name for row in changed for name in row['vendors']}
+    referenced_processes = {name for row in changed for name in row['business_processes']}
+    changed_plan = {
+        'vendors': [row for row in plan['vendors'] if row['normalized_name'] in referenced_vendors],
+        'services': upserts,
+        'services_by_id': plan['services_by_id'],
+        'business_processes': [row for row in plan['business_processes'] if row['name'] in referenced_processes]
+    }
+    
+    def write(tx):
+        for _, query, rows in iter_write_batches(changed_plan, batch_size):
+            tx.run(query, rows=rows).consume()
+        touched_vendors = set()
+        if upserts:
+            result = tx.run(SYNC_REMOVE_STALE_EDGES_QUERY, rows=upserts, project_id=project_id)
+            touched_vendors.update(record['vendor_name'] for record in result)
+        if removed:
+            result = tx.run(SYNC_REMOVE_SERVICES_QUERY, resources=removed, project_id=project_id)
+            touched_vendors.update(record['vendor_name'] for record in result)
+        if legacy:
+            result = tx.run(SYNC_REMOVE_LEGACY_SERVICES_QUERY, project_id=project_id)
+            touched_vendors.update(record['vendor_name'] for record in result)
+        vendors_removed = 0
+        if touched_vendors:
+            record = tx.run(SYNC_REMOVE_ORPHANED_VENDORS_QUERY, names=sorted(touched_vendors)).single()
+            vendors_removed = record['removed'] if record else 0
+        # Stamp a new graph version so the simulation service drops cached results
+        tx.run(BUMP_GRAPH_VERSION_QUERY).consume()
+        return vendors_removed
+    
+    stats['vendors_removed'] = session.execute_write(write)
+    logger.info(
+        f"✅ Incremental sync: {stats['added']} added, {stats['changed']} changed, "
+        f"{stats['removed']} removed, {stats['unchanged']} unchanged services"
+        + (f", {legacy} legacy services removed" if legacy else "")
+        + (f", {stats['vendors_removed']} vendors removed" if stats['vendors_removed'] else "")
+    )
+    return stats
@@ -0,0 +1,176 @@
+"""
+Discovery Manifest
+
+Keeps small index objects next to the discovery results so readers never have
+to list the (ever growing) discoveries/ prefix:
+
+    discoveries/LATEST                   newest discovery + the last N, newest first
+    discoveries/index/YYYY-MM-DD.json    every discovery written on that date
+
+Each object is updated with a read-modify-write guarded by a generation
+precondition (if_generation_match), retried when another writer got there
+first, so concurrent discovery runs cannot lose each other's entries.
+
+Shared by the discovery Cloud Function (staged next to main.py at deploy
+time) and scripts/gcp/fetch_discovery_results.py.
+"""
+
+import json
+import logging
+from typing import Dict, List, Any, Callable, Optional
+
+from google.api_core.exceptions import PreconditionFailed
+
+MANIFEST_BLOB = 'discoveries/LATEST'
+INDEX_PREFIX = 'discoveries/index/'
+DEFAULT_HISTORY_SIZE = 30
+MAX_UPDATE_ATTEMPTS = 5
+
+logger = logging.getLogger(__name__)
+
+
+def index_blob_name(date: str) -> str:
+    """
+    Get the date index object name
+
+    Args:
+        date: Date as YYYY-MM-DD
+
+    Returns:
+        Blob name of the index for that date
+    """
+    return f"{INDEX_PREFIX}{date}.json"
+
+
+def read_json_blob(bucket, blob_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a small JSON object
+
+    Args:
+        bucket: Cloud Storage bucket
+        blob_name: Object name
+
+    Returns:
+        Parsed object, or None if it does not exist
+    """
+    blob = bucket.get_blob(blob_name)
+    if blob is None:
+        return None
+    return json.loads(blob.download_as_bytes())
+
+
+def update_json_blob(
+    bucket,
+    blob_name: str,
+    mutate: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]],
+    attempts: int = MAX_UPDATE_ATTEMPTS
+) -> Dict[str, Any]:
+    """
+    Atomically read-modify-write a small JSON object
+
+    Args:
+        bucket: Cloud Storage bucket
+        blob_name: Object name
+        mutate: Function taking the current document (None if absent) and
+            returning the new one; may be called again after a conflict
+        attempts: Maximum number of conflicting writes tolerated
+
+    Returns:
+        The document that was written
+    """
+    for attempt in range(1, attempts + 1):
+        blob = bucket.get_blob(blob_name)
+        if blob is None:
+            current, generation = None, 0  # 0 = only create if absent
+        else:
+            current, generation = json.loads(blob.download_as_bytes()), blob.generation
+
+        document = mutate(current)
+        try:
+            bucket.blob(blob_name).upload_from_string(
+                json.dumps(document, separators=(',', ':')),
+                content_type='application/json',
+                if_generation_match=generation
+            )
+            return document
+        except PreconditionFailed:
+            if attempt == attempts:
+                raise
+            logger.info(f"{blob_name} changed concurrently, retrying ({attempt}/{attempts})")
+
+    raise RuntimeError(f"Failed to update {blob_name}")
+
+
+def record_discovery(
+    bucket,
+    blob_name: str,
+    entry: Dict[str, Any],
+    history_size: int = DEFAULT_HISTORY_SIZE
+) -> Dict[str, Any]:
+    """
+    Register a stored discovery in the date index and the LATEST manifest
+
+    Args:
+        bucket: Cloud Storage bucket holding the results
+        blob_name: Results object name (discoveries/YYYYMMDD_HHMMSS_discovery.*)
+        entry: Metadata to store with it (discovery_timestamp, counts, ...)
+        history_size: Number of recent discoveries kept in LATEST
+
+    Returns:
+        The new LATEST manifest
+    """
+    entry = {'blob_name': blob_name, **entry}
+    stamp = blob_name.rsplit('/', 1)[-1][:8]
+    date = f"{stamp[:4]}-{stamp[4:6]}-{stamp[6:8]}"
+
+    def add_to_index(index):
+        entries = [e for e in (index or {}).get('discoveries', []) if e['blob_name'] != blob_name]
+        entries.append(entry)
+        return {'date': date, 'discoveries': sorted(entries, key=lambda e: e['blob_name'])}
+
+    def add_to_manifest(manifest):
+        recent = [e for e in (manifest or {}).get('recent', []) if e['blob_name'] != blob_name]
+        # Blob names start with the timestamp, so name order is time order
+        recent = sorted(recent + [entry], key=lambda e: e['blob_name'], reverse=True)[:history_size]
+        return {'latest': recent[0], 'recent': recent}
+
+    # Index first: a manifest entry always has a matching index entry
+    update_json_blob(bucket, index_blob_name(date), add_to_index)
+    return update_json_blob(bucket, MANIFEST_BLOB, add_to_manifest)
+
+
+def read_discovery_entries(bucket, date: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Read the recorded discoveries, newest first
+
+    Args:
+        bucket: Cloud Storage bucket holding the results
+        date: Optional YYYY-MM-DD to read that day's index instead of LATEST
+
+    Returns:
+        Manifest entries (each with 'blob_name'), or None if the manifest
+        (or the date index) does not exist
+    """
+    if date:
+        index = read_json_blob(bucket, index_blob_name(date))
+        return list(reversed(index.get('discoveries', []))) if index is not None else None
+
+    manifest = read_json_blob(bucket, MANIFEST_BLOB)
+    return manifest.get('recent', []) if manifest is not None else None
+
+
+def resolve_discovery(bucket, nth: int = 0, date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Find a discovery with a single small read
+
+    Args:
+        bucket: Cloud Storage bucket holding the results
+        nth: 0 for the latest, 1 for the one before, ... (within the manifest
+            history, or within the day when date is given)
+        date: Optional YYYY-MM-DD to pick from that day's index instead
+
+    Returns:
+        Manifest entry with 'blob_name', or None if not recorded
+    """
+    entries = read_discovery_entries(bucket, date) or []
+    return entries[nth] if 0 <= nth < len(entries) else None
@@ -25,8 +25,10 @@ from scripts.utils import (
     setup_logging, 
     load_config, 
     save_json_file,
-    validate_env_vars
+    validate_env_vars,
+    get_project_root
 )
+from scripts.gcp.vendor_matcher import VendorPatternMatcher, load_vendor_patterns
 
 
 class GCPDiscovery:
@@ -48,17 +50,12 @@ class GCPDiscovery:
         self.functions_client = functions_v1.CloudFunctionsServiceClient()
         self.run_client = run_v2.ServicesClient()
         
-        # Vendor detection patterns
-        self.vendor_patterns = {
-            'Stripe': ['STRIPE_', 'stripe'],
-            'Auth0': ['AUTH0_', 'auth0'],
-            'SendGrid': ['SENDGRID_', 'sendgrid'],
-            'Twilio': ['TWILIO_', 'twilio'],
-            'Datadog': ['DATADOG_', 'DD_'],
-            'MongoDB': ['MONGO', 'mongodb'],
-            'PayPal': ['PAYPAL_', 'paypal'],
-            'Okta': ['OKTA_', 'okta']
-        }
+        # Vendor detection patterns (compiled once into a single-pass matcher)
+        patterns_file = self.config.get('gcp', {}).get('vendor_patterns_file')
+        self.vendor_patterns = load_vendor_patterns(
+            str(get_project_root() / patterns_file) if patterns_file else None
+        )
+        self.vendor_matcher = VendorPatternMatcher(self.vendor_patterns)
     
     def discover_all(self) -> Dict[str, Any]:
         """
@@ -222,17 +219,7 @@ class GCPDiscovery:
             resource_name: Name of the resource
             resource_type: Type of resource (cloud_function, cloud_run)
         """
-        for vendor, patterns in self.vendor_patterns.items():
-            for env_var_name in env_vars.keys():
-                if any(pattern.lower() in env_var_name.lower() for pattern in patterns):
-                    if vendor not in vendor_deps:
-                        vendor_deps[vendor] = []
-                    
-                    vendor_deps[vendor].append({
-                        'resource_name': resource_name,
-                        'resource_type': resource_type,
-                        'env_variable': env_var_name
-                    })
+        self.vendor_matcher.extract_vendor_deps(vendor_deps, env_vars, resource_name, resource_type)
 
 
 def main():
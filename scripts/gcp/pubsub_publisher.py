@@ -0,0 +1,188 @@
+"""
+Batching Pub/Sub Publisher
+
+Process-wide wrapper around pubsub_v1.PublisherClient for request-serving
+code: one client (and gRPC channel) per process, client-side batching by
+message count / bytes / latency, and publish() that returns immediately with
+completion handled by callbacks.
+
+The backlog of unsent messages is bounded by publisher flow control; when it
+is full, new messages are dropped (and counted) instead of blocking the
+request. flush() / close() drain the backlog, e.g. on SIGTERM.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import wait
+from typing import Dict, Any, Optional
+
+from google.cloud import pubsub_v1
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher.exceptions import FlowControlLimitError
+
+
+class BatchingPublisher:
+    """Non-blocking, batching JSON publisher for a single topic"""
+
+    def __init__(
+        self,
+        project_id: str,
+        topic: str,
+        max_messages: int = 100,
+        max_bytes: int = 1_000_000,
+        max_latency_seconds: float = 0.05,
+        max_backlog_messages: int = 1000,
+        max_backlog_bytes: int = 10_000_000
+    ):
+        """
+        Initialize publisher
+
+        Args:
+            project_id: GCP project ID
+            topic: Topic name
+            max_messages: Messages per publish request
+            max_bytes: Bytes per publish request
+            max_latency_seconds: Longest a message waits for its batch to fill
+            max_backlog_messages: Unsent messages held before new ones are dropped
+            max_backlog_bytes: Unsent bytes held before new messages are dropped
+        """
+        self.logger = logging.getLogger(__name__)
+        self.client = pubsub_v1.PublisherClient(
+            batch_settings=types.BatchSettings(
+                max_messages=max_messages,
+                max_bytes=max_bytes,
+                max_latency=max_latency_seconds
+            ),
+            publisher_options=types.PublisherOptions(
+                flow_control=types.PublishFlowControl(
+                    message_limit=max_backlog_messages,
+                    byte_limit=max_backlog_bytes,
+                    limit_exceeded_behavior=types.LimitExceededBehavior.ERROR
+                )
+            )
+        )
+        self.topic_path = self.client.topic_path(project_id, topic)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.published = 0
+        self.failed = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_config(cls, project_id: str, topic: str, config: Dict[str, Any]) -> 'BatchingPublisher':
+        """
+        Create a publisher from the simulation.publisher section of config.yaml
+
+        Args:
+            project_id: GCP project ID
+            topic: Topic name
+            config: simulation.publisher configuration section
+
+        Returns:
+            BatchingPublisher
+        """
+        return cls(
+            project_id,
+            topic,
+            max_messages=config.get('batch_max_messages', 100),
+            max_bytes=config.get('batch_max_bytes', 1_000_000),
+            max_latency_seconds=config.get('batch_max_latency_seconds', 0.05),
+            max_backlog_messages=config.get('max_backlog_messages', 1000),
+            max_backlog_bytes=config.get('max_backlog_bytes', 10_000_000)
+        )
+
+    def publish(self, payload: Dict[str, Any]) -> bool:
+        """
+        Queue a JSON message for publishing (does not wait for the server)
+
+        Args:
+            payload: Message body (JSON-serializable)
+
+        Returns:
+            True if queued, False if dropped (backlog full or publisher closed)
+        """
+        if self._closed:
+            self.logger.warning("⚠️  Publisher closed, dropping message")
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        future = self.client.publish(self.topic_path, json.dumps(payload).encode('utf-8'))
+        # A full backlog comes back as an already-failed future, not an exception
+        if future.done() and isinstance(future.exception(), FlowControlLimitError):
+            with self._lock:
+                self.dropped += 1
+            self.logger.warning(f"⚠️  Pub/Sub backlog full, dropping message for {self.topic_path}")
+            return False
+
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_done)
+        return True
+
+    def _on_done(self, future) -> None:
+        """Completion callback: record the outcome and forget the future"""
+        error = future.exception()
+        with self._lock:
+            self._pending.discard(future)
+            if error is None:
+                self.published += 1
+            else:
+                self.failed += 1
+        if error is None:
+            self.logger.debug(f"Published message {future.result()} to {self.topic_path}")
+        else:
+            self.logger.warning(f"⚠️  Failed to publish to {self.topic_path}: {error}")
+
+    def flush(self, timeout: Optional[float] = 10.0) -> int:
+        """
+        Wait for queued messages to be sent
+
+        Args:
+            timeout: Seconds to wait at most (None waits indefinitely)
+
+        Returns:
+            Number of messages still unsent after the timeout
+        """
+        with self._lock:
+            pending = list(self._pending)
+        if not pending:
+            return 0
+        _, not_done = wait(pending, timeout=timeout)
+        return len(not_done)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        Send everything still batched, wait for it, and stop accepting messages
+
+        Args:
+            timeout: Seconds to wait at most for outstanding messages
+        """
+        if self._closed:
+            return
+        self._closed = True
+        # stop() commits the open batches immediately instead of waiting for max_latency
+        self.client.stop()
+        remaining = self.flush(timeout)
+        if remaining:
+            self.logger.warning(f"⚠️  {remaining} Pub/Sub messages unsent at shutdown")
+        else:
+            self.logger.info(f"✅ Pub/Sub publisher flushed ({self.published} messages published)")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get publisher counters
+
+        Returns:
+            Dictionary with pending/published/failed/dropped counts
+        """
+        with self._lock:
+            return {
+                'topic': self.topic_path,
+                'pending': len(self._pending),
+                'published': self.published,
+                'failed': self.failed,
+                'dropped': self.dropped
+            }
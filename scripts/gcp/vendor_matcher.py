@@ -0,0 +1,178 @@
+"""
+Vendor Pattern Matcher
+
+Detects vendor references in environment variable names with an Aho-Corasick
+automaton built once over the lowercased vendor signatures. Each name is
+scanned in a single pass, so matching cost depends on the length of the name
+(plus the number of hits), not on how many vendor signatures are configured.
+
+Shared by scripts/gcp/gcp_discovery.py and the discovery Cloud Function (the
+deploy scripts copy this file and the signature file next to the function).
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Iterable, Optional, Tuple
+
+
+# Built-in signatures, used when no signature file is configured
+DEFAULT_VENDOR_PATTERNS = {
+    'Stripe': ['STRIPE_', 'stripe'],
+    'Auth0': ['AUTH0_', 'auth0'],
+    'SendGrid': ['SENDGRID_', 'sendgrid'],
+    'Twilio': ['TWILIO_', 'twilio'],
+    'Datadog': ['DATADOG_', 'DD_'],
+    'MongoDB': ['MONGO', 'mongodb'],
+    'PayPal': ['PAYPAL_', 'paypal'],
+    'Okta': ['OKTA_', 'okta']
+}
+
+
+def load_vendor_patterns(file_path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Load vendor signatures from a JSON file ({"Vendor": ["PATTERN", ...]})
+
+    Args:
+        file_path: Path to the signature file (None or missing file -> defaults)
+
+    Returns:
+        Mapping of vendor name to substring patterns
+    """
+    if not file_path or not Path(file_path).exists():
+        return dict(DEFAULT_VENDOR_PATTERNS)
+
+    with open(file_path, 'r') as f:
+        patterns = json.load(f)
+
+    if not isinstance(patterns, dict):
+        raise ValueError(f"Vendor pattern file must map vendor names to pattern lists: {file_path}")
+    return patterns
+
+
+class VendorPatternMatcher:
+    """Case-insensitive multi-pattern substring matcher for vendor signatures"""
+
+    def __init__(self, vendor_patterns: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Compile the matcher
+
+        Args:
+            vendor_patterns: Mapping of vendor name to substring patterns
+                (default: DEFAULT_VENDOR_PATTERNS). Vendor order is preserved
+                in match results.
+        """
+        self.vendor_patterns = {
+            vendor: list(patterns)
+            for vendor, patterns in (vendor_patterns or DEFAULT_VENDOR_PATTERNS).items()
+        }
+        self.vendors = list(self.vendor_patterns)
+
+        # Trie: per-state transition dicts, failure links and output vendor indexes
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[frozenset] = [frozenset()]
+        self._build()
+
+    def _build(self) -> None:
+        """Build the trie and failure links (breadth-first)"""
+        outputs = [set()]
+        for index, vendor in enumerate(self.vendors):
+            for pattern in self.vendor_patterns[vendor]:
+                pattern = pattern.lower()
+                if not pattern:
+                    continue
+                state = 0
+                for char in pattern:
+                    next_state = self._goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][char] = next_state
+                        self._goto.append({})
+                        self._fail.append(0)
+                        outputs.append(set())
+                    state = next_state
+                outputs[state].add(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                # Inherit matches of the longest proper suffix
+                outputs[next_state] |= outputs[self._fail[next_state]]
+
+        self._out = [frozenset(output) for output in outputs]
+
+    def match(self, text: str) -> List[str]:
+        """
+        Find all vendors whose signatures occur in text
+
+        Args:
+            text: String to scan (e.g. an environment variable name)
+
+        Returns:
+            Matching vendor names, in configured vendor order
+        """
+        return [self.vendors[index] for index in sorted(self._match_indexes(text))]
+
+    def _match_indexes(self, text: str) -> set:
+        """Scan text once and return the indexes of matching vendors"""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                hits |= out[state]
+        return hits
+
+    def find_hits(self, env_vars: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        Match every environment variable name of one resource
+
+        Args:
+            env_vars: Environment variable names (or a dict keyed by them)
+
+        Returns:
+            (vendor, env_variable) pairs in vendor order, then env var order
+        """
+        hits: Dict[int, List[str]] = {}
+        for env_var_name in env_vars:
+            for index in self._match_indexes(env_var_name):
+                hits.setdefault(index, []).append(env_var_name)
+
+        return [
+            (self.vendors[index], env_var_name)
+            for index in sorted(hits)
+            for env_var_name in hits[index]
+        ]
+
+    def extract_vendor_deps(
+        self,
+        vendor_deps: Dict[str, List],
+        env_vars: Dict[str, str],
+        resource_name: str,
+        resource_type: str
+    ) -> None:
+        """
+        Record vendor dependencies found in a resource's environment variables
+
+        Args:
+            vendor_deps: Dictionary to store vendor dependencies (vendor -> list)
+            env_vars: Environment variables to analyze
+            resource_name: Name of the resource
+            resource_type: Type of resource (cloud_function, cloud_run)
+        """
+        for vendor, env_var_name in self.find_hits(env_vars):
+            vendor_deps.setdefault(vendor, []).append({
+                'resource_name': resource_name,
+                'resource_type': resource_type,
+                'env_variable': env_var_name
+            })
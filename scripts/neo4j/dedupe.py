@@ -0,0 +1,359 @@
+"""
+Batched Duplicate Node Merge
+
+Engine shared by the cleanup scripts (scripts/cleanup/cleanup_duplicates.py,
+scripts/cleanup/cleanup_duplicate_services.py and
+scripts/neo4j/cleanup_duplicate_vendors.py). Duplicates are nodes of one label
+that share a merge key:
+
+    Vendor   toLower(name)       (the key the loaders MERGE on)
+    Service  gcp_resource
+
+All merge groups are computed in one read. Each group then becomes one UNWIND
+row that moves the duplicates' relationships onto the kept node, fills the kept
+node's missing properties from the duplicates and deletes the duplicates. Rows
+are written in chunked transactions and a group is never split across chunks,
+so an interrupted run leaves every group either fully merged or untouched;
+running again picks up the remaining groups.
+"""
+
+import logging
+from typing import Dict, List, Any, Iterator, Optional
+
+from scripts.gcp.discovery_graph import DEFAULT_BATCH_SIZE, BUMP_GRAPH_VERSION_QUERY
+
+logger = logging.getLogger(__name__)
+
+
+def _vendor_rank(node: Dict[str, Any]) -> tuple:
+    """
+    Sort key for choosing the vendor to keep (lowest wins): one with a
+    display_name, then the most properties and relationships, then the
+    shortest, properly cased name (e.g. "Stripe" over "stripe")
+    """
+    name = node['properties'].get('name') or ''
+    return (
+        'display_name' not in node['properties'],
+        -len(node['properties']),
+        -node['degree'],
+        len(name),
+        name != name.capitalize(),
+        name,
+        node['id']
+    )
+
+
+def _vendor_merge_key(properties: Dict[str, Any]) -> Optional[str]:
+    """Python equivalent of the vendor merge key (for graphs held in memory)"""
+    name = properties.get('name')
+    return name.lower() if name is not None else None
+
+
+def _vendor_key_properties(merge_key: str, keep: Dict[str, Any]) -> Dict[str, Any]:
+    """Vendor names are stored lowercased; the kept spelling becomes the display name"""
+    return {
+        'name': merge_key,
+        'display_name': keep['properties'].get('display_name') or keep['properties'].get('name')
+    }
+
+
+def _service_rank(node: Dict[str, Any]) -> tuple:
+    """
+    Sort key for choosing the service to keep (lowest wins): the most
+    properties set, then the most relationships
+    """
+    return (
+        -len(node['properties']),
+        -node['degree'],
+        str(node['properties'].get('service_id', '')),
+        node['id']
+    )
+
+
+def _service_merge_key(properties: Dict[str, Any]) -> Optional[str]:
+    """Python equivalent of the service merge key (for graphs held in memory)"""
+    return properties.get('gcp_resource') or None
+
+
+def _service_key_properties(merge_key: str, keep: Dict[str, Any]) -> Dict[str, Any]:
+    """Services are identified by their full GCP resource path"""
+    return {'gcp_resource': merge_key}
+
+
+# How duplicates of each label are found and merged. Relationships are
+# (direction seen from the duplicate, type, label of the other end); any
+# relationship not listed here is removed with the duplicate.
+MERGE_SPECS = {
+    'vendor': {
+        'label': 'Vendor',
+        'key': 'toLower(n.name)',
+        'filter': 'n.name IS NOT NULL',
+        'merge_key': _vendor_merge_key,
+        'relationships': [
+            ('in', 'DEPENDS_ON', 'Service'),
+            ('out', 'SATISFIES', 'ComplianceControl'),
+            ('out', 'SUPPORTS', 'BusinessProcess')
+        ],
+        'rank': _vendor_rank,
+        'key_properties': _vendor_key_properties
+    },
+    'service': {
+        'label': 'Service',
+        'key': 'n.gcp_resource',
+        'filter': "n.gcp_resource IS NOT NULL AND n.gcp_resource <> ''",
+        'merge_key': _service_merge_key,
+        'relationships': [
+            ('out', 'DEPENDS_ON', 'Vendor'),
+            ('out', 'SUPPORTS', 'BusinessProcess')
+        ],
+        'rank': _service_rank,
+        'key_properties': _service_key_properties
+    }
+}
+
+
+def build_find_groups_query(spec: Dict[str, Any]) -> str:
+    """
+    Build the read that returns every duplicate group of a label
+
+    Args:
+        spec: Entry of MERGE_SPECS
+
+    Returns:
+        Cypher query yielding merge_key and nodes (id, properties, degree)
+    """
+    return f"""
+    MATCH (n:{spec['label']})
+    WHERE {spec['filter']}
+    WITH {spec['key']} AS merge_key, n
+    ORDER BY elementId(n)
+    WITH merge_key, collect({{
+        id: elementId(n),
+        properties: properties(n),
+        degree: size([(n)--() | 1])
+    }}) AS nodes
+    WHERE size(nodes) > 1
+    RETURN merge_key, nodes
+    ORDER BY merge_key
+    """
+
+
+def build_merge_query(spec: Dict[str, Any]) -> str:
+    """
+    Build the UNWIND statement that merges a chunk of groups
+
+    Each row is {keep_id, duplicate_ids, properties}. Relationships are moved
+    with MERGE (so an edge the kept node already has is not doubled) and keep
+    their properties; the kept node's properties are replaced by the merged map.
+
+    Args:
+        spec: Entry of MERGE_SPECS
+
+    Returns:
+        Cypher query returning deleted and moved counts
+    """
+    label = spec['label']
+    moves = []
+    for index, (direction, rel_type, other_label) in enumerate(spec['relationships']):
+        if direction == 'in':
+            match = f"(other:{other_label})-[r:{rel_type}]->(dup)"
+            merge = f"(other)-[moved:{rel_type}]->(keep)"
+        else:
+            match = f"(dup)-[r:{rel_type}]->(other:{other_label})"
+            merge = f"(keep)-[moved:{rel_type}]->(other)"
+        moves.append(f"""
+        CALL {{
+            WITH keep, dup
+            MATCH {match}
+            MERGE {merge}
+            ON CREATE SET moved = properties(r)
+            DELETE r
+            RETURN count(*) AS moved_{index}
+        }}""")
+    moved_total = ' + '.join(f"moved_{index}" for index in range(len(spec['relationships']))) or '0'
+
+    return f"""
+    UNWIND $rows AS row
+    MATCH (keep:{label}) WHERE elementId(keep) = row.keep_id
+    CALL {{
+        WITH keep, row
+        UNWIND row.duplicate_ids AS duplicate_id
+        MATCH (dup:{label}) WHERE elementId(dup) = duplicate_id AND dup <> keep
+        {''.join(moves)}
+        DETACH DELETE dup
+        RETURN count(*) AS deleted, sum({moved_total}) AS moved
+    }}
+    SET keep = row.properties
+    RETURN sum(deleted) AS deleted, sum(moved) AS moved
+    """
+
+
+def plan_merge_groups(kind: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Choose the node to keep in each duplicate group and its merged properties
+
+    Args:
+        kind: Key of MERGE_SPECS ('vendor' or 'service')
+        records: Rows of the find-groups query (merge_key, nodes)
+
+    Returns:
+        List of groups: merge_key, keep, duplicates (ranked nodes) and the
+        merged property map for the kept node
+    """
+    spec = MERGE_SPECS[kind]
+    groups = []
+    for record in records:
+        nodes = sorted(record['nodes'], key=spec['rank'])
+        keep, duplicates = nodes[0], nodes[1:]
+
+        # The kept node's values win; duplicates (best first) fill the gaps
+        properties = {}
+        for node in reversed(nodes):
+            properties.update(node['properties'])
+        properties.update(spec['key_properties'](record['merge_key'], keep))
+
+        groups.append({
+            'merge_key': record['merge_key'],
+            'keep': keep,
+            'duplicates': duplicates,
+            'properties': properties
+        })
+    return groups
+
+
+def iter_merge_chunks(groups: List[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Split groups into UNWIND rows of at most batch_size duplicates per chunk
+    (a group larger than batch_size gets a chunk of its own)
+
+    Args:
+        groups: Groups from plan_merge_groups
+        batch_size: Duplicates per transaction (0 = everything in one transaction)
+
+    Yields:
+        Lists of {keep_id, duplicate_ids, properties} rows
+    """
+    chunk = []
+    size = 0
+    for group in groups:
+        count = len(group['duplicates'])
+        if chunk and batch_size > 0 and size + count > batch_size:
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append({
+            'keep_id': group['keep']['id'],
+            'duplicate_ids': [node['id'] for node in group['duplicates']],
+            'properties': group['properties']
+        })
+        size += count
+    if chunk:
+        yield chunk
+
+
+def _run_merge_chunk(tx, query: str, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Transaction function: merge one chunk of groups"""
+    record = tx.run(query, rows=rows).single()
+    return {
+        'deleted': (record['deleted'] or 0) if record else 0,
+        'moved': (record['moved'] or 0) if record else 0
+    }
+
+
+def merge_duplicates(
+    driver,
+    kind: str,
+    dry_run: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    database: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Find and merge all duplicate nodes of one kind
+
+    Args:
+        driver: Neo4j driver instance
+        kind: Key of MERGE_SPECS ('vendor' or 'service')
+        dry_run: Only compute and report the merge plan
+        batch_size: Duplicates merged per write transaction
+        database: Neo4j database name (driver default if None)
+
+    Returns:
+        Report dictionary: label, groups (the plan), duplicates, merged,
+        relationships_moved, transactions and dry_run
+    """
+    spec = MERGE_SPECS[kind]
+
+    with driver.session(database=database) as session:
+        records = session.execute_read(
+            lambda tx: [dict(record) for record in tx.run(build_find_groups_query(spec))]
+        )
+        groups = plan_merge_groups(kind, records)
+
+        report = {
+            'label': spec['label'],
+            'groups': groups,
+            'duplicates': sum(len(group['duplicates']) for group in groups),
+            'merged': 0,
+            'relationships_moved': 0,
+            'transactions': 0,
+            'dry_run': dry_run
+        }
+        if dry_run or not groups:
+            return report
+
+        query = build_merge_query(spec)
+        for rows in iter_merge_chunks(groups, batch_size):
+            counts = session.execute_write(_run_merge_chunk, query, rows)
+            report['merged'] += counts['deleted']
+            report['relationships_moved'] += counts['moved']
+            report['transactions'] += 1
+            logger.info(
+                f"   🔄 Merged {report['merged']}/{report['duplicates']} duplicate "
+                f"{spec['label']} nodes ({report['transactions']} transactions)"
+            )
+
+        # Stamp a new graph version so the simulation service drops cached results
+        session.run(BUMP_GRAPH_VERSION_QUERY).consume()
+
+    return report
+
+
+def log_merge_report(report: Dict[str, Any], name_property: str = 'name', limit: int = 50) -> None:
+    """
+    Log a merge plan (dry run) or the outcome of a merge
+
+    Args:
+        report: Report from merge_duplicates
+        name_property: Node property shown for each node
+        limit: Most groups listed individually
+    """
+    label = report['label']
+    groups = report['groups']
+
+    if not groups:
+        logger.info(f"✅ No duplicate {label} nodes found!")
+        return
+
+    logger.info(f"⚠️ Found {len(groups)} sets of duplicate {label} nodes ({report['duplicates']} duplicates)")
+    for group in groups[:limit]:
+        keep = group['keep']
+        logger.info(f"\n📋 '{group['merge_key']}':")
+        logger.info(
+            f"   ✅ Keep: {keep['properties'].get(name_property, 'Unknown')} "
+            f"(node {keep['id']}, {keep['degree']} relationships)"
+        )
+        for node in group['duplicates']:
+            logger.info(
+                f"   🗑️  Merge: {node['properties'].get(name_property, 'Unknown')} "
+                f"(node {node['id']}, {node['degree']} relationships)"
+            )
+    if len(groups) > limit:
+        logger.info(f"\n   ... and {len(groups) - limit} more sets")
+
+    if report['dry_run']:
+        logger.info("\n🔍 DRY RUN: No changes made. Run without --dry-run to merge duplicates.")
+    else:
+        logger.info(
+            f"\n✅ Merged {report['merged']} duplicate {label} nodes, moved "
+            f"{report['relationships_moved']} relationships in {report['transactions']} transactions"
+        )
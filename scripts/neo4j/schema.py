@@ -0,0 +1,197 @@
+"""
+Neo4j Schema Bootstrap
+
+Idempotently creates the uniqueness constraints and lookup indexes the graph
+model relies on, so loader MERGE/MATCH statements use index seeks instead of
+label scans, and reports any expected index that is missing or not ONLINE.
+
+A uniqueness constraint cannot be created while duplicate nodes exist. In that
+case a plain lookup index is created in its place (named <constraint>_fallback)
+and the constraint is reported as failed. Later runs keep the fallback index
+while duplicates remain; once the cleanup scripts have merged them, the next
+run drops the fallback index and creates the constraint.
+
+The graph_loader Cloud Function imports this module from a copy staged next to
+its main.py at deploy time, so it only depends on the neo4j driver at import time.
+
+Usage:
+    python scripts/neo4j/schema.py
+"""
+
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List, Any
+
+from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+
+# (name, label, property) - uniqueness constraints (each is backed by an index)
+UNIQUE_CONSTRAINTS = [
+    ('vendor_name_unique', 'Vendor', 'name'),
+    ('service_gcp_resource_unique', 'Service', 'gcp_resource'),
+    ('business_process_name_unique', 'BusinessProcess', 'name'),
+    ('compliance_control_id_unique', 'ComplianceControl', 'control_id'),
+    ('graph_meta_id_unique', 'GraphMeta', 'id')
+]
+
+# (name, label, property) - non-unique lookup indexes
+LOOKUP_INDEXES = [
+    ('service_service_id', 'Service', 'service_id'),
+    ('vendor_vendor_id', 'Vendor', 'vendor_id'),
+    ('service_discovery_project', 'Service', 'discovery_project')
+]
+
+# How long ensure_schema waits for new indexes to finish populating
+INDEX_ONLINE_TIMEOUT_SECONDS = 60
+
+SHOW_INDEXES_QUERY = """
+SHOW INDEXES YIELD name, labelsOrTypes, properties, state
+RETURN name, labelsOrTypes, properties, state
+"""
+
+# Any key still shared by two nodes (formatted with label and property)
+DUPLICATE_KEY_QUERY = """
+MATCH (n:{label}) WHERE n.{prop} IS NOT NULL
+WITH n.{prop} AS key, count(*) AS copies
+WHERE copies > 1
+RETURN key LIMIT 1
+"""
+
+
+def ensure_schema(driver, wait_seconds: int = INDEX_ONLINE_TIMEOUT_SECONDS) -> Dict[str, Any]:
+    """
+    Create missing constraints and indexes (safe to call before every load)
+
+    Args:
+        driver: Neo4j driver instance
+        wait_seconds: Wait up to this long for indexes to come ONLINE (0 = don't wait)
+
+    Returns:
+        Dictionary with 'failed' constraints (name -> error) and the
+        verify_schema report under 'missing'
+    """
+    logger = logging.getLogger(__name__)
+    failed = {}
+
+    with driver.session() as session:
+        existing = {record['name'] for record in session.run(SHOW_INDEXES_QUERY)}
+
+        for name, label, prop in UNIQUE_CONSTRAINTS:
+            fallback = f"{name}_fallback"
+            if fallback in existing:
+                # Keep the fallback index while duplicates remain: dropping it only to
+                # fail the constraint again would rebuild it over the whole label
+                duplicate = session.run(DUPLICATE_KEY_QUERY.format(label=label, prop=prop)).single()
+                if duplicate is not None:
+                    failed[name] = f"duplicate {label}.{prop} values remain (e.g. {duplicate['key']!r})"
+                    logger.warning(
+                        f"⚠️  Constraint {name} still blocked by duplicate :{label}({prop}) values - "
+                        f"run the cleanup scripts. Keeping lookup index {fallback}."
+                    )
+                    continue
+                # The fallback index on the same property blocks the constraint: drop it first
+                session.run(f"DROP INDEX {fallback} IF EXISTS").consume()
+            try:
+                session.run(
+                    f"CREATE CONSTRAINT {name} IF NOT EXISTS "
+                    f"FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+                ).consume()
+            except Neo4jError as e:
+                failed[name] = e.message or str(e)
+                logger.warning(
+                    f"⚠️  Could not create constraint {name} on :{label}({prop}) - "
+                    f"duplicates may exist, run the cleanup scripts. Using a lookup index instead."
+                )
+                session.run(
+                    f"CREATE INDEX {fallback} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+                ).consume()
+
+        for name, label, prop in LOOKUP_INDEXES:
+            session.run(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})").consume()
+
+        if wait_seconds > 0:
+            try:
+                session.run("CALL db.awaitIndexes($timeout)", timeout=wait_seconds).consume()
+            except Neo4jError as e:
+                # Still populating: writes work meanwhile, verify_schema reports the state
+                logger.warning(f"⚠️  Indexes not ONLINE after {wait_seconds}s: {e.message or e}")
+
+    missing = verify_schema(driver)
+    if not failed and not missing:
+        logger.info("✅ Graph schema constraints and indexes in place")
+
+    return {
+        'failed': failed,
+        'missing': missing
+    }
+
+
+def verify_schema(driver) -> List[str]:
+    """
+    Report expected indexes that are missing or not yet ONLINE
+
+    Args:
+        driver: Neo4j driver instance
+
+    Returns:
+        List of human-readable problems (empty when the schema is complete)
+    """
+    logger = logging.getLogger(__name__)
+
+    with driver.session() as session:
+        indexes = [dict(record) for record in session.run(SHOW_INDEXES_QUERY)]
+
+    problems = []
+    for name, label, prop in UNIQUE_CONSTRAINTS + LOOKUP_INDEXES:
+        covering = [
+            index for index in indexes
+            if (index.get('labelsOrTypes') or []) == [label] and (index.get('properties') or []) == [prop]
+        ]
+        if not covering:
+            problems.append(f"missing index on :{label}({prop}) [{name}]")
+        elif not any(index.get('state') == 'ONLINE' for index in covering):
+            problems.append(f"index on :{label}({prop}) is {covering[0].get('state')} [{name}]")
+
+    for problem in problems:
+        logger.warning(f"⚠️  Schema: {problem}")
+    return problems
+
+
+def main():
+    """Main entry point"""
+    from scripts.utils import setup_logging, load_config, validate_env_vars
+
+    setup_logging('INFO')
+    logger = logging.getLogger(__name__)
+
+    # Validate environment
+    required_vars = ['NEO4J_URI', 'NEO4J_USER', 'NEO4J_PASSWORD']
+    if not validate_env_vars(required_vars):
+        logger.error("Please configure Neo4j credentials in .env file")
+        return 1
+
+    config = load_config()
+    neo4j_config = config['neo4j']
+
+    driver = GraphDatabase.driver(
+        neo4j_config['uri'],
+        auth=(neo4j_config['user'], neo4j_config['password'])
+    )
+
+    try:
+        report = ensure_schema(driver)
+        return 1 if report['failed'] or report['missing'] else 0
+    except Exception as e:
+        logger.error(f"❌ Schema bootstrap failed: {e}", exc_info=True)
+        return 1
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    exit(main())
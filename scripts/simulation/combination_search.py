@@ -0,0 +1,117 @@
+"""
+Worst k-Vendor Combination Search
+
+Finds the sets of k vendors whose correlated failure takes down the most
+distinct services, without enumerating every combination.
+
+Each vendor's services are encoded as a bitset (a Python int, one bit per
+service in the snapshot), so the union for a candidate combination is a
+bitwise OR and its size a popcount. A depth-first branch-and-bound search
+visits vendors in decreasing order of their own service count and prunes any
+branch whose optimistic bound (current union plus the largest remaining
+individual counts) cannot beat the current top-N.
+"""
+
+import heapq
+import math
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from scripts.simulation.graph_snapshot import DependencyGraphSnapshot
+
+
+def build_service_bitsets(snapshot: DependencyGraphSnapshot) -> List[int]:
+    """
+    Encode each vendor's dependent services as an integer bitset
+
+    Args:
+        snapshot: Dependency graph snapshot
+
+    Returns:
+        One bitset per snapshot vendor (bit i set = service i depends on the vendor)
+    """
+    membership = np.zeros(len(snapshot.services), dtype=bool)
+    bitsets = []
+    for service_ids in snapshot.vendor_services:
+        if not service_ids:
+            bitsets.append(0)
+            continue
+        ids = np.fromiter(service_ids, dtype=np.int64, count=len(service_ids))
+        membership[ids] = True
+        packed = np.packbits(membership, bitorder='little')
+        bitsets.append(int.from_bytes(packed.tobytes(), 'little'))
+        membership[ids] = False
+    return bitsets
+
+
+def find_worst_combinations(
+    snapshot: DependencyGraphSnapshot,
+    k: int,
+    top_n: int = 5
+) -> Tuple[List[Tuple[Tuple[int, ...], int]], Dict[str, Any]]:
+    """
+    Find the top-N k-vendor combinations by number of distinct affected services
+
+    Args:
+        snapshot: Dependency graph snapshot
+        k: Number of vendors failing together
+        top_n: Number of combinations to return
+
+    Returns:
+        Tuple of (list of (vendor index tuple, affected service count) sorted
+        worst first; search statistics)
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    if top_n < 1:
+        raise ValueError("top_n must be at least 1")
+
+    bitsets = build_service_bitsets(snapshot)
+    sizes = [len(ids) for ids in snapshot.vendor_services]
+
+    # Vendors without services can never increase a union, so only search the rest
+    candidates = sorted((v for v in range(len(bitsets)) if sizes[v]), key=lambda v: (-sizes[v], v))
+    k = min(k, len(candidates))
+
+    prefix = [0]
+    for v in candidates:
+        prefix.append(prefix[-1] + sizes[v])
+
+    # Min-heap of (service_count, combination) holding the current top-N
+    best: List[Tuple[int, Tuple[int, ...]]] = []
+    evaluated = 0
+    candidate_count = len(candidates)
+
+    def search(start: int, chosen: Tuple[int, ...], mask: int, count: int) -> None:
+        nonlocal evaluated
+        remaining = k - len(chosen)
+        if remaining == 0:
+            evaluated += 1
+            entry = (count, tuple(sorted(chosen)))
+            if len(best) < top_n:
+                heapq.heappush(best, entry)
+            elif count > best[0][0]:
+                heapq.heapreplace(best, entry)
+            return
+
+        for i in range(start, candidate_count - remaining + 1):
+            # Bound is non-increasing in i because candidates are sorted by size
+            bound = count + prefix[i + remaining] - prefix[i]
+            if len(best) >= top_n and bound <= best[0][0]:
+                break
+            vendor_id = candidates[i]
+            new_mask = mask | bitsets[vendor_id]
+            search(i + 1, chosen + (vendor_id,), new_mask, new_mask.bit_count())
+
+    if k > 0:
+        search(0, (), 0, 0)
+
+    results = sorted(((combo, count) for count, combo in best), key=lambda r: (-r[1], r[0]))
+    stats = {
+        'vendors_considered': candidate_count,
+        'k': k,
+        'total_combinations': math.comb(candidate_count, k) if k else 0,
+        'combinations_evaluated': evaluated
+    }
+    return results, stats
@@ -0,0 +1,204 @@
+"""
+Precomputed Compliance Impact Index
+
+Builds, once per version of compliance_controls.json, a lookup from normalized
+vendor name to the vendor's controls and its scored compliance impact
+(per-framework score reduction, new score and summary). Simulations then get
+compliance impact with a dictionary lookup instead of re-walking
+control_mappings and re-scoring controls on every call.
+
+The index checks the file's modification time on lookup and rebuilds itself
+when compliance_controls.json changes on disk.
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from scripts.utils import get_project_root, format_percentage
+
+
+def normalize_compliance_key(vendor_name: str) -> str:
+    """Normalize a vendor name for index lookups (case and surrounding whitespace)"""
+    return vendor_name.lower().strip()
+
+
+class ComplianceIndex:
+    """Vendor -> compliance impact index over compliance_controls.json"""
+
+    def __init__(self, file_path: str = 'data/sample/compliance_controls.json'):
+        """
+        Load the compliance data and build the index
+
+        Args:
+            file_path: Path to compliance controls JSON (relative to project root)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = get_project_root() / file_path
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple[int, int]] = None
+        self.data: Dict[str, Any] = {}
+        self._controls: Dict[str, Dict[str, List[str]]] = {}
+        self._impacts: Dict[str, Dict[str, Any]] = {}
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        (Re)load compliance_controls.json and precompute every vendor's impact
+
+        Raises:
+            FileNotFoundError: If the compliance file does not exist
+        """
+        if not self.path.exists():
+            self.logger.error(f"JSON file not found: {self.path}")
+            raise FileNotFoundError(f"JSON file not found: {self.path}")
+
+        with self._lock:
+            stat = os.stat(self.path)
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+
+            controls = {}
+            for vendor_name, vendor_controls in data.get('control_mappings', {}).items():
+                # First mapping wins if two keys differ only by case
+                controls.setdefault(normalize_compliance_key(vendor_name), vendor_controls)
+
+            # Swap in fully built structures so concurrent readers never see a partial index
+            self.data = data
+            self._controls = controls
+            self._impacts = {
+                key: self.score_controls(vendor_controls) for key, vendor_controls in controls.items()
+            }
+            self._version = (stat.st_mtime_ns, stat.st_size)
+
+        self.logger.info(f"Compliance index built: {len(self._impacts)} vendors from {self.path}")
+
+    def refresh_if_changed(self) -> bool:
+        """
+        Rebuild the index if compliance_controls.json changed on disk
+
+        Returns:
+            True if the index was rebuilt
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            # Keep serving the last good index if the file is briefly unavailable
+            return False
+
+        if (stat.st_mtime_ns, stat.st_size) == self._version:
+            return False
+
+        self.logger.info("Compliance controls changed on disk, rebuilding index...")
+        self.rebuild()
+        return True
+
+    def controls(self, vendor_name: str) -> Dict[str, List[str]]:
+        """
+        Get a vendor's compliance controls
+
+        Args:
+            vendor_name: Vendor name in any casing
+
+        Returns:
+            Mapping of framework control key (e.g. 'soc2_controls') to control IDs
+        """
+        self.refresh_if_changed()
+        return self._controls.get(normalize_compliance_key(vendor_name), {})
+
+    def impact(self, vendor_name: str) -> Dict[str, Any]:
+        """
+        Get a vendor's precomputed compliance impact
+
+        Args:
+            vendor_name: Vendor name in any casing
+
+        Returns:
+            Compliance impact details (empty impact if the vendor has no controls)
+        """
+        self.refresh_if_changed()
+        impact = self._impacts.get(normalize_compliance_key(vendor_name))
+        if impact is None:
+            return self.score_controls({})
+        # Callers own the returned dict; keep the indexed copy pristine
+        return copy.deepcopy(impact)
+
+    def score_controls(self, vendor_controls: Dict[str, List[str]]) -> Dict[str, Any]:
+        """
+        Score the compliance impact of losing a set of controls
+
+        Args:
+            vendor_controls: Mapping of framework control key to control IDs
+
+        Returns:
+            Compliance impact details
+        """
+        if not vendor_controls:
+            return {
+                'affected_frameworks': {},  # Use empty object for consistency with JavaScript simulator
+                'impact_score': 0.0,
+                'summary': {}  # Always include summary field (empty when no data)
+            }
+
+        # Get impact weights
+        impact_weights = self.data.get('impact_weights', {})
+        baseline = self.data.get('compliance_baseline', {})
+
+        # Calculate impact for each framework
+        frameworks = {}
+        total_impact = 0
+
+        for framework, control_ids in vendor_controls.items():
+            framework_key = framework.replace('_controls', '')
+            if framework_key not in impact_weights:
+                continue
+
+            # Calculate score reduction
+            score_reduction = sum(
+                impact_weights[framework_key].get(ctrl, 0.05)
+                for ctrl in control_ids
+            )
+
+            baseline_score = baseline.get(f"{framework_key}_score", 0.90)
+            new_score = max(baseline_score - score_reduction, 0.0)
+
+            frameworks[framework_key] = {
+                'baseline_score': baseline_score,
+                'new_score': new_score,
+                'score_change': score_reduction,
+                'affected_controls': control_ids
+            }
+
+            total_impact += score_reduction
+
+        # Overall compliance impact score
+        impact_score = min(total_impact / len(frameworks) if frameworks else 0, 1.0)
+
+        return {
+            'affected_frameworks': frameworks,
+            'impact_score': impact_score,
+            'summary': {
+                framework: {
+                    'change': format_percentage(data['score_change']),
+                    'new_score': format_percentage(data['new_score'])
+                }
+                for framework, data in frameworks.items()
+            }
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index information
+
+        Returns:
+            Dictionary with indexed vendor count and source file
+        """
+        return {
+            'vendors': len(self._impacts),
+            'path': str(self.path),
+            'mtime_ns': self._version[0] if self._version else None
+        }
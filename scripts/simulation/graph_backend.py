@@ -0,0 +1,694 @@
+"""
+Pluggable Dependency Graph Backends
+
+The simulator and loaders talk to the dependency graph through a GraphBackend:
+
+    neo4j   Neo4jGraphBackend - the production graph (Cypher over a driver)
+    memory  InMemoryGraphBackend - an in-process property graph held in
+            adjacency dicts, for tests, benchmarks and laptops without a database
+
+Both accept the same write plans as the loaders (scripts/gcp/discovery_graph.py),
+so a graph loaded into memory has the same nodes, identity keys and MERGE
+semantics as one loaded into Neo4j, and both answer the same reads (snapshot,
+affected services, graph version, node counts, duplicate merge).
+
+Usage:
+    backend = InMemoryGraphBackend.from_files('data/sample/sample_dependencies.json',
+                                              'data/sample/compliance_controls.json')
+    simulator = VendorFailureSimulator(backend=backend)
+"""
+
+import itertools
+import logging
+import uuid
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from scripts.utils import load_json_file
+from scripts.gcp.discovery_format import is_ndjson_path, load_discovery_file
+from scripts.gcp.discovery_graph import (
+    DEFAULT_BATCH_SIZE,
+    BUMP_GRAPH_VERSION_QUERY,
+    build_write_plan,
+    convert_to_neo4j_format,
+    write_plan
+)
+from scripts.neo4j.dedupe import MERGE_SPECS, plan_merge_groups, merge_duplicates as merge_neo4j_duplicates
+from scripts.simulation.graph_snapshot import DependencyGraphSnapshot
+from scripts.simulation.result_cache import GRAPH_VERSION_QUERY, UNVERSIONED
+
+
+# Node labels and the properties nodes are MERGEd on
+NODE_LABELS = ['Vendor', 'Service', 'BusinessProcess', 'ComplianceControl']
+INDEXED_PROPERTIES = {
+    'Vendor': ['name'],
+    'Service': ['gcp_resource', 'service_id'],
+    'BusinessProcess': ['name'],
+    'ComplianceControl': ['control_id']
+}
+
+MERGE_COMPLIANCE_CONTROLS_QUERY = """
+UNWIND $rows AS row
+MERGE (cc:ComplianceControl {control_id: row.control_id})
+SET cc.framework = row.framework
+"""
+
+LINK_VENDOR_CONTROL_QUERY = """
+UNWIND $rows AS row
+MATCH (v:Vendor {name: row.normalized_vendor_name})
+MATCH (cc:ComplianceControl {control_id: row.control_id})
+MERGE (v)-[:SATISFIES]->(cc)
+"""
+
+OPERATIONAL_IMPACT_QUERY = """
+MATCH (v:Vendor {name: $normalized_vendor_name})<-[:DEPENDS_ON]-(s:Service)
+OPTIONAL MATCH (s)-[:SUPPORTS]->(bp:BusinessProcess)
+RETURN s.name as service_name,
+       s.type as service_type,
+       s.rpm as rpm,
+       s.customers_affected as customers_affected,
+       collect(DISTINCT bp.name) as business_processes
+"""
+
+# DISTINCT per service so shared services are counted once
+UNION_OPERATIONAL_IMPACT_QUERY = """
+MATCH (v:Vendor)<-[:DEPENDS_ON]-(s:Service)
+WHERE v.name IN $normalized_vendor_names
+WITH s, collect(DISTINCT v.name) as vendor_names
+OPTIONAL MATCH (s)-[:SUPPORTS]->(bp:BusinessProcess)
+RETURN s.name as service_name,
+       s.type as service_type,
+       s.rpm as rpm,
+       s.customers_affected as customers_affected,
+       vendor_names,
+       collect(DISTINCT bp.name) as business_processes
+"""
+
+
+def build_compliance_plan(data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Turn compliance_controls.json control mappings into UNWIND rows
+
+    Args:
+        data: Compliance control data (with 'control_mappings')
+
+    Returns:
+        Dictionary with 'controls' (control_id, framework) and 'links'
+        (normalized_vendor_name, control_id) rows
+    """
+    controls = {}
+    links = []
+    for vendor_name, vendor_controls in data.get('control_mappings', {}).items():
+        normalized_vendor_name = vendor_name.lower().strip()
+        for framework, control_ids in vendor_controls.items():
+            for control_id in control_ids:
+                # Last framework wins, as with sequential SET in the per-item path
+                controls[control_id] = framework
+                links.append({'normalized_vendor_name': normalized_vendor_name, 'control_id': control_id})
+    return {
+        'controls': [{'control_id': control_id, 'framework': framework} for control_id, framework in controls.items()],
+        'links': links
+    }
+
+
+def load_dependency_file(file_path: str, project_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load vendor dependencies from a load-format file (sample_dependencies.json)
+    or a raw discovery result (*_discovery.json / *_discovery.ndjson.gz)
+
+    Args:
+        file_path: Path (relative paths are resolved from the project root)
+        project_id: GCP project for discovery results (default: the result's project_id)
+
+    Returns:
+        Vendor dependency data in Neo4j load format
+    """
+    if is_ndjson_path(file_path):
+        path = Path(__file__).parent.parent.parent / file_path
+        data = load_discovery_file(str(path))
+    else:
+        data = load_json_file(file_path)
+
+    # Discovery output lists resources per vendor; load format lists services
+    is_discovery = 'discovery_timestamp' in data or any(
+        'resources' in vendor for vendor in data.get('vendors', [])
+    )
+    if is_discovery:
+        return convert_to_neo4j_format(data, project_id or data.get('project_id'))
+    return data
+
+
+class GraphBackend:
+    """Base class for dependency graph backends"""
+
+    name = 'base'
+
+    def write_dependencies(self, vendors: Iterable[Dict[str, Any]], project_id: Optional[str] = None) -> None:
+        """
+        MERGE vendors, services, business processes and their edges
+
+        Args:
+            vendors: Vendor dictionaries in Neo4j load format
+            project_id: Discovery project stamped on services (None for sample data)
+        """
+        raise NotImplementedError
+
+    def write_compliance_controls(self, data: Dict[str, Any]) -> None:
+        """
+        MERGE compliance controls and SATISFIES edges
+
+        Args:
+            data: Compliance control data (with 'control_mappings')
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Delete every node and relationship"""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Count nodes per label and relationships
+
+        Returns:
+            Dictionary with <Label>_count keys and relationship_count
+        """
+        raise NotImplementedError
+
+    def snapshot(self) -> DependencyGraphSnapshot:
+        """
+        Read the whole graph into a DependencyGraphSnapshot
+
+        Returns:
+            Populated snapshot
+        """
+        raise NotImplementedError
+
+    def affected_services(self, vendor_name: str) -> List[Dict[str, Any]]:
+        """
+        Get services that depend on a vendor
+
+        Args:
+            vendor_name: Normalized vendor name
+
+        Returns:
+            Operational impact rows (name, type, rpm, customers_affected, business_processes)
+        """
+        raise NotImplementedError
+
+    def affected_services_union(self, vendor_names: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        Get the union of services that depend on any of several vendors
+
+        Args:
+            vendor_names: Normalized vendor names
+
+        Returns:
+            Tuple of (service rows, each service once; per-vendor service counts)
+        """
+        raise NotImplementedError
+
+    def graph_version(self) -> str:
+        """
+        Get the graph version token (changes on every write)
+
+        Returns:
+            Version token (UNVERSIONED if the graph was never stamped)
+        """
+        raise NotImplementedError
+
+    def merge_duplicates(self, kind: str, dry_run: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Merge duplicate Vendor or Service nodes (see scripts/neo4j/dedupe.py)
+
+        Args:
+            kind: Key of MERGE_SPECS ('vendor' or 'service')
+            dry_run: Only compute and report the merge plan
+            batch_size: Duplicates merged per write transaction
+
+        Returns:
+            Merge report
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources"""
+
+
+class Neo4jGraphBackend(GraphBackend):
+    """Dependency graph stored in Neo4j"""
+
+    name = 'neo4j'
+
+    def __init__(self, driver, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Initialize backend
+
+        Args:
+            driver: Neo4j driver instance
+            batch_size: Rows per UNWIND write transaction
+        """
+        self.logger = logging.getLogger(__name__)
+        self.driver = driver
+        self.batch_size = batch_size
+
+    def write_dependencies(self, vendors: Iterable[Dict[str, Any]], project_id: Optional[str] = None) -> None:
+        """MERGE vendors, services, business processes and edges (see GraphBackend.write_dependencies)"""
+        with self.driver.session() as session:
+            write_plan(session, build_write_plan(vendors, project_id), self.batch_size)
+
+    def write_compliance_controls(self, data: Dict[str, Any]) -> None:
+        """MERGE compliance controls and SATISFIES edges (see GraphBackend.write_compliance_controls)"""
+        plan = build_compliance_plan(data)
+        with self.driver.session() as session:
+            for label, query, rows in [
+                ('compliance controls', MERGE_COMPLIANCE_CONTROLS_QUERY, plan['controls']),
+                ('SATISFIES', LINK_VENDOR_CONTROL_QUERY, plan['links'])
+            ]:
+                step = self.batch_size if self.batch_size > 0 else max(len(rows), 1)
+                for start in range(0, len(rows), step):
+                    session.execute_write(self._run_chunk, query, rows[start:start + step])
+                if rows:
+                    self.logger.info(f"   - Wrote {len(rows)} {label} in batches of {step}")
+            session.run(BUMP_GRAPH_VERSION_QUERY).consume()
+
+    @staticmethod
+    def _run_chunk(tx, query: str, rows: List[Dict[str, Any]]) -> None:
+        """Transaction function: run one UNWIND chunk"""
+        tx.run(query, rows=rows).consume()
+
+    def clear(self) -> None:
+        """Delete every node and relationship (see GraphBackend.clear)"""
+        with self.driver.session() as session:
+            session.run("MATCH (n) DETACH DELETE n").consume()
+
+    def counts(self) -> Dict[str, int]:
+        """Count nodes per label and relationships (see GraphBackend.counts)"""
+        with self.driver.session() as session:
+            stats = {}
+            for label in NODE_LABELS:
+                result = session.run(f"MATCH (n:{label}) RETURN count(n) as count")
+                stats[f"{label}_count"] = result.single()['count']
+            result = session.run("MATCH ()-[r]->() RETURN count(r) as count")
+            stats['relationship_count'] = result.single()['count']
+        return stats
+
+    def snapshot(self) -> DependencyGraphSnapshot:
+        """Read the whole graph into a snapshot (see GraphBackend.snapshot)"""
+        return DependencyGraphSnapshot.from_neo4j(self.driver)
+
+    def affected_services(self, vendor_name: str) -> List[Dict[str, Any]]:
+        """Get services that depend on a vendor (see GraphBackend.affected_services)"""
+        with self.driver.session() as session:
+            result = session.run(OPERATIONAL_IMPACT_QUERY, normalized_vendor_name=vendor_name)
+            return [
+                {
+                    'name': record['service_name'],
+                    'type': record['service_type'],
+                    'rpm': record['rpm'] or 0,
+                    'customers_affected': record['customers_affected'] or 0,
+                    'business_processes': record['business_processes']
+                }
+                for record in result
+            ]
+
+    def affected_services_union(self, vendor_names: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Get the union of services that depend on several vendors (see GraphBackend.affected_services_union)"""
+        with self.driver.session() as session:
+            result = session.run(UNION_OPERATIONAL_IMPACT_QUERY, normalized_vendor_names=vendor_names)
+
+            affected_services = []
+            vendor_service_counts = {name: 0 for name in vendor_names}
+            for record in result:
+                affected_services.append({
+                    'name': record['service_name'],
+                    'type': record['service_type'],
+                    'rpm': record['rpm'] or 0,
+                    'customers_affected': record['customers_affected'] or 0,
+                    'business_processes': record['business_processes']
+                })
+                for name in record['vendor_names']:
+                    vendor_service_counts[name] = vendor_service_counts.get(name, 0) + 1
+        return affected_services, vendor_service_counts
+
+    def graph_version(self) -> str:
+        """Get the graph version token (see GraphBackend.graph_version)"""
+        with self.driver.session() as session:
+            record = session.run(GRAPH_VERSION_QUERY).single()
+        if record is None or record['version'] is None:
+            return UNVERSIONED
+        return str(record['version'])
+
+    def merge_duplicates(self, kind: str, dry_run: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+        """Merge duplicate Vendor or Service nodes (see GraphBackend.merge_duplicates)"""
+        return merge_neo4j_duplicates(self.driver, kind, dry_run=dry_run, batch_size=batch_size)
+
+    def close(self) -> None:
+        """Close the Neo4j driver (see GraphBackend.close)"""
+        self.driver.close()
+
+
+class InMemoryGraphBackend(GraphBackend):
+    """
+    Dependency graph held in process memory
+
+    Nodes are property dicts keyed by a generated id; relationships are
+    adjacency dicts in both directions (node id -> type -> other id -> properties).
+    Identity-key lookups go through per-label indexes, so writes cost the same
+    per row as an indexed MERGE.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        """Create an empty graph"""
+        self.logger = logging.getLogger(__name__)
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.labels: Dict[str, str] = {}
+        self.out_edges: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self.in_edges: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self.indexes: Dict[Tuple[str, str], Dict[Any, str]] = {}
+        self._ids = itertools.count(1)
+        self._version: Optional[str] = None
+        self._snapshot: Optional[DependencyGraphSnapshot] = None
+        self.clear()
+
+    @classmethod
+    def from_files(
+        cls,
+        dependency_file: Optional[str] = None,
+        compliance_file: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> 'InMemoryGraphBackend':
+        """
+        Build a graph from a dependency file and/or compliance controls file
+
+        Args:
+            dependency_file: sample_dependencies.json-style file or raw discovery output
+            compliance_file: compliance_controls.json-style file
+            project_id: GCP project for discovery output (default: from the file)
+
+        Returns:
+            Populated backend
+        """
+        backend = cls()
+        if dependency_file:
+            data = load_dependency_file(dependency_file, project_id)
+            backend.write_dependencies(data.get('vendors', []))
+        if compliance_file:
+            backend.write_compliance_controls(load_json_file(compliance_file))
+
+        counts = backend.counts()
+        backend.logger.info(
+            f"✅ In-memory graph loaded: {counts['Vendor_count']} vendors, {counts['Service_count']} services, "
+            f"{counts['BusinessProcess_count']} business processes, {counts['relationship_count']} relationships"
+        )
+        return backend
+
+    def clear(self) -> None:
+        """Delete every node and relationship (see GraphBackend.clear)"""
+        self.nodes = {}
+        self.labels = {}
+        self.out_edges = {}
+        self.in_edges = {}
+        self.indexes = {
+            (label, prop): {} for label, props in INDEXED_PROPERTIES.items() for prop in props
+        }
+        self._ids = itertools.count(1)
+        self._version = None
+        self._snapshot = None
+
+    # ---- Graph primitives ----
+
+    def add_node(self, label: str, properties: Dict[str, Any]) -> str:
+        """
+        Create a node (CREATE, not MERGE: may add a duplicate)
+
+        Args:
+            label: Node label
+            properties: Node properties (None values are not stored)
+
+        Returns:
+            Node id
+        """
+        node_id = f"n{next(self._ids)}"
+        self.labels[node_id] = label
+        self.nodes[node_id] = {k: v for k, v in properties.items() if v is not None}
+        self.out_edges[node_id] = {}
+        self.in_edges[node_id] = {}
+        self._index_node(node_id)
+        return node_id
+
+    def find_node(self, label: str, prop: str, value: Any) -> Optional[str]:
+        """Look up a node id by an indexed identity property"""
+        return self.indexes[(label, prop)].get(value)
+
+    def add_relationship(self, start: str, rel_type: str, end: str, properties: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        MERGE a relationship between two nodes
+
+        Returns:
+            The relationship's property dict (existing or new)
+        """
+        rel = self.out_edges[start].setdefault(rel_type, {}).get(end)
+        if rel is None:
+            rel = {k: v for k, v in (properties or {}).items() if v is not None}
+            self.out_edges[start][rel_type][end] = rel
+            self.in_edges[end].setdefault(rel_type, {})[start] = rel
+        return rel
+
+    def delete_node(self, node_id: str) -> None:
+        """DETACH DELETE a node"""
+        for rel_type, targets in self.out_edges.pop(node_id).items():
+            for target in targets:
+                self.in_edges[target][rel_type].pop(node_id, None)
+        for rel_type, sources in self.in_edges.pop(node_id).items():
+            for source in sources:
+                self.out_edges[source][rel_type].pop(node_id, None)
+        self._unindex_node(node_id)
+        del self.nodes[node_id]
+        del self.labels[node_id]
+
+    def _index_node(self, node_id: str) -> None:
+        """Register a node's identity properties (the first node with a value keeps it)"""
+        label = self.labels[node_id]
+        for prop in INDEXED_PROPERTIES.get(label, ()):
+            value = self.nodes[node_id].get(prop)
+            if value is not None:
+                self.indexes[(label, prop)].setdefault(value, node_id)
+
+    def _unindex_node(self, node_id: str) -> None:
+        """Drop a node from the identity indexes, handing its keys to any remaining duplicate"""
+        label = self.labels[node_id]
+        for prop in INDEXED_PROPERTIES.get(label, ()):
+            value = self.nodes[node_id].get(prop)
+            index = self.indexes[(label, prop)]
+            if value is None or index.get(value) != node_id:
+                continue
+            del index[value]
+            for other_id, other_label in self.labels.items():
+                if other_id != node_id and other_label == label and self.nodes[other_id].get(prop) == value:
+                    index[value] = other_id
+                    break
+
+    def _merge_node(self, label: str, prop: str, value: Any, on_create: Dict[str, Any]) -> Tuple[str, bool]:
+        """MERGE a node on one identity property; returns (node id, created)"""
+        node_id = self.find_node(label, prop, value)
+        if node_id is not None:
+            return node_id, False
+        return self.add_node(label, {prop: value, **on_create}), True
+
+    def _coalesce(self, node_id: str, values: Dict[str, Any]) -> None:
+        """SET n.x = COALESCE(n.x, value) for each value (re-indexing identity keys)"""
+        properties = self.nodes[node_id]
+        for key, value in values.items():
+            if properties.get(key) is None and value is not None:
+                properties[key] = value
+                if key in INDEXED_PROPERTIES.get(self.labels[node_id], ()):
+                    self.indexes[(self.labels[node_id], key)].setdefault(value, node_id)
+
+    def _touch(self) -> None:
+        """Stamp a new graph version and drop the cached snapshot"""
+        self._version = str(uuid.uuid4())
+        self._snapshot = None
+
+    # ---- GraphBackend ----
+
+    def write_dependencies(self, vendors: Iterable[Dict[str, Any]], project_id: Optional[str] = None) -> None:
+        """MERGE vendors, services, business processes and edges (see GraphBackend.write_dependencies)"""
+        plan = build_write_plan(vendors, project_id)
+
+        vendor_fields = ('vendor_id', 'category', 'criticality', 'display_name')
+        for row in plan['vendors']:
+            values = {key: row[key] for key in vendor_fields}
+            node_id, created = self._merge_node('Vendor', 'name', row['normalized_name'], values)
+            if not created:
+                self._coalesce(node_id, values)
+
+        service_fields = ('name', 'type', 'rpm', 'customers_affected')
+        service_ids = []
+        for row in plan['services']:
+            values = {key: row[key] for key in ('service_id',) + service_fields}
+            node_id, created = self._merge_node('Service', 'gcp_resource', row['gcp_resource'], values)
+            if not created:
+                self._coalesce(node_id, values)
+            if row.get('discovery_project') is not None:
+                self.nodes[node_id]['discovery_project'] = row['discovery_project']
+            if row.get('fingerprint') is not None:
+                # Discovery syncs own the fingerprinted properties (as in MERGE_SERVICES_BY_RESOURCE_QUERY)
+                self.nodes[node_id].update({key: row[key] for key in service_fields})
+                self.nodes[node_id]['discovery_fingerprint'] = row['fingerprint']
+            service_ids.append((node_id, row))
+        for row in plan['services_by_id']:
+            values = {key: row[key] for key in service_fields}
+            node_id, created = self._merge_node('Service', 'service_id', row['service_id'], values)
+            if not created:
+                self._coalesce(node_id, values)
+            service_ids.append((node_id, row))
+
+        for row in plan['business_processes']:
+            self._merge_node('BusinessProcess', 'name', row['name'], {})
+
+        for service_id, row in service_ids:
+            for vendor_name in row['vendors']:
+                vendor_id = self.find_node('Vendor', 'name', vendor_name)
+                rel = self.add_relationship(service_id, 'DEPENDS_ON', vendor_id)
+                if row.get('discovery_project') is not None:
+                    rel['discovery_project'] = row['discovery_project']
+            for process_name in row['business_processes']:
+                process_id = self.find_node('BusinessProcess', 'name', process_name)
+                rel = self.add_relationship(service_id, 'SUPPORTS', process_id)
+                if row.get('discovery_project') is not None:
+                    rel['discovery_project'] = row['discovery_project']
+
+        self._touch()
+
+    def write_compliance_controls(self, data: Dict[str, Any]) -> None:
+        """MERGE compliance controls and SATISFIES edges (see GraphBackend.write_compliance_controls)"""
+        plan = build_compliance_plan(data)
+        for row in plan['controls']:
+            node_id, _ = self._merge_node('ComplianceControl', 'control_id', row['control_id'], {})
+            self.nodes[node_id]['framework'] = row['framework']
+        for row in plan['links']:
+            # MATCH semantics: controls for vendors not in the graph are skipped
+            vendor_id = self.find_node('Vendor', 'name', row['normalized_vendor_name'])
+            if vendor_id is not None:
+                self.add_relationship(vendor_id, 'SATISFIES', self.find_node('ComplianceControl', 'control_id', row['control_id']))
+        self._touch()
+
+    def counts(self) -> Dict[str, int]:
+        """Count nodes per label and relationships (see GraphBackend.counts)"""
+        stats = {f"{label}_count": 0 for label in NODE_LABELS}
+        for label in self.labels.values():
+            stats[f"{label}_count"] = stats.get(f"{label}_count", 0) + 1
+        stats['relationship_count'] = sum(
+            len(targets) for edges in self.out_edges.values() for targets in edges.values()
+        )
+        return stats
+
+    def snapshot(self) -> DependencyGraphSnapshot:
+        """Read the whole graph into a snapshot (see GraphBackend.snapshot)"""
+        if self._snapshot is not None:
+            return self._snapshot
+
+        vendors, services, depends_on, satisfies = [], [], [], []
+        for node_id, label in self.labels.items():
+            properties = self.nodes[node_id]
+            edges = self.out_edges[node_id]
+            if label == 'Vendor':
+                vendors.append({'name': properties.get('name'), 'display_name': properties.get('display_name')})
+                for control_id in edges.get('SATISFIES', {}):
+                    control = self.nodes[control_id]
+                    satisfies.append({
+                        'vendor_name': properties.get('name'),
+                        'control_id': control.get('control_id'),
+                        'framework': control.get('framework')
+                    })
+            elif label == 'Service':
+                services.append({
+                    'service_key': node_id,
+                    'service_name': properties.get('name'),
+                    'service_type': properties.get('type'),
+                    'rpm': properties.get('rpm'),
+                    'customers_affected': properties.get('customers_affected'),
+                    'business_processes': [self.nodes[p].get('name') for p in edges.get('SUPPORTS', {})]
+                })
+                for vendor_id in edges.get('DEPENDS_ON', {}):
+                    depends_on.append({'service_key': node_id, 'vendor_name': self.nodes[vendor_id].get('name')})
+
+        self._snapshot = DependencyGraphSnapshot.from_records(vendors, services, depends_on, satisfies)
+        return self._snapshot
+
+    def affected_services(self, vendor_name: str) -> List[Dict[str, Any]]:
+        """Get services that depend on a vendor (see GraphBackend.affected_services)"""
+        return self.snapshot().affected_services(vendor_name)
+
+    def affected_services_union(self, vendor_names: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Get the union of services that depend on several vendors (see GraphBackend.affected_services_union)"""
+        return self.snapshot().affected_services_union(vendor_names)
+
+    def graph_version(self) -> str:
+        """Get the graph version token (see GraphBackend.graph_version)"""
+        return self._version or UNVERSIONED
+
+    def merge_duplicates(self, kind: str, dry_run: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+        """Merge duplicate Vendor or Service nodes (see GraphBackend.merge_duplicates)"""
+        spec = MERGE_SPECS[kind]
+
+        # Same grouping as the Neo4j find-groups query, then the same plan
+        nodes_by_key: Dict[str, List[Dict[str, Any]]] = {}
+        for node_id, label in self.labels.items():
+            if label != spec['label']:
+                continue
+            merge_key = spec['merge_key'](self.nodes[node_id])
+            if merge_key is None:
+                continue
+            degree = sum(len(ids) for ids in self.out_edges[node_id].values()) + \
+                sum(len(ids) for ids in self.in_edges[node_id].values())
+            nodes_by_key.setdefault(merge_key, []).append({
+                'id': node_id,
+                'properties': dict(self.nodes[node_id]),
+                'degree': degree
+            })
+        records = [
+            {'merge_key': key, 'nodes': nodes}
+            for key, nodes in sorted(nodes_by_key.items()) if len(nodes) > 1
+        ]
+        groups = plan_merge_groups(kind, records)
+
+        report = {
+            'label': spec['label'],
+            'groups': groups,
+            'duplicates': sum(len(group['duplicates']) for group in groups),
+            'merged': 0,
+            'relationships_moved': 0,
+            'transactions': 0,
+            'dry_run': dry_run
+        }
+        if dry_run or not groups:
+            return report
+
+        for group in groups:
+            keep = group['keep']['id']
+            for duplicate in group['duplicates']:
+                dup = duplicate['id']
+                for direction, rel_type, other_label in spec['relationships']:
+                    edges = self.in_edges[dup] if direction == 'in' else self.out_edges[dup]
+                    for other, properties in list(edges.get(rel_type, {}).items()):
+                        if self.labels[other] != other_label:
+                            continue
+                        if direction == 'in':
+                            self.add_relationship(other, rel_type, keep, properties)
+                        else:
+                            self.add_relationship(keep, rel_type, other, properties)
+                        report['relationships_moved'] += 1
+                self.delete_node(dup)
+                report['merged'] += 1
+
+            self._unindex_node(keep)
+            self.nodes[keep] = dict(group['properties'])
+            self._index_node(keep)
+        report['transactions'] = 1
+
+        self._touch()
+        return report
@@ -0,0 +1,239 @@
+"""
+In-Memory Dependency Graph Snapshot
+
+Loads the Vendor/Service/BusinessProcess/ComplianceControl graph from Neo4j once
+and keeps it as compact adjacency structures, so operational impact can be
+answered from memory instead of a Cypher round trip per simulation.
+
+The graph only changes after a discovery load, so callers refresh the snapshot
+explicitly (see VendorFailureSimulator.refresh_snapshot).
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+
+# Queries used to build the snapshot (one pass per label/relationship type)
+VENDORS_QUERY = """
+MATCH (v:Vendor)
+RETURN v.name as name, v.display_name as display_name
+"""
+
+SERVICES_QUERY = """
+MATCH (s:Service)
+OPTIONAL MATCH (s)-[:SUPPORTS]->(bp:BusinessProcess)
+RETURN elementId(s) as service_key,
+       s.name as service_name,
+       s.type as service_type,
+       s.rpm as rpm,
+       s.customers_affected as customers_affected,
+       collect(DISTINCT bp.name) as business_processes
+"""
+
+DEPENDS_ON_QUERY = """
+MATCH (s:Service)-[:DEPENDS_ON]->(v:Vendor)
+RETURN elementId(s) as service_key, v.name as vendor_name
+"""
+
+SATISFIES_QUERY = """
+MATCH (v:Vendor)-[:SATISFIES]->(cc:ComplianceControl)
+RETURN v.name as vendor_name, cc.control_id as control_id, cc.framework as framework
+"""
+
+
+class DependencyGraphSnapshot:
+    """Read-only, in-memory copy of the vendor dependency graph"""
+
+    def __init__(self):
+        """Create an empty snapshot (use from_neo4j or from_records to populate)"""
+        # Vendors, indexed by the name stored on the node (normalized lowercase)
+        self.vendor_index: Dict[str, int] = {}
+        self.vendor_names: List[str] = []
+        self.vendor_display_names: List[Optional[str]] = []
+
+        # Services as (name, type, rpm, customers_affected) tuples
+        self.services: List[Tuple[Any, Any, int, int]] = []
+        self.service_processes: List[Tuple[int, ...]] = []
+        self.process_names: List[str] = []
+
+        # Adjacency: vendor -> services that depend on it, vendor -> controls it satisfies
+        self.vendor_services: List[Tuple[int, ...]] = []
+        self.vendor_controls: List[Tuple[Tuple[str, str], ...]] = []
+
+        self.loaded_at: Optional[str] = None
+
+    @classmethod
+    def from_neo4j(cls, driver) -> 'DependencyGraphSnapshot':
+        """
+        Build a snapshot by reading the whole graph from Neo4j
+
+        Args:
+            driver: Neo4j driver instance
+
+        Returns:
+            Populated snapshot
+        """
+        logger = logging.getLogger(__name__)
+        logger.info("Loading dependency graph snapshot from Neo4j...")
+
+        with driver.session() as session:
+            vendors = [dict(record) for record in session.run(VENDORS_QUERY)]
+            services = [dict(record) for record in session.run(SERVICES_QUERY)]
+            depends_on = [dict(record) for record in session.run(DEPENDS_ON_QUERY)]
+            satisfies = [dict(record) for record in session.run(SATISFIES_QUERY)]
+
+        snapshot = cls.from_records(vendors, services, depends_on, satisfies)
+        logger.info(
+            f"✅ Snapshot loaded: {len(snapshot.vendor_names)} vendors, "
+            f"{len(snapshot.services)} services, {len(snapshot.process_names)} business processes"
+        )
+        return snapshot
+
+    @classmethod
+    def from_records(
+        cls,
+        vendors: Iterable[Dict[str, Any]],
+        services: Iterable[Dict[str, Any]],
+        depends_on: Iterable[Dict[str, Any]],
+        satisfies: Iterable[Dict[str, Any]] = ()
+    ) -> 'DependencyGraphSnapshot':
+        """
+        Build a snapshot from query result rows
+
+        Args:
+            vendors: Rows with name, display_name
+            services: Rows with service_key, service_name, service_type, rpm,
+                customers_affected, business_processes
+            depends_on: Rows with service_key, vendor_name
+            satisfies: Rows with vendor_name, control_id, framework
+
+        Returns:
+            Populated snapshot
+        """
+        snapshot = cls()
+
+        for vendor in vendors:
+            snapshot._add_vendor(vendor['name'], vendor.get('display_name'))
+
+        service_index = {}
+        process_index = {}
+        for service in services:
+            service_index[service['service_key']] = len(snapshot.services)
+            snapshot.services.append((
+                service.get('service_name'),
+                service.get('service_type'),
+                service.get('rpm') or 0,
+                service.get('customers_affected') or 0
+            ))
+            process_ids = []
+            for process_name in service.get('business_processes') or []:
+                if process_name is None:
+                    continue
+                if process_name not in process_index:
+                    process_index[process_name] = len(snapshot.process_names)
+                    snapshot.process_names.append(process_name)
+                process_ids.append(process_index[process_name])
+            snapshot.service_processes.append(tuple(process_ids))
+
+        vendor_services: Dict[int, List[int]] = {}
+        for edge in depends_on:
+            service_id = service_index.get(edge['service_key'])
+            if service_id is None:
+                continue
+            vendor_id = snapshot._add_vendor(edge['vendor_name'])
+            vendor_services.setdefault(vendor_id, []).append(service_id)
+
+        vendor_controls: Dict[int, List[Tuple[str, str]]] = {}
+        for edge in satisfies:
+            vendor_id = snapshot._add_vendor(edge['vendor_name'])
+            vendor_controls.setdefault(vendor_id, []).append((edge.get('framework'), edge['control_id']))
+
+        # Freeze adjacency lists (dict.fromkeys de-duplicates while keeping order)
+        vendor_count = len(snapshot.vendor_names)
+        snapshot.vendor_services = [
+            tuple(dict.fromkeys(vendor_services.get(v, ()))) for v in range(vendor_count)
+        ]
+        snapshot.vendor_controls = [
+            tuple(vendor_controls.get(v, ())) for v in range(vendor_count)
+        ]
+        snapshot.loaded_at = datetime.utcnow().isoformat()
+        return snapshot
+
+    def _add_vendor(self, name: str, display_name: Optional[str] = None) -> int:
+        """Register a vendor name and return its index"""
+        vendor_id = self.vendor_index.get(name)
+        if vendor_id is None:
+            vendor_id = len(self.vendor_names)
+            self.vendor_index[name] = vendor_id
+            self.vendor_names.append(name)
+            self.vendor_display_names.append(display_name)
+        elif display_name and not self.vendor_display_names[vendor_id]:
+            self.vendor_display_names[vendor_id] = display_name
+        return vendor_id
+
+    def has_vendor(self, vendor_name: str) -> bool:
+        """Check whether a (normalized) vendor name exists in the snapshot"""
+        return vendor_name in self.vendor_index
+
+    def affected_services(self, vendor_name: str) -> List[Dict[str, Any]]:
+        """
+        Get services that depend on a vendor
+
+        Args:
+            vendor_name: Normalized vendor name (as stored on the Vendor node)
+
+        Returns:
+            Service rows in the same shape as the Neo4j operational impact query
+        """
+        vendor_id = self.vendor_index.get(vendor_name)
+        if vendor_id is None:
+            return []
+        return [self._service_row(service_id) for service_id in self.vendor_services[vendor_id]]
+
+    def affected_services_union(self, vendor_names: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        Get the union of services that depend on any of several vendors
+
+        Args:
+            vendor_names: Normalized vendor names
+
+        Returns:
+            Tuple of (service rows, each service once; per-vendor service counts)
+        """
+        service_ids: Dict[int, None] = {}
+        vendor_service_counts = {}
+        for vendor_name in vendor_names:
+            vendor_id = self.vendor_index.get(vendor_name)
+            ids = self.vendor_services[vendor_id] if vendor_id is not None else ()
+            vendor_service_counts[vendor_name] = len(ids)
+            service_ids.update(dict.fromkeys(ids))
+        return [self._service_row(service_id) for service_id in service_ids], vendor_service_counts
+
+    def _service_row(self, service_id: int) -> Dict[str, Any]:
+        """Materialize one service as an operational impact row"""
+        name, service_type, rpm, customers = self.services[service_id]
+        process_names = self.process_names
+        return {
+            'name': name,
+            'type': service_type,
+            'rpm': rpm,
+            'customers_affected': customers,
+            'business_processes': [process_names[p] for p in self.service_processes[service_id]]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get snapshot size information
+
+        Returns:
+            Dictionary with node/edge counts and load time
+        """
+        return {
+            'vendors': len(self.vendor_names),
+            'services': len(self.services),
+            'business_processes': len(self.process_names),
+            'depends_on': sum(len(ids) for ids in self.vendor_services),
+            'satisfies': sum(len(controls) for controls in self.vendor_controls),
+            'loaded_at': self.loaded_at
+        }
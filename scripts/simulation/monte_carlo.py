@@ -0,0 +1,208 @@
+"""
+Monte Carlo Outage-Duration Engine
+
+Replaces the single fixed duration of VendorFailureSimulator's financial model
+with sampled outage durations (and optionally sampled revenue rates) and
+reports percentile losses per vendor.
+
+Samples for a chunk of vendors are held in one vendors x samples matrix, so the
+loss model and the percentile reduction run as batched NumPy operations. Each
+vendor draws from its own RNG stream derived from (seed, vendor name), which
+keeps results reproducible regardless of the vendor list or chunk size.
+
+Supported distributions (simulation.monte_carlo in config.yaml):
+    duration: lognormal (median_hours, sigma), uniform (min_hours, max_hours),
+              triangular (min_hours, mode_hours, max_hours), fixed (hours)
+    revenue_per_hour: fixed, normal (cv), lognormal (sigma); relative to
+              simulation.business.revenue_per_hour
+"""
+
+import zlib
+from typing import Dict, Any, Sequence
+
+import numpy as np
+
+
+DURATION_DISTRIBUTIONS = ('lognormal', 'uniform', 'triangular', 'fixed')
+RATE_DISTRIBUTIONS = ('fixed', 'normal', 'lognormal')
+
+# Upper bound on matrix elements per chunk (~32MB per float64 matrix)
+DEFAULT_CHUNK_ELEMENTS = 4000000
+
+
+def vendor_rng(seed: int, vendor_key: str) -> np.random.Generator:
+    """
+    Create the RNG stream for one vendor
+
+    Args:
+        seed: Base seed
+        vendor_key: Normalized vendor name
+
+    Returns:
+        Generator seeded from (seed, vendor_key)
+    """
+    sequence = np.random.SeedSequence(seed, spawn_key=(zlib.crc32(vendor_key.encode('utf-8')),))
+    return np.random.default_rng(sequence)
+
+
+def validate_model(model: Dict[str, Any]) -> None:
+    """
+    Validate a Monte Carlo model configuration
+
+    Args:
+        model: simulation.monte_carlo section of config
+
+    Raises:
+        ValueError: If a distribution is unknown or missing parameters
+    """
+    duration = model.get('duration', {})
+    distribution = duration.get('distribution', 'lognormal')
+    if distribution not in DURATION_DISTRIBUTIONS:
+        raise ValueError(f"Unknown duration distribution '{distribution}'. Use one of: {DURATION_DISTRIBUTIONS}")
+
+    required = {
+        'lognormal': ['median_hours', 'sigma'],
+        'uniform': ['min_hours', 'max_hours'],
+        'triangular': ['min_hours', 'mode_hours', 'max_hours'],
+        'fixed': ['hours']
+    }[distribution]
+    missing = [key for key in required if key not in duration]
+    if missing:
+        raise ValueError(f"Duration distribution '{distribution}' requires: {', '.join(missing)}")
+
+    revenue = model.get('revenue_per_hour', {})
+    rate_distribution = revenue.get('distribution', 'fixed')
+    if rate_distribution not in RATE_DISTRIBUTIONS:
+        raise ValueError(f"Unknown revenue distribution '{rate_distribution}'. Use one of: {RATE_DISTRIBUTIONS}")
+
+
+def _draw_base(rng: np.random.Generator, distribution: str, out: np.ndarray) -> None:
+    """Fill out with the base variates (standard normal or uniform) for a distribution"""
+    if distribution in ('lognormal', 'normal'):
+        rng.standard_normal(out=out)
+    elif distribution in ('uniform', 'triangular'):
+        rng.random(out=out)
+
+
+def _durations_from_base(spec: Dict[str, Any], base: np.ndarray) -> np.ndarray:
+    """Transform base variates into outage durations (vectorized over the chunk)"""
+    distribution = spec.get('distribution', 'lognormal')
+
+    if distribution == 'lognormal':
+        durations = np.exp(np.log(spec['median_hours']) + spec['sigma'] * base)
+    elif distribution == 'uniform':
+        durations = spec['min_hours'] + (spec['max_hours'] - spec['min_hours']) * base
+    elif distribution == 'triangular':
+        # Inverse CDF of the triangular distribution
+        low, mode, high = spec['min_hours'], spec['mode_hours'], spec['max_hours']
+        split = (mode - low) / (high - low) if high > low else 0.0
+        durations = np.where(
+            base < split,
+            low + np.sqrt(base * (high - low) * (mode - low)),
+            high - np.sqrt((1 - base) * (high - low) * (high - mode))
+        )
+    else:
+        durations = np.full(base.shape, float(spec['hours']))
+
+    if 'min_hours' in spec or 'max_hours' in spec:
+        np.clip(durations, spec.get('min_hours', 0.0), spec.get('max_hours', np.inf), out=durations)
+    return durations
+
+
+def _rates_from_base(spec: Dict[str, Any], base: np.ndarray) -> np.ndarray:
+    """Transform base variates into multipliers of the configured rate"""
+    distribution = spec.get('distribution', 'fixed')
+    if distribution == 'normal':
+        return np.maximum(1.0 + spec.get('cv', 0.0) * base, 0.0)
+    if distribution == 'lognormal':
+        return np.exp(spec.get('sigma', 0.0) * base)
+    return np.ones(base.shape)
+
+
+def simulate_loss_percentiles(
+    vendor_keys: Sequence[str],
+    revenue_loss_percentage: np.ndarray,
+    customer_impact_cost: np.ndarray,
+    model: Dict[str, Any],
+    revenue_per_hour: float,
+    samples: int,
+    seed: int,
+    percentiles: Sequence[float] = (50, 90, 99),
+    chunk_elements: int = DEFAULT_CHUNK_ELEMENTS
+) -> Dict[str, np.ndarray]:
+    """
+    Sample financial losses for many vendors and reduce them to percentiles
+
+    Loss per sample follows VendorFailureSimulator's financial model:
+    revenue_per_hour * duration * revenue_loss_percentage + customer_impact_cost
+
+    Args:
+        vendor_keys: Normalized vendor names (used to derive RNG streams)
+        revenue_loss_percentage: Per-vendor share of revenue lost while down
+        customer_impact_cost: Per-vendor fixed customer impact cost
+        model: simulation.monte_carlo section of config
+        revenue_per_hour: Baseline revenue rate
+        samples: Samples per vendor
+        seed: Base seed
+        percentiles: Percentiles to report (0-100)
+        chunk_elements: Maximum vendors x samples elements held at once
+
+    Returns:
+        Dictionary with 'percentiles' (vendors x len(percentiles)), 'mean' and
+        'duration_percentiles' (pooled across sampled vendors)
+    """
+    validate_model(model)
+    if samples < 1:
+        raise ValueError("samples must be at least 1")
+
+    duration_spec = model.get('duration', {})
+    revenue_spec = model.get('revenue_per_hour', {})
+    duration_distribution = duration_spec.get('distribution', 'lognormal')
+    revenue_distribution = revenue_spec.get('distribution', 'fixed')
+    stochastic_revenue = revenue_distribution != 'fixed'
+
+    vendor_count = len(vendor_keys)
+    quantiles = np.asarray(percentiles, dtype=np.float64)
+    loss_percentiles = np.empty((vendor_count, len(quantiles)))
+    mean_loss = np.empty(vendor_count)
+
+    # Vendors with no revenue exposure have a deterministic loss: skip sampling them
+    exposed = np.flatnonzero(revenue_loss_percentage > 0)
+    unexposed = np.flatnonzero(revenue_loss_percentage <= 0)
+    loss_percentiles[unexposed] = customer_impact_cost[unexposed, None]
+    mean_loss[unexposed] = customer_impact_cost[unexposed]
+
+    chunk = max(1, min(len(exposed), chunk_elements // samples)) if len(exposed) else 1
+    base = np.empty((chunk, samples))
+    rate_base = np.empty((chunk, samples)) if stochastic_revenue else None
+    duration_sums = np.zeros(len(quantiles))
+    chunks = 0
+
+    for start in range(0, len(exposed), chunk):
+        vendor_ids = exposed[start:start + chunk]
+        rows = len(vendor_ids)
+
+        for row, vendor_id in enumerate(vendor_ids):
+            rng = vendor_rng(seed, vendor_keys[vendor_id])
+            _draw_base(rng, duration_distribution, base[row])
+            if stochastic_revenue:
+                _draw_base(rng, revenue_distribution, rate_base[row])
+
+        loss = _durations_from_base(duration_spec, base[:rows])
+        duration_sums += np.percentile(loss, quantiles)
+        chunks += 1
+
+        loss *= revenue_per_hour
+        if stochastic_revenue:
+            loss *= _rates_from_base(revenue_spec, rate_base[:rows])
+        loss *= revenue_loss_percentage[vendor_ids, None]
+        loss += customer_impact_cost[vendor_ids, None]
+
+        loss_percentiles[vendor_ids] = np.percentile(loss, quantiles, axis=1).T
+        mean_loss[vendor_ids] = loss.mean(axis=1)
+
+    return {
+        'percentiles': loss_percentiles,
+        'mean': mean_loss,
+        'duration_percentiles': duration_sums / chunks if chunks else np.zeros(len(quantiles))
+    }
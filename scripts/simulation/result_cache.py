@@ -0,0 +1,190 @@
+"""
+Versioned Simulation Result Cache
+
+Bounded LRU + TTL cache for simulation results, keyed by normalized vendor(s),
+duration and the dependency graph version token.
+
+Graph loaders stamp a (:GraphMeta {id: 'dependency_graph'}) node with a new
+version token after every write. GraphVersionTracker reads that token at most
+once per check interval, so cached results are served without touching Neo4j
+and are naturally invalidated once a discovery load changes the graph.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Sequence, Tuple, Union
+
+
+GRAPH_VERSION_QUERY = """
+MATCH (m:GraphMeta {id: 'dependency_graph'})
+RETURN m.version as version, m.updated_at as updated_at
+"""
+
+# Token used when the graph has never been stamped by a loader
+UNVERSIONED = 'unversioned'
+
+
+def make_cache_key(
+    vendor: Union[str, Sequence[str]],
+    duration_hours: int,
+    graph_version: str
+) -> Tuple[Hashable, ...]:
+    """
+    Build a cache key for a simulation request
+
+    Args:
+        vendor: Vendor name or list of vendor names (order preserved, duplicates dropped)
+        duration_hours: Failure duration in hours
+        graph_version: Graph version token
+
+    Returns:
+        Hashable cache key
+    """
+    names = [vendor] if isinstance(vendor, str) else vendor
+    normalized = tuple(dict.fromkeys(name.lower().strip() for name in names))
+    return (normalized, int(duration_hours), graph_version)
+
+
+class SimulationResultCache:
+    """Thread-safe LRU cache with per-entry time-to-live"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 900):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Maximum number of cached results (least recently used evicted first)
+            ttl_seconds: Seconds a result stays valid after it is stored
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached result
+
+        Args:
+            key: Cache key (see make_cache_key)
+
+        Returns:
+            Cached value, or None on miss/expiry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a result, evicting the least recently used entry if full
+
+        Args:
+            key: Cache key (see make_cache_key)
+            value: Result to cache (treated as read-only by callers)
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached results (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with size, limits, hit/miss/eviction/expiration counts and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class GraphVersionTracker:
+    """Reads the graph version token from Neo4j, at most once per check interval"""
+
+    def __init__(self, driver, check_interval_seconds: float = 30):
+        """
+        Initialize tracker
+
+        Args:
+            driver: Neo4j driver instance
+            check_interval_seconds: Minimum seconds between version queries
+        """
+        self.logger = logging.getLogger(__name__)
+        self.driver = driver
+        self.check_interval_seconds = check_interval_seconds
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> str:
+        """
+        Get the current graph version token
+
+        Returns:
+            Version token (UNVERSIONED if no loader has stamped the graph yet)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._version is None or now - self._checked_at >= self.check_interval_seconds:
+                self._version = self._read_version()
+                self._checked_at = now
+            return self._version
+
+    def invalidate(self) -> None:
+        """Force the next call to current() to query Neo4j"""
+        with self._lock:
+            self._version = None
+
+    def _read_version(self) -> str:
+        """Query the GraphMeta node for the version token"""
+        try:
+            with self.driver.session() as session:
+                record = session.run(GRAPH_VERSION_QUERY).single()
+        except Exception as e:
+            # Keep serving against the last known version rather than failing simulations
+            self.logger.warning(f"⚠️  Failed to read graph version: {e}")
+            return self._version or UNVERSIONED
+
+        if record is None or record['version'] is None:
+            return UNVERSIONED
+        return str(record['version'])
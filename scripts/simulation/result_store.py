@@ -0,0 +1,407 @@
+"""
+Simulation Result Store
+
+Persists simulation results so they can be fetched by ID after the request
+that produced them has finished (GET /simulate/<simulation_id>) and listed
+by vendor and time.
+
+Backends:
+    sqlite  Local file, for development (indexed by ID and by vendor/time)
+    gcs     Cloud Storage, for Cloud Run (instances share one bucket):
+
+        {prefix}results/{simulation_id}.json.gz         gzip-compressed result
+        {prefix}index/{vendor}/{inverted_ts}_{id}       empty listing objects whose
+        {prefix}index/_all/{inverted_ts}_{id}           metadata holds the summary
+
+The inverted timestamp makes GCS name order newest-first, so a listing page
+is a single prefix list call and never reads result payloads.
+
+Payloads are gzip-compressed JSON in both backends.
+"""
+
+import base64
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from scripts.utils import get_project_root
+
+
+# Listing key for results of every vendor (GCS backend)
+ALL_VENDORS = '_all'
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Inverted microsecond timestamps (same precision as created_at) stay 17 digits for millennia
+_INVERTED_TS_BASE = 10 ** 17
+
+# Characters allowed in simulation IDs (anything else in a vendor name becomes '_')
+_ID_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9._+-]+')
+# Longest vendor part of an ID (IDs are capped at 200 characters)
+MAX_VENDOR_SLUG_LENGTH = 100
+
+# Summary fields kept alongside each result for listings
+SUMMARY_FIELDS = ('simulation_id', 'vendor', 'duration_hours', 'overall_impact_score', 'created_at')
+
+
+def vendor_slug(vendor_key: str) -> str:
+    """
+    Make a vendor key safe to embed in a simulation ID
+
+    Args:
+        vendor_key: Normalized vendor name ('mongodb atlas', 'stripe+auth0', ...)
+
+    Returns:
+        Slug like 'mongodb_atlas' (starts with a letter or digit)
+    """
+    slug = _ID_UNSAFE_CHARS.sub('_', vendor_key)[:MAX_VENDOR_SLUG_LENGTH].strip('._+-')
+    return slug or 'vendor'
+
+
+def new_simulation_id(vendor_key: str) -> str:
+    """
+    Build a collision-free simulation ID
+
+    Args:
+        vendor_key: Normalized vendor name ('stripe', 'stripe+auth0', ...)
+
+    Returns:
+        ID like 'stripe-20250101120000-3f2a9c1be04d' (readable prefix, random suffix)
+    """
+    timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+    return f"{vendor_slug(vendor_key)}-{timestamp}-{uuid.uuid4().hex[:12]}"
+
+
+def normalize_timestamp(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize an ISO-8601 timestamp to the fixed-width UTC form used for ordering
+
+    Args:
+        value: ISO-8601 timestamp (naive values are treated as UTC), or None
+
+    Returns:
+        'YYYY-MM-DDTHH:MM:SS.ffffffZ', or None
+    """
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def compress_result(result: Dict[str, Any]) -> bytes:
+    """Serialize a result as gzip-compressed JSON"""
+    return gzip.compress(json.dumps(result, separators=(',', ':')).encode('utf-8'))
+
+
+def decompress_result(payload: bytes) -> Dict[str, Any]:
+    """Inverse of compress_result"""
+    return json.loads(gzip.decompress(payload))
+
+
+def _summary(simulation_id: str, vendor_key: str, result: Dict[str, Any], created_at: str) -> Dict[str, Any]:
+    """Listing entry for a stored result"""
+    return {
+        'simulation_id': simulation_id,
+        'vendor': vendor_key,
+        'duration_hours': result.get('duration_hours'),
+        'overall_impact_score': result.get('overall_impact_score'),
+        'created_at': created_at
+    }
+
+
+class SimulationResultStore:
+    """Interface shared by the result store backends"""
+
+    backend = 'none'
+
+    def put(self, simulation_id: str, vendor_key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a simulation result
+
+        Args:
+            simulation_id: Result ID (see new_simulation_id)
+            vendor_key: Normalized vendor name used for listing
+            result: Simulation result dictionary
+
+        Returns:
+            Listing summary of the stored result
+        """
+        raise NotImplementedError
+
+    def get(self, simulation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a stored result by ID
+
+        Args:
+            simulation_id: Result ID
+
+        Returns:
+            Simulation result dictionary, or None if not stored
+        """
+        raise NotImplementedError
+
+    def list_results(
+        self,
+        vendor: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List stored results, newest first
+
+        Args:
+            vendor: Only results for this normalized vendor key
+            since: Only results created at or after this ISO-8601 time
+            until: Only results created before this ISO-8601 time
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            cursor: next_cursor from the previous page
+
+        Returns:
+            Dictionary with 'results' (summaries) and 'next_cursor' (None on the last page)
+        """
+        raise NotImplementedError
+
+
+class SQLiteResultStore(SimulationResultStore):
+    """Result store in a local SQLite database"""
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str):
+        """
+        Initialize store
+
+        Args:
+            path: Database file (created if missing)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ':memory:':
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS simulation_results (
+                    simulation_id TEXT PRIMARY KEY,
+                    vendor TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    duration_hours INTEGER,
+                    overall_impact_score REAL,
+                    payload BLOB NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_results_vendor_created
+                ON simulation_results (vendor, created_at, simulation_id)
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_results_created
+                ON simulation_results (created_at, simulation_id)
+            """)
+
+    def put(self, simulation_id: str, vendor_key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a simulation result (see SimulationResultStore.put)"""
+        created_at = normalize_timestamp(datetime.utcnow().isoformat())
+        summary = _summary(simulation_id, vendor_key, result, created_at)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO simulation_results VALUES (?, ?, ?, ?, ?, ?)",
+                (simulation_id, vendor_key, created_at, summary['duration_hours'],
+                 summary['overall_impact_score'], compress_result(result))
+            )
+        return summary
+
+    def get(self, simulation_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a stored result by ID (see SimulationResultStore.get)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM simulation_results WHERE simulation_id = ?",
+                (simulation_id,)
+            ).fetchone()
+        return decompress_result(row[0]) if row else None
+
+    def list_results(
+        self,
+        vendor: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """List stored results, newest first (see SimulationResultStore.list_results)"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clauses, params = [], []
+        if vendor:
+            clauses.append("vendor = ?")
+            params.append(vendor)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(normalize_timestamp(since))
+        if until:
+            clauses.append("created_at < ?")
+            params.append(normalize_timestamp(until))
+        if cursor:
+            # Keyset pagination: continue strictly after the last row returned
+            last_created, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            clauses.append("(created_at, simulation_id) < (?, ?)")
+            params.extend([last_created, last_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT simulation_id, vendor, duration_hours, overall_impact_score, created_at "
+                f"FROM simulation_results {where} "
+                f"ORDER BY created_at DESC, simulation_id DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+
+        results = [dict(zip(SUMMARY_FIELDS, row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = results[-1]
+            next_cursor = base64.urlsafe_b64encode(
+                json.dumps([last['created_at'], last['simulation_id']]).encode()
+            ).decode()
+        return {'results': results, 'next_cursor': next_cursor}
+
+
+class GCSResultStore(SimulationResultStore):
+    """Result store in a Cloud Storage bucket (see module docstring for the layout)"""
+
+    backend = 'gcs'
+
+    def __init__(self, bucket, prefix: str = 'simulations/'):
+        """
+        Initialize store
+
+        Args:
+            bucket: google.cloud.storage Bucket
+            prefix: Object name prefix for results and listing objects
+        """
+        self.logger = logging.getLogger(__name__)
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _result_blob_name(self, simulation_id: str) -> str:
+        return f"{self.prefix}results/{simulation_id}.json.gz"
+
+    def _index_prefix(self, vendor: Optional[str]) -> str:
+        return f"{self.prefix}index/{vendor or ALL_VENDORS}/"
+
+    @staticmethod
+    def _inverted_ts(created_at: str) -> str:
+        """Inverted epoch microseconds, so newer results sort first by name"""
+        parsed = datetime.strptime(created_at, '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo=timezone.utc)
+        micros = (parsed - datetime(1970, 1, 1, tzinfo=timezone.utc)) // timedelta(microseconds=1)
+        return f"{_INVERTED_TS_BASE - micros:017d}"
+
+    def put(self, simulation_id: str, vendor_key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a simulation result (see SimulationResultStore.put)"""
+        created_at = normalize_timestamp(datetime.utcnow().isoformat())
+        summary = _summary(simulation_id, vendor_key, result, created_at)
+        metadata = {key: json.dumps(value) for key, value in summary.items()}
+
+        # Payload first: every listed ID can be fetched
+        self.bucket.blob(self._result_blob_name(simulation_id)).upload_from_string(
+            compress_result(result),
+            content_type='application/gzip'
+        )
+        entry_name = f"{self._inverted_ts(created_at)}_{simulation_id}"
+        for vendor in (vendor_key, None):
+            blob = self.bucket.blob(self._index_prefix(vendor) + entry_name)
+            blob.metadata = metadata
+            blob.upload_from_string(b'', content_type='application/octet-stream')
+        return summary
+
+    def get(self, simulation_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a stored result by ID (see SimulationResultStore.get)"""
+        from google.api_core.exceptions import NotFound
+
+        try:
+            payload = self.bucket.blob(self._result_blob_name(simulation_id)).download_as_bytes()
+        except NotFound:
+            return None
+        return decompress_result(payload)
+
+    def list_results(
+        self,
+        vendor: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """List stored results, newest first (see SimulationResultStore.list_results)"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        prefix = self._index_prefix(vendor)
+        # Names are newest-first, so 'until' bounds the start and 'since' the end
+        start_offset = prefix + self._inverted_ts(normalize_timestamp(until)) + '`' if until else None
+        end_offset = prefix + self._inverted_ts(normalize_timestamp(since)) + '`' if since else None
+
+        blobs = self.bucket.client.list_blobs(
+            self.bucket,
+            prefix=prefix,
+            start_offset=start_offset,
+            end_offset=end_offset,
+            max_results=limit,
+            page_token=cursor
+        )
+        page = next(blobs.pages, [])
+        results = [
+            {key: json.loads(value) for key, value in (blob.metadata or {}).items()}
+            for blob in page
+        ]
+        return {'results': results, 'next_cursor': blobs.next_page_token}
+
+
+def create_result_store(config: Dict[str, Any], project_id: Optional[str] = None) -> Optional[SimulationResultStore]:
+    """
+    Create the configured result store
+
+    Args:
+        config: simulation.result_store section of config.yaml; the
+            SIMULATION_RESULT_STORE environment variable overrides 'backend'
+        project_id: GCP project (GCS backend)
+
+    Returns:
+        Result store, or None when the backend is 'none'
+    """
+    backend = os.getenv('SIMULATION_RESULT_STORE', config.get('backend', 'sqlite')).lower()
+
+    if backend == 'none':
+        return None
+
+    if backend == 'sqlite':
+        path = Path(config.get('sqlite_path', 'data/simulation_results.db'))
+        if not path.is_absolute():
+            path = get_project_root() / path
+        return SQLiteResultStore(str(path))
+
+    if backend == 'gcs':
+        from google.cloud import storage
+
+        bucket_name = os.getenv('SIMULATION_RESULTS_BUCKET', f'{project_id}-simulation-results')
+        client = storage.Client(project=project_id)
+        bucket = client.bucket(bucket_name)
+        if not bucket.exists():
+            logging.getLogger(__name__).info(f"Creating bucket: {bucket_name}")
+            bucket = client.create_bucket(bucket_name, location='us-central1')
+        return GCSResultStore(bucket, config.get('gcs_prefix', 'simulations/'))
+
+    raise ValueError(f"Unknown result store backend: {backend}")
@@ -0,0 +1,261 @@
+"""
+Vectorized All-Vendor Risk Sweep
+
+Computes operational, financial and compliance impact for every vendor across
+every failure duration in a single pass over a dependency graph snapshot.
+
+The vendor -> service relationship is held as a sparse (CSR) vendor x service
+incidence matrix, so per-vendor aggregates are segment reductions over one
+flat array and financial impact is a vendor x duration broadcast. The formulas
+mirror VendorFailureSimulator's single-vendor calculations exactly.
+"""
+
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+from scripts.simulation.graph_snapshot import DependencyGraphSnapshot
+from scripts.utils import DEFAULT_IMPACT_WEIGHTS
+
+
+# Impact model constants, shared with VendorFailureSimulator's single-vendor calculations
+SERVICES_FOR_FULL_OPERATIONAL_IMPACT = 10
+REVENUE_LOSS_PER_SERVICE = 0.25
+COST_PER_AFFECTED_CUSTOMER = 5
+FINANCIAL_IMPACT_NORMALIZER = 1000000
+
+
+def build_incidence(snapshot: DependencyGraphSnapshot) -> Dict[str, np.ndarray]:
+    """
+    Build the sparse vendor x service incidence matrix from a snapshot
+
+    Args:
+        snapshot: Dependency graph snapshot
+
+    Returns:
+        Dictionary with CSR arrays (indptr, indices) and per-service rpm/customers vectors
+    """
+    counts = np.fromiter(
+        (len(ids) for ids in snapshot.vendor_services),
+        dtype=np.int64,
+        count=len(snapshot.vendor_services)
+    )
+    indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    total_edges = int(indptr[-1])
+    indices = np.fromiter(
+        (s for ids in snapshot.vendor_services for s in ids),
+        dtype=np.int64,
+        count=total_edges
+    )
+
+    service_count = len(snapshot.services)
+    rpm = np.fromiter((svc[2] for svc in snapshot.services), dtype=np.float64, count=service_count)
+    customers = np.fromiter((svc[3] for svc in snapshot.services), dtype=np.int64, count=service_count)
+
+    # Service -> business process adjacency (also CSR)
+    process_counts = np.fromiter(
+        (len(ids) for ids in snapshot.service_processes),
+        dtype=np.int64,
+        count=service_count
+    )
+    process_indptr = np.zeros(service_count + 1, dtype=np.int64)
+    np.cumsum(process_counts, out=process_indptr[1:])
+    process_indices = np.fromiter(
+        (p for ids in snapshot.service_processes for p in ids),
+        dtype=np.int64,
+        count=int(process_indptr[-1])
+    )
+
+    return {
+        'indptr': indptr,
+        'indices': indices,
+        'rpm': rpm,
+        'customers': customers,
+        'process_indptr': process_indptr,
+        'process_indices': process_indices
+    }
+
+
+def compute_operational_arrays(
+    incidence: Dict[str, np.ndarray],
+    process_count: int
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate per-vendor operational metrics with segment reductions
+
+    Args:
+        incidence: Output of build_incidence
+        process_count: Number of distinct business processes in the snapshot
+
+    Returns:
+        Per-vendor arrays: service_count, total_rpm, customers_affected,
+        business_process_count, impact_score
+    """
+    indptr = incidence['indptr']
+    indices = incidence['indices']
+    vendor_count = len(indptr) - 1
+
+    service_counts = np.diff(indptr)
+    row_ids = np.repeat(np.arange(vendor_count), service_counts)
+
+    total_rpm = np.bincount(row_ids, weights=incidence['rpm'][indices], minlength=vendor_count)
+
+    # Max customers per vendor: reduce only over non-empty segments
+    customers_affected = np.zeros(vendor_count, dtype=np.int64)
+    non_empty = service_counts > 0
+    if non_empty.any():
+        customers_affected[non_empty] = np.maximum.reduceat(
+            incidence['customers'][indices],
+            indptr[:-1][non_empty]
+        )
+
+    # Distinct business processes per vendor: expand (vendor, service) edges to
+    # (vendor, process) pairs, then count unique pairs per vendor
+    process_indptr = incidence['process_indptr']
+    per_edge = np.diff(process_indptr)[indices]
+    pair_count = int(per_edge.sum())
+    if pair_count and process_count:
+        pair_vendor = np.repeat(row_ids, per_edge)
+        edge_offsets = np.repeat(np.cumsum(per_edge) - per_edge, per_edge)
+        starts = np.repeat(process_indptr[indices], per_edge)
+        pair_process = incidence['process_indices'][starts + np.arange(pair_count) - edge_offsets]
+        unique_pairs = np.unique(pair_vendor * process_count + pair_process)
+        business_process_count = np.bincount(unique_pairs // process_count, minlength=vendor_count)
+    else:
+        business_process_count = np.zeros(vendor_count, dtype=np.int64)
+
+    impact_score = np.minimum(service_counts / SERVICES_FOR_FULL_OPERATIONAL_IMPACT, 1.0)
+
+    return {
+        'service_count': service_counts,
+        'total_rpm': total_rpm,
+        'customers_affected': customers_affected,
+        'business_process_count': business_process_count,
+        'impact_score': impact_score
+    }
+
+
+def compute_financial_arrays(
+    service_counts: np.ndarray,
+    customers_affected: np.ndarray,
+    durations: np.ndarray,
+    business_metrics: Dict[str, Any]
+) -> Dict[str, np.ndarray]:
+    """
+    Compute vendor x duration financial impact matrices
+
+    Args:
+        service_counts: Affected services per vendor
+        customers_affected: Affected customers per vendor
+        durations: Failure durations in hours
+        business_metrics: simulation.business section of config
+
+    Returns:
+        Matrices (vendors x durations): revenue_loss, failed_transactions,
+        total_cost, impact_score; and per-vendor customer_impact_cost
+    """
+    revenue_loss_percentage = np.minimum(service_counts * REVENUE_LOSS_PER_SERVICE, 1.0)
+
+    # Outer product: vendors x durations
+    exposure = revenue_loss_percentage[:, None] * durations[None, :]
+    revenue_loss = business_metrics['revenue_per_hour'] * exposure
+    failed_transactions = np.floor(business_metrics['transactions_per_hour'] * exposure).astype(np.int64)
+
+    customer_impact_cost = customers_affected * COST_PER_AFFECTED_CUSTOMER
+    total_cost = revenue_loss + customer_impact_cost[:, None]
+    impact_score = np.minimum(total_cost / FINANCIAL_IMPACT_NORMALIZER, 1.0)
+
+    return {
+        'revenue_loss': revenue_loss,
+        'failed_transactions': failed_transactions,
+        'customer_impact_cost': customer_impact_cost,
+        'total_cost': total_cost,
+        'impact_score': impact_score
+    }
+
+
+def compute_overall_scores(
+    operational_scores: np.ndarray,
+    financial_scores: np.ndarray,
+    compliance_scores: np.ndarray,
+    weights: Optional[Dict[str, float]] = None
+) -> np.ndarray:
+    """
+    Vectorized equivalent of utils.calculate_impact_score
+
+    Args:
+        operational_scores: Per-vendor operational scores
+        financial_scores: Vendor x duration financial scores
+        compliance_scores: Per-vendor compliance scores
+        weights: Impact weights dictionary
+
+    Returns:
+        Vendor x duration overall impact scores
+    """
+    if weights is None:
+        weights = DEFAULT_IMPACT_WEIGHTS
+
+    score = (
+        operational_scores[:, None] * weights['operational'] +
+        financial_scores * weights['financial'] +
+        compliance_scores[:, None] * weights['compliance']
+    )
+    return np.clip(score, 0.0, 1.0)
+
+
+def sweep_vendor_impacts(
+    snapshot: DependencyGraphSnapshot,
+    durations: Sequence[float],
+    business_metrics: Dict[str, Any],
+    compliance_scores: Sequence[float],
+    weights: Optional[Dict[str, float]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Compute impact arrays for every vendor in the snapshot and every duration
+
+    Args:
+        snapshot: Dependency graph snapshot
+        durations: Failure durations in hours
+        business_metrics: simulation.business section of config
+        compliance_scores: Compliance impact score per snapshot vendor
+            (already zeroed for vendors without affected services)
+        weights: Impact weights dictionary
+
+    Returns:
+        Dictionary of NumPy arrays keyed by metric name
+    """
+    duration_vector = np.asarray(durations, dtype=np.float64)
+
+    incidence = build_incidence(snapshot)
+    operational = compute_operational_arrays(incidence, len(snapshot.process_names))
+    financial = compute_financial_arrays(
+        operational['service_count'],
+        operational['customers_affected'],
+        duration_vector,
+        business_metrics
+    )
+    compliance = np.asarray(compliance_scores, dtype=np.float64)
+    overall = compute_overall_scores(
+        operational['impact_score'],
+        financial['impact_score'],
+        compliance,
+        weights
+    )
+
+    return {
+        'durations': duration_vector,
+        'service_count': operational['service_count'],
+        'total_rpm': operational['total_rpm'],
+        'customers_affected': operational['customers_affected'],
+        'business_process_count': operational['business_process_count'],
+        'operational_impact': operational['impact_score'],
+        'revenue_loss': financial['revenue_loss'],
+        'failed_transactions': financial['failed_transactions'],
+        'customer_impact_cost': financial['customer_impact_cost'],
+        'total_cost': financial['total_cost'],
+        'financial_impact': financial['impact_score'],
+        'compliance_impact': compliance,
+        'overall_impact_score': overall
+    }
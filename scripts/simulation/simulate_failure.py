@@ -8,14 +8,20 @@ Simulates vendor failure scenarios and predicts impact on:
 
 Usage:
     python scripts/simulation/simulate_failure.py --vendor "Stripe" --duration 4
+    python scripts/simulation/simulate_failure.py --vendor "Stripe" --vendor "Auth0" --duration 4
+    python scripts/simulation/simulate_failure.py --sweep
+    python scripts/simulation/simulate_failure.py --worst-combinations 2
+    python scripts/simulation/simulate_failure.py --vendor "Stripe" --backend memory \
+        --data-file data/sample/sample_dependencies.json
 """
 
 import argparse
 import logging
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
 from datetime import datetime
+import numpy as np
 from neo4j import GraphDatabase
 
 # Add parent directory to path for imports
@@ -24,19 +30,39 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from scripts.utils import (
     setup_logging,
     load_config,
-    load_json_file,
     save_json_file,
     validate_env_vars,
     format_currency,
-    format_percentage,
     calculate_impact_score
 )
+from scripts.simulation.graph_snapshot import DependencyGraphSnapshot
+from scripts.simulation.graph_backend import GraphBackend, Neo4jGraphBackend, InMemoryGraphBackend
+from scripts.simulation.risk_sweep import (
+    build_incidence,
+    compute_operational_arrays,
+    sweep_vendor_impacts,
+    SERVICES_FOR_FULL_OPERATIONAL_IMPACT,
+    REVENUE_LOSS_PER_SERVICE,
+    COST_PER_AFFECTED_CUSTOMER,
+    FINANCIAL_IMPACT_NORMALIZER
+)
+from scripts.simulation.monte_carlo import simulate_loss_percentiles
+from scripts.simulation.compliance_index import ComplianceIndex
+from scripts.simulation.combination_search import find_worst_combinations
 
 
 class VendorFailureSimulator:
     """Simulates vendor failure scenarios"""
     
-    def __init__(self, neo4j_uri: str, neo4j_user: str, neo4j_password: str):
+    def __init__(
+        self,
+        neo4j_uri: Optional[str] = None,
+        neo4j_user: Optional[str] = None,
+        neo4j_password: Optional[str] = None,
+        use_snapshot: bool = False,
+        backend: Optional[GraphBackend] = None,
+        compliance_file: str = 'data/sample/compliance_controls.json'
+    ):
         """
         Initialize simulator
         
@@ -44,55 +70,77 @@ class VendorFailureSimulator:
             neo4j_uri: Neo4j connection URI
             neo4j_user: Neo4j username
             neo4j_password: Neo4j password
+            use_snapshot: Load the dependency graph into memory once and answer
+                operational impact from it instead of querying Neo4j per simulation
+            backend: Graph backend to simulate against (e.g. InMemoryGraphBackend);
+                the Neo4j connection arguments are ignored when given
+            compliance_file: Compliance controls file used for compliance scoring
         """
         self.logger = logging.getLogger(__name__)
-        self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
-        self.config = load_config()
-        self.compliance_data = load_json_file('data/sample/compliance_controls.json')
-        self.logger.info("Simulator initialized")
+        if backend is None:
+            self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+            backend = Neo4jGraphBackend(self.driver)
+        else:
+            self.driver = getattr(backend, 'driver', None)
+        self.backend = backend
+        # Credentials arrive as arguments (or not at all): skip the Secret Manager lookup
+        self.config = load_config(resolve_secrets=False)
+        self.compliance_index = ComplianceIndex(compliance_file)
+        self.snapshot: Optional[DependencyGraphSnapshot] = None
+        if use_snapshot:
+            self.refresh_snapshot()
+        self.logger.info(f"Simulator initialized ({backend.name} backend)")
+    
+    @property
+    def compliance_data(self) -> Dict[str, Any]:
+        """Raw compliance controls data (as last loaded by the compliance index)"""
+        return self.compliance_index.data
     
     def close(self):
-        """Close Neo4j connection"""
-        self.driver.close()
+        """Close the graph backend (Neo4j connection)"""
+        self.backend.close()
+    
+    def refresh_snapshot(self) -> DependencyGraphSnapshot:
+        """
+        (Re)load the in-memory dependency graph snapshot from the graph backend
+        
+        Call this after the graph has been reloaded (e.g. after a scheduled discovery).
+        
+        Returns:
+            The newly loaded snapshot
+        """
+        self.snapshot = self.backend.snapshot()
+        return self.snapshot
     
     def simulate_vendor_failure(
         self, 
-        vendor_name: str, 
+        vendor_name: Union[str, Sequence[str]], 
         duration_hours: int
     ) -> Dict[str, Any]:
         """
         Simulate vendor failure and calculate impact
         
+        Passing several vendors simulates a correlated failure: affected services
+        are the union across vendors, so a service that depends on more than one
+        of them is only counted once.
+        
         Args:
-            vendor_name: Name of the vendor
+            vendor_name: Name of the vendor, or a list/set of vendor names
             duration_hours: Failure duration in hours
         
         Returns:
             Simulation results
         """
+        vendor_names = self._as_vendor_list(vendor_name)
+        if len(vendor_names) > 1:
+            return self._simulate_multi_vendor_failure(vendor_names, duration_hours)
+        vendor_name = vendor_names[0]
+        
         # Normalize vendor name for Neo4j queries (vendors stored as lowercase)
         normalized_vendor_name = vendor_name.lower().strip()
         
         # Preserve original vendor name for display (capitalize if it came in lowercase)
-        # Handle special cases for proper capitalization
-        if vendor_name and vendor_name[0].isupper():
-            display_vendor_name = vendor_name
-        else:
-            # Handle special vendor name cases
-            vendor_lower = normalized_vendor_name
-            if vendor_lower == 'auth0':
-                display_vendor_name = 'Auth0'
-            elif vendor_lower == 'sendgrid':
-                display_vendor_name = 'SendGrid'
-            elif vendor_lower == 'mongodb atlas':
-                display_vendor_name = 'MongoDB Atlas'
-            elif vendor_lower == 'twilio':
-                display_vendor_name = 'Twilio'
-            elif vendor_lower == 'stripe':
-                display_vendor_name = 'Stripe'
-            else:
-                # Default: capitalize first letter
-                display_vendor_name = vendor_name.capitalize()
+        display_vendor_name = self._display_vendor_name(vendor_name)
         
         self.logger.info(f"🔴 Simulating {display_vendor_name} failure (normalized: {normalized_vendor_name}) for {duration_hours} hours...")
         
@@ -118,26 +166,7 @@ class VendorFailureSimulator:
         # Calculate compliance impact (only if there are affected services)
         # Compliance impact only matters if vendor is actually being used
         if operational.get('service_count', 0) > 0:
-            # Try display name first (compliance data uses "Auth0", "Stripe", etc.)
-            compliance = self._calculate_compliance_impact(display_vendor_name)
-            if not compliance.get('affected_frameworks'):
-                # Fallback to original vendor_name
-                compliance = self._calculate_compliance_impact(vendor_name)
-            if not compliance.get('affected_frameworks'):
-                # Fallback to normalized if original doesn't work
-                compliance = self._calculate_compliance_impact(normalized_vendor_name)
-            
-            # Special handling for multi-word vendors like "MongoDB Atlas"
-            if not compliance.get('affected_frameworks') and ' ' in vendor_name:
-                # Try with proper title case
-                title_case = vendor_name.title()
-                compliance = self._calculate_compliance_impact(title_case)
-            
-            # Log compliance result for debugging
-            if compliance.get('affected_frameworks'):
-                self.logger.info(f"Compliance impact calculated: {len(compliance['affected_frameworks'])} frameworks")
-            else:
-                self.logger.warning(f"No compliance data found for vendor: {display_vendor_name} (tried: {vendor_name}, {normalized_vendor_name})")
+            compliance = self._resolve_compliance_impact(vendor_name, display_vendor_name)
         else:
             # No services affected = no compliance impact
             compliance = {
@@ -161,52 +190,465 @@ class VendorFailureSimulator:
         self.logger.info(f"✅ Simulation complete. Impact score: {simulation['overall_impact_score']:.2f}")
         return simulation
     
-    def _calculate_operational_impact(self, vendor_name: str) -> Dict[str, Any]:
+    def _as_vendor_list(self, vendor_name: Union[str, Sequence[str]]) -> List[str]:
+        """
+        Normalize the vendor argument to a list of distinct vendor names
+        
+        Args:
+            vendor_name: Single vendor name or collection of vendor names
+        
+        Returns:
+            Vendor names (duplicates differing only by case/whitespace removed)
+        """
+        if isinstance(vendor_name, str):
+            return [vendor_name]
+        
+        vendors = {}
+        for name in vendor_name:
+            vendors.setdefault(name.lower().strip(), name)
+        if not vendors:
+            raise ValueError("At least one vendor name is required")
+        return list(vendors.values())
+    
+    def _simulate_multi_vendor_failure(self, vendor_names: List[str], duration_hours: int) -> Dict[str, Any]:
+        """
+        Simulate a correlated failure of several vendors (union semantics)
+        
+        Args:
+            vendor_names: Distinct vendor names
+            duration_hours: Failure duration in hours
+        
+        Returns:
+            Simulation results, with 'vendors' listing each failed vendor
+        """
+        normalized_vendor_names = [name.lower().strip() for name in vendor_names]
+        display_vendor_names = [self._display_vendor_name(name) for name in vendor_names]
+        display_label = ', '.join(display_vendor_names)
+        
+        self.logger.info(f"🔴 Simulating correlated failure of {display_label} for {duration_hours} hours...")
+        
+        simulation = {
+            'vendor': display_label,
+            'vendors': display_vendor_names,
+            'duration_hours': duration_hours,
+            'timestamp': datetime.utcnow().isoformat(),
+            'operational_impact': {},
+            'financial_impact': {},
+            'compliance_impact': {},
+            'overall_impact_score': 0.0,
+            'recommendations': []
+        }
+        
+        # Union of affected services across all failed vendors
+        operational = self._calculate_operational_impact(normalized_vendor_names)
+        simulation['operational_impact'] = operational
+        
+        financial = self._calculate_financial_impact(display_label, duration_hours, operational)
+        simulation['financial_impact'] = financial
+        
+        # Only vendors that are actually in use contribute controls; controls shared
+        # by several vendors are counted once
+        vendor_service_counts = operational['vendor_service_counts']
+        failing_vendors = [
+            (name, display)
+            for name, display, normalized in zip(vendor_names, display_vendor_names, normalized_vendor_names)
+            if vendor_service_counts.get(normalized, 0) > 0
+        ]
+        compliance = self._calculate_union_compliance_impact(failing_vendors)
+        simulation['compliance_impact'] = compliance
+        
+        simulation['overall_impact_score'] = calculate_impact_score(
+            operational['impact_score'],
+            financial['impact_score'],
+            compliance['impact_score']
+        )
+        simulation['recommendations'] = self._generate_recommendations(simulation)
+        
+        self.logger.info(f"✅ Simulation complete. Impact score: {simulation['overall_impact_score']:.2f}")
+        return simulation
+    
+    def find_worst_vendor_combinations(
+        self,
+        k: int = 2,
+        top_n: int = 5,
+        duration_hours: int = 4
+    ) -> Dict[str, Any]:
+        """
+        Find the k-vendor combinations whose correlated failure affects the most services
+        
+        Combinations are ranked by distinct affected services (the driver of
+        operational and revenue impact) using a bitset branch-and-bound search
+        over the in-memory snapshot; the winners are then fully simulated.
+        
+        Args:
+            k: Number of vendors failing together
+            top_n: Number of combinations to return
+            duration_hours: Failure duration used for the full simulations
+        
+        Returns:
+            Ranked combinations with their simulation results and search statistics
+        """
+        snapshot = self.snapshot if self.snapshot is not None else self.refresh_snapshot()
+        self.logger.info(f"🔍 Searching worst {k}-vendor combinations across {len(snapshot.vendor_names)} vendors...")
+        
+        combinations, stats = find_worst_combinations(snapshot, k, top_n)
+        
+        results = []
+        for vendor_ids, service_count in combinations:
+            names = [snapshot.vendor_display_names[v] or snapshot.vendor_names[v] for v in vendor_ids]
+            simulation = self.simulate_vendor_failure(names, duration_hours)
+            results.append({
+                'vendors': simulation['vendors'],
+                'service_count': service_count,
+                'overall_impact_score': simulation['overall_impact_score'],
+                'total_cost': simulation['financial_impact']['total_cost'],
+                'total_cost_formatted': simulation['financial_impact']['total_cost_formatted'],
+                'simulation': simulation
+            })
+        
+        self.logger.info(
+            f"✅ Evaluated {stats['combinations_evaluated']:,} of {stats['total_combinations']:,} combinations"
+        )
+        return {
+            'k': k,
+            'duration_hours': duration_hours,
+            'timestamp': datetime.utcnow().isoformat(),
+            'search': stats,
+            'results': results
+        }
+    
+    def sweep_all_vendors(
+        self,
+        durations: Optional[List[float]] = None,
+        snapshot: Optional[DependencyGraphSnapshot] = None
+    ) -> Dict[str, Any]:
+        """
+        Compute impact for every vendor across every failure duration in one pass
+        
+        Uses the in-memory snapshot (loading it if needed), so the whole sweep
+        costs a single read of the graph.
+        
+        Args:
+            durations: Failure durations in hours (default: simulation.duration_options from config)
+            snapshot: Snapshot to sweep instead of the simulator's own (which is
+                then neither loaded nor replaced)
+        
+        Returns:
+            Sweep results with one entry per vendor, sorted by worst-case impact score;
+            each entry's vendor_id is the vendor's index in the snapshot
+        """
+        if durations is None:
+            durations = self.config['simulation']['duration_options']
+        
+        if snapshot is None:
+            snapshot = self.snapshot if self.snapshot is not None else self.refresh_snapshot()
+        self.logger.info(f"🔴 Sweeping {len(snapshot.vendor_names)} vendors x {len(durations)} durations...")
+        
+        # Compliance impact does not depend on duration: resolve once per vendor
+        display_names = []
+        compliance_results = []
+        for vendor_id, vendor_name in enumerate(snapshot.vendor_names):
+            display_name = snapshot.vendor_display_names[vendor_id] or self._display_vendor_name(vendor_name)
+            display_names.append(display_name)
+            if snapshot.vendor_services[vendor_id]:
+                compliance_results.append(self._resolve_compliance_impact(vendor_name, display_name))
+            else:
+                compliance_results.append({'affected_frameworks': {}, 'impact_score': 0.0, 'summary': {}})
+        
+        arrays = sweep_vendor_impacts(
+            snapshot,
+            durations,
+            self.config['simulation']['business'],
+            [compliance['impact_score'] for compliance in compliance_results]
+        )
+        
+        results = []
+        for vendor_id, display_name in enumerate(display_names):
+            scenarios = [
+                {
+                    'duration_hours': durations[d],
+                    'revenue_loss': float(arrays['revenue_loss'][vendor_id, d]),
+                    'failed_transactions': int(arrays['failed_transactions'][vendor_id, d]),
+                    'customer_impact_cost': int(arrays['customer_impact_cost'][vendor_id]),
+                    'total_cost': float(arrays['total_cost'][vendor_id, d]),
+                    'total_cost_formatted': format_currency(float(arrays['total_cost'][vendor_id, d])),
+                    'financial_impact_score': float(arrays['financial_impact'][vendor_id, d]),
+                    'overall_impact_score': float(arrays['overall_impact_score'][vendor_id, d])
+                }
+                for d in range(len(durations))
+            ]
+            results.append({
+                'vendor': display_name,
+                'vendor_id': vendor_id,
+                'operational_impact': {
+                    'service_count': int(arrays['service_count'][vendor_id]),
+                    'total_rpm': float(arrays['total_rpm'][vendor_id]),
+                    'customers_affected': int(arrays['customers_affected'][vendor_id]),
+                    'business_process_count': int(arrays['business_process_count'][vendor_id]),
+                    'impact_score': float(arrays['operational_impact'][vendor_id])
+                },
+                'compliance_impact': {
+                    'impact_score': compliance_results[vendor_id]['impact_score'],
+                    'summary': compliance_results[vendor_id]['summary']
+                },
+                'max_overall_impact_score': max(s['overall_impact_score'] for s in scenarios) if scenarios else 0.0,
+                'scenarios': scenarios
+            })
+        
+        results.sort(key=lambda r: r['max_overall_impact_score'], reverse=True)
+        
+        self.logger.info(f"✅ Sweep complete: {len(results)} vendors x {len(durations)} durations")
+        return {
+            'timestamp': datetime.utcnow().isoformat(),
+            'durations': list(durations),
+            'vendor_count': len(results),
+            'snapshot_loaded_at': snapshot.loaded_at,
+            'results': results
+        }
+    
+    def simulate_loss_distribution(
+        self,
+        vendor_names: Optional[List[str]] = None,
+        samples: Optional[int] = None,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Estimate tail financial losses by sampling outage durations (Monte Carlo)
+        
+        Durations (and optionally revenue rates) are drawn from the distributions
+        in simulation.monte_carlo; each vendor's loss follows the same model as
+        _calculate_financial_impact.
+        
+        Args:
+            vendor_names: Vendors to simulate (default: every vendor in the snapshot)
+            samples: Samples per vendor (default: simulation.monte_carlo.samples)
+            seed: RNG seed (default: simulation.monte_carlo.seed)
+        
+        Returns:
+            Loss percentiles per vendor, sorted by the highest reported percentile
+        """
+        model = self.config['simulation'].get('monte_carlo', {})
+        samples = samples if samples is not None else model.get('samples', 100000)
+        seed = seed if seed is not None else model.get('seed', 42)
+        percentiles = model.get('percentiles', [50, 90, 99])
+        business_metrics = self.config['simulation']['business']
+        
+        snapshot = self.snapshot if self.snapshot is not None else self.refresh_snapshot()
+        incidence = build_incidence(snapshot)
+        operational = compute_operational_arrays(incidence, len(snapshot.process_names))
+        
+        if vendor_names is None:
+            vendor_ids = list(range(len(snapshot.vendor_names)))
+        else:
+            vendor_ids = []
+            for vendor_name in self._as_vendor_list(vendor_names):
+                normalized = vendor_name.lower().strip()
+                if not snapshot.has_vendor(normalized):
+                    raise ValueError(f"Vendor '{vendor_name}' not found in dependency graph")
+                vendor_ids.append(snapshot.vendor_index[normalized])
+        
+        self.logger.info(f"🎲 Sampling {samples:,} outages for each of {len(vendor_ids)} vendors...")
+        
+        service_counts = operational['service_count'][vendor_ids]
+        customers_affected = operational['customers_affected'][vendor_ids]
+        losses = simulate_loss_percentiles(
+            [snapshot.vendor_names[v] for v in vendor_ids],
+            np.minimum(service_counts * REVENUE_LOSS_PER_SERVICE, 1.0),
+            (customers_affected * COST_PER_AFFECTED_CUSTOMER).astype(np.float64),
+            model,
+            business_metrics['revenue_per_hour'],
+            samples,
+            seed,
+            percentiles
+        )
+        
+        results = []
+        for row, vendor_id in enumerate(vendor_ids):
+            display_name = snapshot.vendor_display_names[vendor_id] or self._display_vendor_name(snapshot.vendor_names[vendor_id])
+            loss_percentiles = {
+                f"p{p:g}": float(losses['percentiles'][row, i]) for i, p in enumerate(percentiles)
+            }
+            results.append({
+                'vendor': display_name,
+                'service_count': int(service_counts[row]),
+                'customers_affected': int(customers_affected[row]),
+                'expected_loss': float(losses['mean'][row]),
+                'loss_percentiles': loss_percentiles,
+                'loss_percentiles_formatted': {
+                    key: format_currency(value) for key, value in loss_percentiles.items()
+                }
+            })
+        
+        results.sort(key=lambda r: list(r['loss_percentiles'].values())[-1] if r['loss_percentiles'] else 0.0, reverse=True)
+        
+        self.logger.info(f"✅ Monte Carlo complete: {len(results)} vendors")
+        return {
+            'timestamp': datetime.utcnow().isoformat(),
+            'samples': samples,
+            'seed': seed,
+            'percentiles': list(percentiles),
+            'duration_model': model.get('duration', {}),
+            'revenue_model': model.get('revenue_per_hour', {}),
+            'duration_percentiles': {
+                f"p{p:g}": float(losses['duration_percentiles'][i]) for i, p in enumerate(percentiles)
+            },
+            'vendor_count': len(results),
+            'results': results
+        }
+    
+    def _display_vendor_name(self, vendor_name: str) -> str:
+        """
+        Get the display name for a vendor
+        
+        Args:
+            vendor_name: Vendor name as provided (may be normalized lowercase)
+        
+        Returns:
+            Properly capitalized vendor name
+        """
+        if vendor_name and vendor_name[0].isupper():
+            return vendor_name
+        
+        # Handle special vendor name cases
+        vendor_lower = vendor_name.lower().strip()
+        if vendor_lower == 'auth0':
+            return 'Auth0'
+        elif vendor_lower == 'sendgrid':
+            return 'SendGrid'
+        elif vendor_lower == 'mongodb atlas':
+            return 'MongoDB Atlas'
+        elif vendor_lower == 'twilio':
+            return 'Twilio'
+        elif vendor_lower == 'stripe':
+            return 'Stripe'
+        
+        # Default: capitalize first letter
+        return vendor_name.capitalize()
+    
+    def _resolve_compliance_impact(self, vendor_name: str, display_vendor_name: str) -> Dict[str, Any]:
+        """
+        Calculate compliance impact, trying the vendor name variants used in compliance data
+        
+        Args:
+            vendor_name: Vendor name as provided
+            display_vendor_name: Properly capitalized vendor name
+        
+        Returns:
+            Compliance impact details
+        """
+        # Index lookups are case-insensitive, so the name as provided covers
+        # "stripe"/"Stripe"/"STRIPE"; the display name covers snapshot display names
+        compliance = self._calculate_compliance_impact(vendor_name)
+        if not compliance.get('affected_frameworks') and display_vendor_name != vendor_name:
+            compliance = self._calculate_compliance_impact(display_vendor_name)
+        
+        # Log compliance result for debugging
+        if compliance.get('affected_frameworks'):
+            self.logger.info(f"Compliance impact calculated: {len(compliance['affected_frameworks'])} frameworks")
+        else:
+            self.logger.warning(f"No compliance data found for vendor: {display_vendor_name} (tried: {vendor_name})")
+        
+        return compliance
+    
+    def _resolve_vendor_controls(self, vendor_name: str, display_vendor_name: str) -> Dict[str, List[str]]:
+        """
+        Find a vendor's compliance controls, trying the same name variants as
+        _resolve_compliance_impact
+        
+        Args:
+            vendor_name: Vendor name as provided
+            display_vendor_name: Properly capitalized vendor name
+        
+        Returns:
+            Mapping of framework control key (e.g. 'soc2_controls') to control IDs
+        """
+        return self.compliance_index.controls(vendor_name) or self.compliance_index.controls(display_vendor_name)
+    
+    def _calculate_union_compliance_impact(self, vendors: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Calculate compliance impact of several vendors failing together
+        
+        Args:
+            vendors: (vendor_name, display_vendor_name) pairs
+        
+        Returns:
+            Compliance impact details over the union of the vendors' controls
+        """
+        merged_controls: Dict[str, List[str]] = {}
+        for vendor_name, display_vendor_name in vendors:
+            for framework, control_ids in self._resolve_vendor_controls(vendor_name, display_vendor_name).items():
+                framework_controls = merged_controls.setdefault(framework, [])
+                framework_controls.extend(c for c in control_ids if c not in framework_controls)
+        
+        return self.compliance_index.score_controls(merged_controls)
+    
+    def _calculate_operational_impact(self, vendor_name: Union[str, Sequence[str]]) -> Dict[str, Any]:
         """
         Calculate operational impact
         
         Args:
-            vendor_name: Vendor name
+            vendor_name: Vendor name, or a list of vendor names failing together
         
         Returns:
-            Operational impact details
+            Operational impact details (multi-vendor results also include
+            'vendor_service_counts' per normalized vendor name)
         """
         self.logger.info("Calculating operational impact...")
         
-        with self.driver.session() as session:
-            # Find affected services (use normalized vendor name)
-            normalized_vendor_name = vendor_name.lower().strip()
-            query = """
-            MATCH (v:Vendor {name: $normalized_vendor_name})<-[:DEPENDS_ON]-(s:Service)
-            OPTIONAL MATCH (s)-[:SUPPORTS]->(bp:BusinessProcess)
-            RETURN s.name as service_name,
-                   s.type as service_type,
-                   s.rpm as rpm,
-                   s.customers_affected as customers_affected,
-                   collect(DISTINCT bp.name) as business_processes
-            """
-            result = session.run(query, normalized_vendor_name=normalized_vendor_name)
-            
-            affected_services = []
-            total_rpm = 0
-            customers_affected = 0
-            business_processes = set()
-            
-            for record in result:
-                service = {
-                    'name': record['service_name'],
-                    'type': record['service_type'],
-                    'rpm': record['rpm'] or 0,
-                    'customers_affected': record['customers_affected'] or 0,
-                    'business_processes': record['business_processes']
-                }
-                affected_services.append(service)
-                total_rpm += service['rpm']
-                customers_affected = max(customers_affected, service['customers_affected'])
-                business_processes.update(service['business_processes'])
+        if not isinstance(vendor_name, str):
+            return self._calculate_union_operational_impact([name.lower().strip() for name in vendor_name])
+        
+        # Find affected services (use normalized vendor name)
+        normalized_vendor_name = vendor_name.lower().strip()
+        
+        if self.snapshot is not None:
+            # Snapshot mode: answer from the in-memory graph, no Neo4j round trip
+            affected_services = self.snapshot.affected_services(normalized_vendor_name)
+        else:
+            affected_services = self.backend.affected_services(normalized_vendor_name)
+        
+        return self._summarize_operational_impact(affected_services)
+    
+    def _calculate_union_operational_impact(self, normalized_vendor_names: List[str]) -> Dict[str, Any]:
+        """
+        Calculate operational impact over the union of several vendors' services
+        
+        Args:
+            normalized_vendor_names: Normalized vendor names
+        
+        Returns:
+            Operational impact details with per-vendor service counts
+        """
+        if self.snapshot is not None:
+            affected_services, vendor_service_counts = self.snapshot.affected_services_union(normalized_vendor_names)
+        else:
+            affected_services, vendor_service_counts = self.backend.affected_services_union(normalized_vendor_names)
+        
+        operational = self._summarize_operational_impact(affected_services)
+        operational['vendor_service_counts'] = vendor_service_counts
+        return operational
+    
+    def _summarize_operational_impact(self, affected_services: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Aggregate affected services into operational impact metrics
+        
+        Args:
+            affected_services: Affected service rows
+        
+        Returns:
+            Operational impact details
+        """
+        total_rpm = 0
+        customers_affected = 0
+        business_processes = set()
+        
+        for service in affected_services:
+            total_rpm += service['rpm']
+            customers_affected = max(customers_affected, service['customers_affected'])
+            business_processes.update(service['business_processes'])
         
         # Calculate impact score (0.0 to 1.0)
-        impact_score = min(len(affected_services) / 10, 1.0)  # Normalize
+        impact_score = min(len(affected_services) / SERVICES_FOR_FULL_OPERATIONAL_IMPACT, 1.0)  # Normalize
         
         return {
             'affected_services': affected_services,
@@ -243,7 +685,7 @@ class VendorFailureSimulator:
         # Calculate revenue loss based on affected services
         # Assume revenue loss proportional to number of critical services affected
         service_count = operational['service_count']
-        revenue_loss_percentage = min(service_count * 0.25, 1.0)  # 25% per service, max 100%
+        revenue_loss_percentage = min(service_count * REVENUE_LOSS_PER_SERVICE, 1.0)  # 25% per service, max 100%
         
         revenue_loss = revenue_per_hour * duration_hours * revenue_loss_percentage
         
@@ -253,12 +695,12 @@ class VendorFailureSimulator:
         
         # Customer impact cost (estimated)
         customers_affected = operational['customers_affected']
-        customer_impact_cost = customers_affected * 5  # $5 per affected customer
+        customer_impact_cost = customers_affected * COST_PER_AFFECTED_CUSTOMER  # $5 per affected customer
         
         total_cost = revenue_loss + customer_impact_cost
         
         # Impact score
-        impact_score = min(total_cost / 1000000, 1.0)  # Normalize to $1M
+        impact_score = min(total_cost / FINANCIAL_IMPACT_NORMALIZER, 1.0)  # Normalize to $1M
         
         return {
             'revenue_loss': revenue_loss,
@@ -275,97 +717,14 @@ class VendorFailureSimulator:
         Calculate compliance impact
         
         Args:
-            vendor_name: Vendor name (should be normalized lowercase)
+            vendor_name: Vendor name (any casing; looked up in the compliance index)
         
         Returns:
             Compliance impact details
         """
         self.logger.info("Calculating compliance impact...")
         
-        # Get vendor's compliance controls - try multiple name formats
-        control_mappings = self.compliance_data.get('control_mappings', {})
-        
-        # Try exact match first (compliance data uses "Auth0", "Stripe", "MongoDB Atlas", "SendGrid", etc.)
-        vendor_controls = control_mappings.get(vendor_name, {})
-        
-        # If not found, try common variations
-        if not vendor_controls:
-            vendor_lower = vendor_name.lower().strip()
-            
-            # Map common lowercase variations to compliance data keys
-            name_mapping = {
-                'auth0': 'Auth0',
-                'stripe': 'Stripe',
-                'sendgrid': 'SendGrid',
-                'mongodb atlas': 'MongoDB Atlas',
-                'twilio': 'Twilio'  # Not in compliance data, but for consistency
-            }
-            
-            if vendor_lower in name_mapping:
-                vendor_controls = control_mappings.get(name_mapping[vendor_lower], {})
-        
-        # If still not found, try capitalized (first letter uppercase)
-        if not vendor_controls and vendor_name:
-            capitalized = vendor_name.capitalize()
-            vendor_controls = control_mappings.get(capitalized, {})
-        
-        # Also try title case for multi-word vendors
-        if not vendor_controls and ' ' in vendor_name:
-            title_case = vendor_name.title()
-            vendor_controls = control_mappings.get(title_case, {})
-        
-        if not vendor_controls:
-            return {
-                'affected_frameworks': {},  # Use empty object for consistency with JavaScript simulator
-                'impact_score': 0.0,
-                'summary': {}  # Always include summary field (empty when no data)
-            }
-        
-        # Get impact weights
-        impact_weights = self.compliance_data.get('impact_weights', {})
-        baseline = self.compliance_data.get('compliance_baseline', {})
-        
-        # Calculate impact for each framework
-        frameworks = {}
-        total_impact = 0
-        
-        for framework, control_ids in vendor_controls.items():
-            framework_key = framework.replace('_controls', '')
-            if framework_key not in impact_weights:
-                continue
-            
-            # Calculate score reduction
-            score_reduction = sum(
-                impact_weights[framework_key].get(ctrl, 0.05)
-                for ctrl in control_ids
-            )
-            
-            baseline_score = baseline.get(f"{framework_key}_score", 0.90)
-            new_score = max(baseline_score - score_reduction, 0.0)
-            
-            frameworks[framework_key] = {
-                'baseline_score': baseline_score,
-                'new_score': new_score,
-                'score_change': score_reduction,
-                'affected_controls': control_ids
-            }
-            
-            total_impact += score_reduction
-        
-        # Overall compliance impact score
-        impact_score = min(total_impact / len(frameworks) if frameworks else 0, 1.0)
-        
-        return {
-            'affected_frameworks': frameworks,
-            'impact_score': impact_score,
-            'summary': {
-                framework: {
-                    'change': format_percentage(data['score_change']),
-                    'new_score': format_percentage(data['new_score'])
-                }
-                for framework, data in frameworks.items()
-            }
-        }
+        return self.compliance_index.impact(vendor_name)
     
     def _generate_recommendations(self, simulation: Dict[str, Any]) -> List[str]:
         """
@@ -421,8 +780,41 @@ def main():
     )
     parser.add_argument(
         '--vendor',
-        required=True,
-        help='Vendor name (e.g., "Stripe", "Auth0")'
+        action='append',
+        help='Vendor name (e.g., "Stripe", "Auth0"); repeat to simulate a correlated multi-vendor failure'
+    )
+    parser.add_argument(
+        '--sweep',
+        action='store_true',
+        help='Simulate every vendor across every simulation.duration_options entry in one pass'
+    )
+    parser.add_argument(
+        '--worst-combinations',
+        type=int,
+        metavar='K',
+        help='Find the k-vendor combinations whose joint failure affects the most services'
+    )
+    parser.add_argument(
+        '--monte-carlo',
+        action='store_true',
+        help='Estimate P50/P90/P99 losses from sampled outage durations '
+             '(all vendors, or those given with --vendor)'
+    )
+    parser.add_argument(
+        '--samples',
+        type=int,
+        help='Monte Carlo samples per vendor (default: simulation.monte_carlo.samples)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='Monte Carlo RNG seed (default: simulation.monte_carlo.seed)'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=5,
+        help='Number of combinations to report with --worst-combinations (default: 5)'
     )
     parser.add_argument(
         '--duration',
@@ -432,8 +824,25 @@ def main():
     )
     parser.add_argument(
         '--output',
-        default='data/outputs/simulation_result.json',
-        help='Output file path'
+        default=None,
+        help='Output file path (default: data/outputs/simulation_result.json, '
+             'or data/outputs/risk_sweep.json with --sweep)'
+    )
+    parser.add_argument(
+        '--backend',
+        default='neo4j',
+        choices=['neo4j', 'memory'],
+        help='Graph backend: neo4j, or memory to load --data-file in-process (no database needed)'
+    )
+    parser.add_argument(
+        '--data-file',
+        default='data/sample/sample_dependencies.json',
+        help='Dependency file or discovery output for --backend memory'
+    )
+    parser.add_argument(
+        '--compliance-file',
+        default='data/sample/compliance_controls.json',
+        help='Compliance controls file for compliance scoring (and SATISFIES edges with --backend memory)'
     )
     parser.add_argument(
         '--log-level',
@@ -458,12 +867,24 @@ def main():
     
     args = parser.parse_args()
     
+    if not args.vendor and not args.sweep and not args.worst_combinations and not args.monte_carlo:
+        parser.error('--vendor is required unless --sweep, --worst-combinations or --monte-carlo is given')
+    if args.output is None:
+        if args.monte_carlo:
+            args.output = 'data/outputs/monte_carlo.json'
+        elif args.sweep:
+            args.output = 'data/outputs/risk_sweep.json'
+        elif args.worst_combinations:
+            args.output = 'data/outputs/worst_combinations.json'
+        else:
+            args.output = 'data/outputs/simulation_result.json'
+    
     # Setup logging
     logger = setup_logging(args.log_level)
     
     # Validate environment
     required_vars = ['NEO4J_URI', 'NEO4J_USER', 'NEO4J_PASSWORD']
-    if not validate_env_vars(required_vars):
+    if args.backend == 'neo4j' and not validate_env_vars(required_vars):
         logger.error("Please configure Neo4j credentials in .env file")
         return 1
     
@@ -474,13 +895,83 @@ def main():
     # Run simulation
     simulator = None
     try:
-        simulator = VendorFailureSimulator(
-            neo4j_uri=neo4j_config['uri'],
-            neo4j_user=neo4j_config['user'],
-            neo4j_password=neo4j_config['password']
-        )
+        if args.backend == 'memory':
+            backend = InMemoryGraphBackend.from_files(args.data_file, args.compliance_file)
+            simulator = VendorFailureSimulator(backend=backend, compliance_file=args.compliance_file)
+        else:
+            simulator = VendorFailureSimulator(
+                neo4j_uri=neo4j_config['uri'],
+                neo4j_user=neo4j_config['user'],
+                neo4j_password=neo4j_config['password'],
+                compliance_file=args.compliance_file
+            )
+        
+        if args.monte_carlo:
+            distribution = simulator.simulate_loss_distribution(
+                vendor_names=args.vendor,
+                samples=args.samples,
+                seed=args.seed
+            )
+            save_json_file(distribution, args.output)
+            
+            logger.info("\n" + "="*60)
+            logger.info(
+                f"MONTE CARLO LOSS DISTRIBUTION: {distribution['vendor_count']} vendors x "
+                f"{distribution['samples']:,} samples (seed {distribution['seed']})"
+            )
+            logger.info("="*60)
+            for entry in distribution['results'][:10]:
+                formatted = ', '.join(f"{k.upper()} {v}" for k, v in entry['loss_percentiles_formatted'].items())
+                logger.info(f"   - {entry['vendor']}: {formatted}")
+            logger.info(f"\n✅ Results saved to: {args.output}")
+            logger.info("="*60 + "\n")
+            return 0
+        
+        if args.sweep:
+            sweep = simulator.sweep_all_vendors()
+            save_json_file(sweep, args.output)
+            
+            logger.info("\n" + "="*60)
+            logger.info(f"ALL-VENDOR RISK SWEEP: {sweep['vendor_count']} vendors x {len(sweep['durations'])} durations")
+            logger.info("="*60)
+            for entry in sweep['results'][:10]:
+                worst = max(entry['scenarios'], key=lambda s: s['overall_impact_score'], default=None)
+                if worst:
+                    logger.info(
+                        f"   - {entry['vendor']}: score {worst['overall_impact_score']:.2f} "
+                        f"({worst['duration_hours']}h, {worst['total_cost_formatted']}, "
+                        f"{entry['operational_impact']['service_count']} services)"
+                    )
+            logger.info(f"\n✅ Results saved to: {args.output}")
+            logger.info("="*60 + "\n")
+            return 0
+        
+        if args.worst_combinations:
+            search = simulator.find_worst_vendor_combinations(
+                k=args.worst_combinations,
+                top_n=args.top,
+                duration_hours=args.duration
+            )
+            save_json_file(search, args.output)
+            
+            logger.info("\n" + "="*60)
+            logger.info(f"WORST {search['k']}-VENDOR COMBINATIONS ({args.duration}h outage)")
+            logger.info("="*60)
+            for i, entry in enumerate(search['results'], 1):
+                logger.info(
+                    f"   {i}. {' + '.join(entry['vendors'])}: {entry['service_count']} services, "
+                    f"score {entry['overall_impact_score']:.2f}, {entry['total_cost_formatted']}"
+                )
+            logger.info(
+                f"\n🔍 Evaluated {search['search']['combinations_evaluated']:,} of "
+                f"{search['search']['total_combinations']:,} combinations"
+            )
+            logger.info(f"\n✅ Results saved to: {args.output}")
+            logger.info("="*60 + "\n")
+            return 0
         
-        result = simulator.simulate_vendor_failure(args.vendor, args.duration)
+        vendor_arg = args.vendor[0] if len(args.vendor) == 1 else args.vendor
+        result = simulator.simulate_vendor_failure(vendor_arg, args.duration)
         
         # Save results
         save_json_file(result, args.output)
@@ -513,7 +1004,7 @@ def main():
         
         # Print summary
         logger.info("\n" + "="*60)
-        logger.info(f"VENDOR FAILURE SIMULATION: {args.vendor}")
+        logger.info(f"VENDOR FAILURE SIMULATION: {result['vendor']}")
         logger.info("="*60)
         logger.info(f"\n📊 OPERATIONAL IMPACT:")
         logger.info(f"   - Services Affected: {result['operational_impact']['service_count']}")
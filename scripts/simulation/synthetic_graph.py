@@ -0,0 +1,494 @@
+"""
+Synthetic Enterprise Dependency Graph Generator
+
+Generates a dependency graph of any size in the three shapes the pipeline
+consumes, all describing the same graph:
+
+    dependencies   load format (data/schemas/vendor_schema.json), as
+                   data/sample/sample_dependencies.json
+    compliance     control mappings, as data/sample/compliance_controls.json
+    discovery      raw discovery output (cloud_functions, cloud_run_services,
+                   vendors with resources), as written by the discovery function
+
+Output is a pure function of the parameters and seed. Shape parameters:
+
+    fan_out               mean vendors per service (1 + Poisson)
+    popularity_exponent   Zipf exponent of vendor popularity (0 = uniform;
+                          ~1 gives a few vendors behind most services)
+    processes_per_service mean business processes per service (1 + Poisson)
+    vendor_duplicate_rate share of vendors that also appear under a case
+                          variant of their name (e.g. "Paygrid" / "paygrid")
+    service_duplicate_rate share of services also listed under a second
+                          service_id (same gcp_resource); in discovery output
+                          the resource is repeated under its short name
+
+Usage:
+    python scripts/simulation/synthetic_graph.py --vendors 1000 --services 50000 \\
+        --business-processes 500 --seed 7 --output-dir data/synthetic
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from scripts.utils import setup_logging, load_config, load_json_file, save_json_file
+from scripts.gcp.discovery_format import write_discovery_ndjson
+
+
+# Vendor names are <root><suffix>; the root decides the category
+VENDOR_ROOTS = {
+    'payment_processor': ['Pay', 'Ledger', 'Coin', 'Bill', 'Charge'],
+    'authentication': ['Auth', 'Ident', 'Key', 'Login', 'Pass'],
+    'communication': ['Mail', 'Text', 'Ping', 'Notify', 'Voice'],
+    'monitoring': ['Metric', 'Trace', 'Log', 'Alert', 'Pulse'],
+    'data_storage': ['Data', 'Store', 'Vault', 'Base', 'Cache']
+}
+VENDOR_SUFFIXES = ['ly', 'io', 'hub', 'grid', 'stack', 'flow', 'wave', 'cloud']
+ENV_VAR_SUFFIXES = ['API_KEY', 'SECRET', 'ENDPOINT', 'ACCOUNT_ID']
+
+CRITICALITIES = ['critical', 'high', 'medium', 'low']
+CRITICALITY_WEIGHTS = [0.1, 0.25, 0.4, 0.25]
+
+PROCESS_AREAS = [
+    'checkout', 'refunds', 'billing', 'user_login', 'signup', 'notifications',
+    'reporting', 'search', 'onboarding', 'fulfillment', 'support', 'analytics'
+]
+PROCESS_STAGES = ['intake', 'validation', 'processing', 'settlement', 'audit']
+
+SERVICE_TYPES = ['cloud_function', 'cloud_run']
+
+# Compliance catalog used when no template is given (frameworks as in compliance_controls.json)
+DEFAULT_COMPLIANCE_TEMPLATE = {
+    'compliance_baseline': {'soc2_score': 0.92, 'nist_score': 0.88, 'iso27001_score': 0.90},
+    'impact_weights': {
+        'soc2': {'CC6.1': 0.15, 'CC6.6': 0.12, 'CC7.2': 0.10, 'CC8.1': 0.08, 'A1.2': 0.10},
+        'nist': {'ID.AM-2': 0.08, 'PR.AC-1': 0.15, 'PR.DS-2': 0.12, 'DE.CM-1': 0.10},
+        'iso27001': {'A.5.14': 0.12, 'A.5.15': 0.15, 'A.8.16': 0.10, 'A.5.23': 0.13}
+    }
+}
+
+
+def _numbered(base: List[str], count: int) -> List[str]:
+    """Take count distinct names from base, numbering repeats (base, base 2, base 3, ...)"""
+    names = []
+    for index in range(count):
+        cycle, position = divmod(index, len(base))
+        names.append(base[position] if cycle == 0 else f"{base[position]} {cycle + 1}")
+    return names
+
+
+def _id_width(count: int) -> int:
+    """Digits for zero-padded ids (at least 3, as in the sample data)"""
+    return max(3, len(str(count)))
+
+
+def _case_variant(name: str) -> str:
+    """A spelling of a vendor name that differs only by case"""
+    return name.lower() if name != name.lower() else name.upper()
+
+
+def popularity_weights(vendor_count: int, exponent: float) -> np.ndarray:
+    """
+    Zipf vendor popularity: the vendor of rank r is chosen with weight 1 / r^exponent
+
+    Args:
+        vendor_count: Number of vendors
+        exponent: Skew (0 = uniform)
+
+    Returns:
+        Probabilities summing to 1, most popular vendor first
+    """
+    weights = 1.0 / np.arange(1, vendor_count + 1, dtype=np.float64) ** exponent
+    return weights / weights.sum()
+
+
+def business_metrics_from_config(business: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the business_metrics block of the load format
+
+    Args:
+        business: simulation.business section of config.yaml (missing values use defaults)
+
+    Returns:
+        business_metrics dictionary
+    """
+    revenue = business.get('revenue_per_hour', 150000)
+    transactions = business.get('transactions_per_hour', 5000)
+    return {
+        'total_customers': business.get('customer_count', 50000),
+        'revenue_per_hour': revenue,
+        'transactions_per_hour': transactions,
+        'average_transaction_value': revenue / transactions if transactions else 0
+    }
+
+
+def generate_synthetic_graph(
+    vendors: int = 1000,
+    services: int = 50000,
+    business_processes: int = 500,
+    seed: int = 42,
+    fan_out: float = 2.5,
+    popularity_exponent: float = 1.1,
+    processes_per_service: float = 2.0,
+    controls_per_framework: float = 1.5,
+    vendor_duplicate_rate: float = 0.0,
+    service_duplicate_rate: float = 0.0,
+    project_id: str = 'synthetic-project',
+    region: str = 'us-central1',
+    business_metrics: Optional[Dict[str, Any]] = None,
+    compliance_template: Optional[Dict[str, Any]] = None,
+    discovery_timestamp: str = '2025-01-01T00:00:00'
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Generate a synthetic dependency graph
+
+    Args:
+        vendors: Number of distinct vendors
+        services: Number of distinct services (GCP resources)
+        business_processes: Number of distinct business processes
+        seed: RNG seed (same parameters and seed give identical output)
+        fan_out: Mean vendors per service (at least 1)
+        popularity_exponent: Zipf exponent of vendor popularity
+        processes_per_service: Mean business processes per service (at least 1)
+        controls_per_framework: Mean compliance controls per vendor and framework
+        vendor_duplicate_rate: Share of vendors also listed under a case-variant name
+        service_duplicate_rate: Share of services also listed under a second service_id
+        project_id: GCP project in resource paths
+        region: GCP region in resource paths
+        business_metrics: business_metrics block (default: business_metrics_from_config
+            defaults; main() passes the configured simulation.business values)
+        compliance_template: compliance_controls.json-style dict providing
+            compliance_baseline and impact_weights (the control catalog)
+        discovery_timestamp: Timestamp stamped on the discovery output
+
+    Returns:
+        Dictionary with 'dependencies', 'compliance' and 'discovery' documents
+    """
+    if vendors < 1 or services < 1 or business_processes < 1:
+        raise ValueError("vendors, services and business_processes must be at least 1")
+
+    rng = np.random.default_rng(seed)
+
+    # Vendors: name, category, criticality and env var prefix
+    categories = list(VENDOR_ROOTS)
+    base_names = [
+        (f"{root}{suffix}", category)
+        for suffix in VENDOR_SUFFIXES
+        for category in categories
+        for root in VENDOR_ROOTS[category]
+    ]
+    vendor_names = _numbered([name for name, _ in base_names], vendors)
+    vendor_categories = [base_names[index % len(base_names)][1] for index in range(vendors)]
+    vendor_criticality = rng.choice(len(CRITICALITIES), size=vendors, p=CRITICALITY_WEIGHTS)
+    env_prefixes = [''.join(c for c in name.upper() if c.isalnum()) for name in vendor_names]
+
+    process_names = _numbered(
+        [f"{area}_{stage}" for stage in PROCESS_STAGES for area in PROCESS_AREAS],
+        business_processes
+    )
+
+    # Services: vendors drawn by popularity in one batch, then de-duplicated per service
+    vendor_counts = np.minimum(1 + rng.poisson(max(fan_out - 1, 0), size=services), vendors)
+    vendor_draws = rng.choice(vendors, size=int(vendor_counts.sum()), p=popularity_weights(vendors, popularity_exponent))
+    process_counts = np.minimum(1 + rng.poisson(max(processes_per_service - 1, 0), size=services), business_processes)
+    process_draws = rng.integers(0, business_processes, size=int(process_counts.sum()))
+    service_types = rng.integers(0, len(SERVICE_TYPES), size=services)
+    rpms = np.round(rng.lognormal(mean=4.0, sigma=1.2, size=services)).astype(np.int64)
+    customers = np.round(rng.lognormal(mean=8.0, sigma=1.5, size=services)).astype(np.int64)
+    env_suffixes = rng.integers(0, len(ENV_VAR_SUFFIXES), size=int(vendor_counts.sum()))
+    duplicated_services = rng.random(services) < service_duplicate_rate
+
+    width = _id_width(services * 2)
+    service_rows = []
+    vendor_services: List[List[int]] = [[] for _ in range(vendors)]
+    draw = process_draw = 0
+    for index in range(services):
+        service_type = SERVICE_TYPES[service_types[index]]
+        name = f"svc-{index:0{width}d}"
+        collection = 'functions' if service_type == 'cloud_function' else 'services'
+        env_vars = {}
+        for _ in range(vendor_counts[index]):
+            vendor = int(vendor_draws[draw])
+            env_vars.setdefault(vendor, f"{env_prefixes[vendor]}_{ENV_VAR_SUFFIXES[env_suffixes[draw]]}")
+            draw += 1
+        processes = sorted({process_names[p] for p in process_draws[process_draw:process_draw + process_counts[index]]})
+        process_draw += process_counts[index]
+
+        for vendor in env_vars:
+            vendor_services[vendor].append(index)
+        service_rows.append({
+            'service_id': f"svc_{index + 1:0{width}d}",
+            'name': name,
+            'type': service_type,
+            'gcp_resource': f"projects/{project_id}/locations/{region}/{collection}/{name}",
+            'env_vars': env_vars,
+            'business_processes': processes,
+            'rpm': int(rpms[index]),
+            'customers_affected': int(customers[index]),
+            'duplicate_id': f"svc_{services + index + 1:0{width}d}" if duplicated_services[index] else None
+        })
+
+    def service_entry(row: Dict[str, Any], vendor: int, service_id: Optional[str] = None) -> Dict[str, Any]:
+        """A service as listed under one vendor (with that vendor's env var)"""
+        return {
+            'service_id': service_id or row['service_id'],
+            'name': row['name'],
+            'type': row['type'],
+            'gcp_resource': row['gcp_resource'],
+            'environment_variables': [row['env_vars'][vendor]],
+            'business_processes': row['business_processes'],
+            'rpm': row['rpm'],
+            'customers_affected': row['customers_affected']
+        }
+
+    # Load-format vendors (plus case-variant duplicates holding part of the services)
+    duplicated_vendors = rng.random(vendors) < vendor_duplicate_rate
+    vendor_width = _id_width(vendors * 2)
+    vendor_docs = []
+    discovery_vendors = []
+    extra_vendor_id = vendors
+    for vendor in range(vendors):
+        entries = []
+        resources = []
+        for index in vendor_services[vendor]:
+            row = service_rows[index]
+            entries.append(service_entry(row, vendor))
+            resources.append({
+                'resource_name': row['gcp_resource'],
+                'resource_type': row['type'],
+                'env_variable': row['env_vars'][vendor]
+            })
+            if row['duplicate_id']:
+                entries.append(service_entry(row, vendor, row['duplicate_id']))
+                resources.append({
+                    'resource_name': row['name'],
+                    'resource_type': row['type'],
+                    'env_variable': row['env_vars'][vendor]
+                })
+
+        vendor_doc = {
+            'vendor_id': f"vendor_{vendor + 1:0{vendor_width}d}",
+            'name': vendor_names[vendor],
+            'category': vendor_categories[vendor],
+            'criticality': CRITICALITIES[vendor_criticality[vendor]],
+            'services': entries
+        }
+        vendor_docs.append(vendor_doc)
+        discovery_vendors.append({'name': vendor_names[vendor], 'dependency_count': len(resources), 'resources': resources})
+
+        if duplicated_vendors[vendor] and entries:
+            # The variant spelling owns a random half of the vendor's services
+            keep = rng.random(len(entries)) < 0.5
+            keep[0] = True
+            extra_vendor_id += 1
+            variant = _case_variant(vendor_names[vendor])
+            vendor_docs.append({
+                **vendor_doc,
+                'vendor_id': f"vendor_{extra_vendor_id:0{vendor_width}d}",
+                'name': variant,
+                'services': [entry for entry, kept in zip(entries, keep) if kept]
+            })
+            variant_resources = [resource for resource, kept in zip(resources, keep) if kept]
+            discovery_vendors.append({'name': variant, 'dependency_count': len(variant_resources), 'resources': variant_resources})
+
+    if business_metrics is None:
+        business_metrics = business_metrics_from_config({})
+
+    # Compliance: each vendor satisfies a few controls per framework of the catalog
+    template = compliance_template or DEFAULT_COMPLIANCE_TEMPLATE
+    catalog = {framework: sorted(controls) for framework, controls in template['impact_weights'].items()}
+    control_mappings = {}
+    for vendor in range(vendors):
+        mapping = {}
+        for framework, control_ids in catalog.items():
+            count = min(int(rng.poisson(controls_per_framework)), len(control_ids))
+            if count:
+                picked = rng.choice(len(control_ids), size=count, replace=False)
+                mapping[f"{framework}_controls"] = [control_ids[p] for p in sorted(picked)]
+        if mapping:
+            control_mappings[vendor_names[vendor]] = mapping
+
+    # Discovery: one record per resource, with every vendor's env var set on it
+    cloud_functions = []
+    cloud_run_services = []
+    for row in service_rows:
+        env = {env_var: '' for env_var in row['env_vars'].values()}
+        if row['type'] == 'cloud_function':
+            cloud_functions.append({
+                'name': row['gcp_resource'],
+                'runtime': 'python311',
+                'entry_point': 'main',
+                'environment_variables': env,
+                'status': 'ACTIVE'
+            })
+        else:
+            cloud_run_services.append({
+                'name': row['gcp_resource'],
+                'uri': f"https://{row['name']}-{project_id}.a.run.app",
+                'environment_variables': env,
+                'description': ''
+            })
+
+    return {
+        'dependencies': {'vendors': vendor_docs, 'business_metrics': business_metrics},
+        'compliance': {
+            'compliance_baseline': template['compliance_baseline'],
+            'control_mappings': control_mappings,
+            'impact_weights': template['impact_weights']
+        },
+        'discovery': {
+            'project_id': project_id,
+            'region': region,
+            'discovery_timestamp': discovery_timestamp,
+            'cloud_functions': cloud_functions,
+            'cloud_run_services': cloud_run_services,
+            'vendors': discovery_vendors
+        }
+    }
+
+
+def validate_dependencies(data: Dict[str, Any], schema_file: str = 'data/schemas/vendor_schema.json') -> List[str]:
+    """
+    Validate load-format data against the vendor schema
+
+    Args:
+        data: Dependencies document
+        schema_file: JSON schema path
+
+    Returns:
+        Validation error messages (empty when valid)
+
+    Raises:
+        ImportError: If jsonschema is not installed
+    """
+    import jsonschema
+
+    validator = jsonschema.Draft7Validator(load_json_file(schema_file))
+    return [error.message for error in validator.iter_errors(data)]
+
+
+def main():
+    """Main entry point"""
+    # Only defaults are read here: the generator never connects to Neo4j
+    simulation_config = load_config(resolve_secrets=False).get('simulation', {})
+    defaults = simulation_config.get('synthetic', {})
+
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic enterprise-scale vendor dependency graph'
+    )
+    parser.add_argument('--vendors', type=int, default=defaults.get('vendors', 1000), help='Distinct vendors')
+    parser.add_argument('--services', type=int, default=defaults.get('services', 50000), help='Distinct services')
+    parser.add_argument(
+        '--business-processes',
+        type=int,
+        default=defaults.get('business_processes', 500),
+        help='Distinct business processes'
+    )
+    parser.add_argument('--seed', type=int, default=defaults.get('seed', 42), help='RNG seed')
+    parser.add_argument('--fan-out', type=float, default=defaults.get('fan_out', 2.5), help='Mean vendors per service')
+    parser.add_argument(
+        '--popularity-exponent',
+        type=float,
+        default=defaults.get('popularity_exponent', 1.1),
+        help='Zipf exponent of vendor popularity (0 = uniform)'
+    )
+    parser.add_argument(
+        '--processes-per-service',
+        type=float,
+        default=defaults.get('processes_per_service', 2.0),
+        help='Mean business processes per service'
+    )
+    parser.add_argument(
+        '--vendor-duplicate-rate',
+        type=float,
+        default=defaults.get('vendor_duplicate_rate', 0.0),
+        help='Share of vendors also listed under a case-variant name'
+    )
+    parser.add_argument(
+        '--service-duplicate-rate',
+        type=float,
+        default=defaults.get('service_duplicate_rate', 0.0),
+        help='Share of services also listed under a second service_id'
+    )
+    parser.add_argument('--project-id', default=defaults.get('project_id', 'synthetic-project'), help='GCP project in resource paths')
+    parser.add_argument(
+        '--output-dir',
+        default='data/synthetic',
+        help='Directory for dependencies.json, compliance_controls.json and the discovery file'
+    )
+    parser.add_argument(
+        '--ndjson',
+        action='store_true',
+        help='Write discovery output as synthetic_discovery.ndjson.gz instead of JSON'
+    )
+    parser.add_argument(
+        '--validate',
+        action='store_true',
+        help='Validate dependencies.json against data/schemas/vendor_schema.json (requires jsonschema)'
+    )
+    parser.add_argument(
+        '--log-level',
+        default='INFO',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        help='Logging level'
+    )
+
+    args = parser.parse_args()
+    logger = setup_logging(args.log_level)
+
+    graph = generate_synthetic_graph(
+        vendors=args.vendors,
+        services=args.services,
+        business_processes=args.business_processes,
+        seed=args.seed,
+        fan_out=args.fan_out,
+        popularity_exponent=args.popularity_exponent,
+        processes_per_service=args.processes_per_service,
+        vendor_duplicate_rate=args.vendor_duplicate_rate,
+        service_duplicate_rate=args.service_duplicate_rate,
+        project_id=args.project_id,
+        business_metrics=business_metrics_from_config(simulation_config.get('business', {})),
+        compliance_template=load_json_file('data/sample/compliance_controls.json')
+    )
+
+    if args.validate:
+        try:
+            errors = validate_dependencies(graph['dependencies'])
+        except ImportError:
+            logger.error("jsonschema is not installed. Install with: pip install jsonschema")
+            return 1
+        if errors:
+            logger.error(f"❌ {len(errors)} schema violations, first: {errors[0]}")
+            return 1
+        logger.info("✅ dependencies.json conforms to vendor_schema.json")
+
+    output_dir = Path(args.output_dir)
+    save_json_file(graph['dependencies'], str(output_dir / 'dependencies.json'))
+    save_json_file(graph['compliance'], str(output_dir / 'compliance_controls.json'))
+    if args.ndjson:
+        discovery_path = output_dir / 'synthetic_discovery.ndjson.gz'
+        full_path = Path(__file__).parent.parent.parent / discovery_path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(full_path, 'wb') as f:
+            write_discovery_ndjson(graph['discovery'], f)
+        logger.info(f"Saved discovery NDJSON to {full_path}")
+    else:
+        save_json_file(graph['discovery'], str(output_dir / 'synthetic_discovery.json'))
+
+    dependencies = graph['dependencies']['vendors']
+    logger.info(
+        f"✅ Generated {len(dependencies)} vendor entries ({args.vendors} distinct), {args.services} services, "
+        f"{args.business_processes} business processes (seed {args.seed})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
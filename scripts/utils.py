@@ -21,6 +21,13 @@ except ImportError:
     GCP_SECRETS_AVAILABLE = False
     logging.getLogger(__name__).debug("GCP Secret Manager not available, using environment variables")
 
+# Default weights for the overall impact score
+DEFAULT_IMPACT_WEIGHTS = {
+    'operational': 0.4,
+    'financial': 0.35,
+    'compliance': 0.25
+}
+
 
 def setup_logging(log_level: str = "INFO") -> logging.Logger:
     """
@@ -40,13 +47,15 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
     return logging.getLogger(__name__)
 
 
-def load_config(config_path: str = "config/config.yaml") -> Dict[str, Any]:
+def load_config(config_path: str = "config/config.yaml", resolve_secrets: bool = True) -> Dict[str, Any]:
     """
     Load configuration from YAML file with environment variable substitution.
     Also attempts to load Neo4j credentials from GCP Secret Manager if available.
     
     Args:
         config_path: Path to config file
+        resolve_secrets: Look up Neo4j credentials in Secret Manager (disable
+            for tools that never connect to Neo4j)
     
     Returns:
         Configuration dictionary
@@ -68,7 +77,7 @@ def load_config(config_path: str = "config/config.yaml") -> Dict[str, Any]:
     config = _substitute_env_vars(config)
     
     # Try to load Neo4j credentials from GCP Secret Manager (takes precedence over env vars)
-    if GCP_SECRETS_AVAILABLE and config.get('neo4j'):
+    if resolve_secrets and GCP_SECRETS_AVAILABLE and config.get('neo4j'):
         try:
             neo4j_creds = get_neo4j_credentials()
             logger.debug(f"Secret Manager returned URI: {neo4j_creds.get('uri', 'None')}")
@@ -244,11 +253,7 @@ def calculate_impact_score(
         Weighted impact score
     """
     if weights is None:
-        weights = {
-            'operational': 0.4,
-            'financial': 0.35,
-            'compliance': 0.25
-        }
+        weights = DEFAULT_IMPACT_WEIGHTS
     
     score = (
         operational_impact * weights['operational'] +
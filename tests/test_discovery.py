@@ -2,9 +2,83 @@
 Unit tests for GCP Discovery module
 """
 
+import importlib.util
+import json
+from pathlib import Path
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+from neo4j.exceptions import ServiceUnavailable
+from google.api_core.exceptions import PreconditionFailed
 from scripts.gcp.gcp_discovery import GCPDiscovery
+from scripts.gcp.vendor_matcher import VendorPatternMatcher
+from scripts.gcp.discovery_graph import (
+    convert_to_neo4j_format,
+    build_write_plan,
+    MERGE_VENDORS_QUERY,
+    MERGE_SERVICES_BY_RESOURCE_QUERY,
+    LINK_VENDOR_SERVICE_BY_RESOURCE_QUERY,
+    LINK_SERVICE_PROCESS_BY_RESOURCE_QUERY,
+    BUMP_GRAPH_VERSION_QUERY,
+    SYNC_REMOVE_SERVICES_QUERY,
+    SYNC_REMOVE_ORPHANED_VENDORS_QUERY,
+    sync_discovery_data
+)
+from scripts.neo4j.load_graph import Neo4jGraphLoader
+from scripts.neo4j.dedupe import plan_merge_groups, iter_merge_chunks
+from scripts.neo4j.schema import ensure_schema
+from scripts.gcp.discovery_manifest import record_discovery, resolve_discovery, MANIFEST_BLOB
+from scripts.gcp.fetch_discovery_results import get_latest_discovery
+from scripts.gcp.discovery_format import (
+    write_discovery_ndjson,
+    read_discovery_records,
+    assemble_discovery
+)
+
+
+def load_function_module(name):
+    """Import a Cloud Function's main.py under its own module name (module state is fresh each call)"""
+    path = Path(__file__).parent.parent / 'cloud_functions' / name / 'main.py'
+    spec = importlib.util.spec_from_file_location(f'{name}_main', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeBucket:
+    """In-memory stand-in for a Cloud Storage bucket with object generations"""
+    
+    def __init__(self):
+        self.objects = {}  # name -> (payload, generation)
+        self.conflicts = 0  # upcoming writes that lose to a concurrent writer
+        self.uploads = 0
+    
+    def get_blob(self, name):
+        if name not in self.objects:
+            return None
+        payload, generation = self.objects[name]
+        return Mock(name=name, generation=generation, download_as_bytes=Mock(return_value=payload))
+    
+    def blob(self, name):
+        def upload_from_string(data, content_type=None, if_generation_match=None):
+            self.uploads += 1
+            if self.conflicts:
+                self.conflicts -= 1
+                raise PreconditionFailed('generation mismatch')
+            current = self.objects.get(name, (None, 0))[1]
+            if if_generation_match is not None and if_generation_match != current:
+                raise PreconditionFailed('generation mismatch')
+            self.objects[name] = (data.encode('utf-8'), current + 1)
+        
+        blob = Mock(upload_from_string=upload_from_string)
+        blob.name = name
+        return blob
+    
+    def exists(self):
+        return True
+    
+    def list_blobs(self, prefix=''):
+        return [self.blob(name) for name in self.objects if name.startswith(prefix)]
 
 
 class TestGCPDiscovery:
@@ -119,6 +193,362 @@ class TestGCPDiscovery:
         # Should detect both
         assert 'Stripe' in vendor_deps
         assert len(vendor_deps['Stripe']) == 2
+    
+    def test_matcher_reports_all_vendor_hits(self):
+        """Test single-pass matcher finds overlapping signatures for several vendors"""
+        patterns = {f'Vendor{i}': [f'V{i}X_'] for i in range(2000)}
+        patterns['Stripe'] = ['STRIPE_']
+        patterns['Okta'] = ['okta']
+        matcher = VendorPatternMatcher(patterns)
+        
+        assert matcher.match('my_okta_stripe_key') == ['Stripe', 'Okta']
+        assert matcher.match('V1999X_TOKEN') == ['Vendor1999']
+        assert matcher.match('V19X_TOKEN') == ['Vendor19']
+        assert matcher.match('UNRELATED') == []
+    
+    def test_ndjson_format_round_trip(self):
+        """Test compressed NDJSON discovery output streams back to the same results"""
+        import io
+        results = {
+            'project_id': 'test-project',
+            'discovery_timestamp': '2024-01-01T00:00:00',
+            'cloud_functions': [{'name': 'payment-api', 'environment_variables': {'STRIPE_API_KEY': 'x'}}],
+            'cloud_run_services': [],
+            'vendors': [{'name': 'Stripe', 'dependency_count': 1, 'resources': []}]
+        }
+        
+        buffer = io.BytesIO()
+        write_discovery_ndjson(results, buffer)
+        buffer.seek(0)
+        records = list(read_discovery_records(buffer))
+        
+        assert records[0]['record_type'] == 'header'
+        assert [r['record_type'] for r in records[1:]] == ['cloud_function', 'vendor']
+        assert assemble_discovery(records) == results
+    
+    def test_convert_resolves_resources_by_full_or_short_name(self):
+        """Test converted services pick up env vars of the matching discovered resource"""
+        results = {
+            'cloud_functions': [
+                {'name': 'projects/p/locations/us-central1/functions/pay', 'environment_variables': {'STRIPE_KEY': 'x'}}
+            ],
+            'cloud_run_services': [
+                {'name': 'projects/p/locations/us-central1/services/web', 'environment_variables': {'AUTH0_DOMAIN': 'x'}}
+            ],
+            'vendors': [
+                {'name': 'stripe', 'resources': [{'resource_type': 'cloud_function', 'resource_name': 'pay'}]},
+                {'name': 'Auth0', 'resources': [
+                    {'resource_type': 'cloud_run', 'resource_name': 'projects/p/locations/us-central1/services/web'}
+                ]}
+            ]
+        }
+        
+        vendors = convert_to_neo4j_format(results, 'p')['vendors']
+        
+        assert [v['name'] for v in vendors] == ['Stripe', 'Auth0']
+        assert vendors[0]['services'][0]['environment_variables'] == ['STRIPE_KEY']
+        assert vendors[1]['services'][0]['environment_variables'] == ['AUTH0_DOMAIN']
+        assert vendors[1]['services'][0]['name'] == 'web'
+    
+    def test_write_plan_keys_services_by_gcp_resource(self):
+        """Test a service shared by vendors becomes one row, identified the same on every run"""
+        shared = {'resource_type': 'cloud_function', 'resource_name': 'projects/p/locations/us-central1/functions/pay'}
+        results = {
+            'vendors': [
+                {'name': 'Stripe', 'resources': [shared]},
+                {'name': 'PayPal', 'resources': [shared, {'resource_type': 'cloud_function', 'resource_name': 'pay'}]}
+            ]
+        }
+        
+        plan = build_write_plan(convert_to_neo4j_format(results, 'p')['vendors'], project_id='p')
+        again = build_write_plan(convert_to_neo4j_format(results, 'p')['vendors'], project_id='p')
+        
+        assert len(plan['services']) == 1
+        service = plan['services'][0]
+        assert service['gcp_resource'] == shared['resource_name']
+        assert service['vendors'] == ['paypal', 'stripe']
+        assert service['fingerprint'] == again['services'][0]['fingerprint']
+        assert service['service_id'] == again['services'][0]['service_id']
+    
+    def test_duplicate_vendor_merge_plan(self):
+        """Test duplicate vendors keep the best node, fill its gaps and are never split across chunks"""
+        records = [
+            {'merge_key': 'stripe', 'nodes': [
+                {'id': 'n1', 'properties': {'name': 'stripe', 'category': 'payment_processor'}, 'degree': 3},
+                {'id': 'n2', 'properties': {'name': 'Stripe', 'display_name': 'Stripe'}, 'degree': 1},
+                {'id': 'n3', 'properties': {'name': 'STRIPE', 'criticality': 'critical'}, 'degree': 0}
+            ]},
+            {'merge_key': 'auth0', 'nodes': [
+                {'id': 'n4', 'properties': {'name': 'auth0'}, 'degree': 1},
+                {'id': 'n5', 'properties': {'name': 'Auth0'}, 'degree': 2}
+            ]}
+        ]
+        
+        groups = plan_merge_groups('vendor', records)
+        
+        stripe = groups[0]
+        assert stripe['keep']['id'] == 'n2'
+        assert [node['id'] for node in stripe['duplicates']] == ['n1', 'n3']
+        assert stripe['properties'] == {
+            'name': 'stripe',
+            'display_name': 'Stripe',
+            'category': 'payment_processor',
+            'criticality': 'critical'
+        }
+        assert groups[1]['keep']['id'] == 'n5'
+        assert groups[1]['properties']['display_name'] == 'Auth0'
+        
+        chunks = list(iter_merge_chunks(groups, batch_size=2))
+        assert [[row['keep_id'] for row in chunk] for chunk in chunks] == [['n2'], ['n5']]
+        assert chunks[0][0]['duplicate_ids'] == ['n1', 'n3']
+        assert len(list(iter_merge_chunks(groups, batch_size=0))) == 1
+
+
+class TestDiscoveryManifest:
+    """Test discovery lookup through the LATEST manifest and date index"""
+    
+    def record(self, bucket, *stamps):
+        for stamp in stamps:
+            record_discovery(bucket, f'discoveries/{stamp}_discovery.ndjson.gz', {'vendor_count': 1}, history_size=2)
+    
+    def test_latest_and_date_index_resolution(self):
+        """Test nth-latest lookups come from LATEST (bounded history) and the per-day index"""
+        bucket = FakeBucket()
+        self.record(bucket, '20240101_090000', '20240102_090000', '20240102_180000')
+        
+        assert resolve_discovery(bucket)['blob_name'] == 'discoveries/20240102_180000_discovery.ndjson.gz'
+        assert resolve_discovery(bucket, nth=1)['blob_name'] == 'discoveries/20240102_090000_discovery.ndjson.gz'
+        assert resolve_discovery(bucket, nth=2) is None
+        assert resolve_discovery(bucket, nth=1, date='2024-01-02')['blob_name'] == \
+            'discoveries/20240102_090000_discovery.ndjson.gz'
+        assert resolve_discovery(bucket, date='2024-01-01')['blob_name'] == 'discoveries/20240101_090000_discovery.ndjson.gz'
+        assert resolve_discovery(bucket, date='2024-01-03') is None
+    
+    def test_concurrent_update_is_retried(self):
+        """Test a write that loses the generation race re-reads and keeps both entries"""
+        bucket = FakeBucket()
+        self.record(bucket, '20240101_090000')
+        uploads = bucket.uploads
+        bucket.conflicts = 1
+        self.record(bucket, '20240101_100000')
+        
+        manifest = json.loads(bucket.objects[MANIFEST_BLOB][0])
+        assert [e['blob_name'][12:27] for e in manifest['recent']] == ['20240101_100000', '20240101_090000']
+        assert bucket.uploads - uploads == 3
+        
+        bucket.conflicts = 10
+        with pytest.raises(PreconditionFailed):
+            self.record(bucket, '20240101_110000')
+    
+    def test_fallback_beyond_manifest_history_logs_reason(self, caplog):
+        """Test a discovery older than the LATEST history is found by listing, with the real reason logged"""
+        bucket = FakeBucket()
+        for day in (1, 2, 3):
+            name = f'discoveries/2024010{day}_090000_discovery.json'
+            bucket.objects[name] = (json.dumps({'project_id': 'p', 'day': day}).encode('utf-8'), 1)
+            record_discovery(bucket, name, {}, history_size=2)
+        
+        def blob(name):
+            found = Mock(download_as_text=Mock(return_value=bucket.objects[name][0].decode('utf-8')))
+            found.name = name
+            return found
+        
+        with patch('scripts.gcp.fetch_discovery_results.storage.Client') as client:
+            client.return_value.bucket.return_value = bucket
+            with patch.object(bucket, 'blob', side_effect=blob):
+                assert get_latest_discovery('p', nth=1)['day'] == 2
+                assert 'listing' not in caplog.text
+                assert get_latest_discovery('p', nth=2)['day'] == 1
+        
+        assert 'only lists the 2 most recent discoveries (requested #2)' in caplog.text
+        assert 'No discoveries/LATEST manifest' not in caplog.text
+
+
+class TestDiscoveryFunction:
+    """Test the discovery Cloud Function with mocked GCP clients"""
+    
+    @pytest.fixture
+    def discovery_function(self):
+        """discovery function module with GCP clients mocked out"""
+        module = load_function_module('discovery')
+        with patch.object(module.functions_v1, 'CloudFunctionsServiceClient'), \
+                patch.object(module.run_v2, 'ServicesClient'):
+            yield module
+    
+    def test_concurrent_listings_merge_in_name_order_and_collect_errors(self, discovery_function):
+        """Test listings merge by resource name regardless of completion order, and a failed region is recorded"""
+        module = discovery_function
+        
+        def list_functions(client, project_id, location, timeout):
+            return [
+                {'name': f'projects/{project_id}/locations/{location}/functions/z-fn', 'environment_variables': {}},
+                {'name': f'projects/{project_id}/locations/{location}/functions/a-fn',
+                 'environment_variables': {'STRIPE_API_KEY': 'x'}}
+            ]
+        
+        def list_services(client, project_id, location, timeout):
+            if (project_id, location) == ('p2', 'europe-west1'):
+                raise RuntimeError('403 permission denied')
+            return [{'name': f'projects/{project_id}/locations/{location}/services/web', 'environment_variables': {}}]
+        
+        with patch.object(module, 'INCREMENTAL_DISCOVERY', False), \
+                patch.object(module, 'list_cloud_functions', side_effect=list_functions), \
+                patch.object(module, 'list_cloud_run', side_effect=list_services):
+            results = module.run_discovery('p1', project_ids=['p2', 'p1', 'p2'], regions=['us-central1', 'europe-west1'])
+        
+        names = [f['name'] for f in results['cloud_functions']]
+        assert names == sorted(names) and len(names) == 8
+        assert len(results['cloud_run_services']) == 3
+        assert results['discovery_errors'] == [{
+            'resource_type': 'cloud_run_services', 'project_id': 'p2', 'location': 'europe-west1',
+            'error': '403 permission denied'
+        }]
+        assert results['vendors'][0]['dependency_count'] == 4
+    
+    def test_cached_hits_reused_only_for_unchanged_revision(self, discovery_function):
+        """Test vendor hits from the last scan are reused only while the resource revision is unchanged"""
+        module = discovery_function
+        previous = {
+            'fn-same': {'revision': 'v1', 'hits': [['Stripe', 'STRIPE_KEY']]},
+            'fn-changed': {'revision': 'v1', 'hits': [['Stripe', 'STRIPE_KEY']]},
+            'fn-unversioned': {'revision': '', 'hits': [['Stripe', 'STRIPE_KEY']]}
+        }
+        env = {'environment_variables': {'TWILIO_AUTH_TOKEN': 'x'}}
+        
+        assert module.resource_vendor_hits({'name': 'fn-same', 'revision': 'v1', **env}, previous) == [('Stripe', 'STRIPE_KEY')]
+        assert module.resource_vendor_hits({'name': 'fn-changed', 'revision': 'v2', **env}, previous) == \
+            [('Twilio', 'TWILIO_AUTH_TOKEN')]
+        assert module.resource_vendor_hits({'name': 'fn-unversioned', 'revision': '', **env}, previous) == \
+            [('Twilio', 'TWILIO_AUTH_TOKEN')]
+        
+        # State written under other vendor signatures is discarded
+        blob = MagicMock()
+        blob.exists.return_value = True
+        blob.download_as_bytes.return_value = json.dumps({'patterns_fingerprint': 'old', 'resources': previous})
+        with patch.object(module, '_state_blob', return_value=blob):
+            assert module.load_discovery_state('p1') == {}
+            blob.download_as_bytes.return_value = json.dumps(
+                {'patterns_fingerprint': module.PATTERNS_FINGERPRINT, 'resources': previous}
+            )
+            assert module.load_discovery_state('p1') == previous
+
+
+class TestGraphLoaders:
+    """Test batched Neo4j writes of the graph loaders"""
+    
+    def test_load_graph_writes_chunked_unwind_transactions(self):
+        """Test each UNWIND step is split into batch_size-row transactions in dependency order"""
+        vendors = [
+            {'vendor_id': f'vendor_{i:03d}', 'name': f'Vendor{i}', 'services': [
+                {'service_id': f'svc_{i:03d}', 'name': f'svc-{i}', 'gcp_resource': f'projects/p/services/svc-{i}',
+                 'business_processes': []}
+            ]}
+            for i in range(5)
+        ]
+        
+        with patch('scripts.neo4j.load_graph.GraphDatabase.driver') as driver:
+            loader = Neo4jGraphLoader('bolt://localhost:7687', 'neo4j', 'password', batch_size=2)
+            loader.load_dependencies({'vendors': vendors})
+        
+        session = driver.return_value.session.return_value.__enter__.return_value
+        chunks = [(c.args[1], len(c.args[2])) for c in session.execute_write.call_args_list]
+        steps = [MERGE_VENDORS_QUERY, MERGE_SERVICES_BY_RESOURCE_QUERY,
+                 LINK_VENDOR_SERVICE_BY_RESOURCE_QUERY, LINK_SERVICE_PROCESS_BY_RESOURCE_QUERY]
+        assert chunks == [(query, size) for query in steps for size in (2, 2, 1)]
+        # One graph version bump after all chunks, with the query the sync uses
+        session.run.assert_called_once_with(BUMP_GRAPH_VERSION_QUERY)
+    
+    def test_sync_prunes_vendors_left_without_relationships(self):
+        """Test vendors cut off by removed services are handed to the orphan prune in the same transaction"""
+        data = {'vendors': [{'vendor_id': 'vendor_001', 'name': 'Stripe', 'services': [
+            {'service_id': 'svc_001', 'name': 'payments', 'gcp_resource': 'projects/p/services/payments',
+             'business_processes': []}
+        ]}]}
+        session = MagicMock()
+        session.run.return_value = [{'gcp_resource': 'projects/p/services/legacy-mailer', 'fingerprint': 'old'}]
+        tx = MagicMock()
+        
+        def run(query, **params):
+            result = MagicMock()
+            if query == SYNC_REMOVE_SERVICES_QUERY:
+                result.__iter__.return_value = iter([{'vendor_name': 'sendgrid'}])
+            elif query == SYNC_REMOVE_ORPHANED_VENDORS_QUERY:
+                result.single.return_value = {'removed': 1}
+            return result
+        
+        tx.run.side_effect = run
+        session.execute_write.side_effect = lambda write: write(tx)
+        
+        stats = sync_discovery_data(session, data, 'p')
+        
+        assert stats['removed'] == 1 and stats['vendors_removed'] == 1
+        queries = [c.args[0] for c in tx.run.call_args_list]
+        assert queries.index(SYNC_REMOVE_ORPHANED_VENDORS_QUERY) > queries.index(SYNC_REMOVE_SERVICES_QUERY)
+        orphan_call = tx.run.call_args_list[queries.index(SYNC_REMOVE_ORPHANED_VENDORS_QUERY)]
+        assert orphan_call.kwargs['names'] == ['sendgrid']
+        assert queries[-1] == BUMP_GRAPH_VERSION_QUERY
+    
+    @pytest.fixture
+    def graph_loader(self):
+        """graph_loader function module with schema bootstrap stubbed out"""
+        module = load_function_module('graph_loader')
+        with patch.object(module, 'ensure_schema'), patch.object(module.GraphDatabase, 'driver') as driver:
+            yield module, driver
+    
+    def test_graph_loader_reconnects_once_on_stale_connection(self, graph_loader):
+        """Test a dropped connection rebuilds the shared driver and retries the load exactly once"""
+        module, driver = graph_loader
+        credentials = {'uri': 'neo4j+s://example', 'user': 'neo4j', 'password': 'secret'}
+        stale, fresh = MagicMock(), MagicMock()
+        driver.side_effect = [stale, fresh]
+        
+        with patch.object(module, 'write_discovery_data', side_effect=[ServiceUnavailable('closed'), None, None]) as write:
+            module.load_into_neo4j({'vendors': []}, credentials)
+            assert write.call_count == 2
+            stale.close.assert_called_once()
+            
+            # Warm invocations reuse the rebuilt driver
+            module.load_into_neo4j({'vendors': []}, credentials)
+            assert write.call_count == 3
+            assert driver.call_count == 2
+            assert module.get_driver(credentials) is fresh
+    
+    def test_graph_loader_gives_up_after_one_retry(self, graph_loader):
+        """Test a connection that stays down fails the invocation after two attempts"""
+        module, driver = graph_loader
+        credentials = {'uri': 'neo4j+s://example', 'user': 'neo4j', 'password': 'secret'}
+        
+        with patch.object(module, 'write_discovery_data', side_effect=ServiceUnavailable('down')) as write:
+            with pytest.raises(ServiceUnavailable):
+                module.load_into_neo4j({'vendors': []}, credentials)
+        
+        assert write.call_count == module.MAX_LOAD_ATTEMPTS == 2
+        assert driver.call_count == 2
+    
+    def test_ensure_schema_keeps_fallback_index_while_duplicates_remain(self):
+        """Test a fallback index is only dropped once its label has no duplicate keys left"""
+        queries = []
+        
+        def run(query, **params):
+            queries.append(query)
+            result = MagicMock()
+            if query.lstrip().startswith('SHOW INDEXES'):
+                result.__iter__.return_value = iter([
+                    {'name': 'vendor_name_unique_fallback'}, {'name': 'service_gcp_resource_unique_fallback'}
+                ])
+            elif 'copies > 1' in query:
+                result.single.return_value = {'key': 'stripe'} if ':Vendor)' in query else None
+            return result
+        
+        driver = MagicMock()
+        driver.session.return_value.__enter__.return_value.run.side_effect = run
+        report = ensure_schema(driver, wait_seconds=0)
+        
+        assert 'vendor_name_unique' in report['failed']
+        assert not any('vendor_name_unique' in q and ('DROP' in q or 'CREATE' in q) for q in queries)
+        drop = queries.index('DROP INDEX service_gcp_resource_unique_fallback IF EXISTS')
+        assert queries[drop + 1].startswith('CREATE CONSTRAINT service_gcp_resource_unique IF NOT EXISTS')
+        assert 'service_gcp_resource_unique' not in report['failed']
 
 
 class TestGCPDiscoveryIntegration:
@@ -2,9 +2,90 @@
 Unit tests for Vendor Failure Simulation module
 """
 
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from scripts.simulation.simulate_failure import VendorFailureSimulator
+from scripts.simulation.graph_snapshot import DependencyGraphSnapshot
+from scripts.simulation.compliance_index import ComplianceIndex
+from scripts.simulation.result_cache import SimulationResultCache, make_cache_key
+from scripts.simulation.result_store import SQLiteResultStore, new_simulation_id
+from scripts.simulation.graph_backend import InMemoryGraphBackend
+from scripts.simulation.synthetic_graph import (
+    generate_synthetic_graph,
+    business_metrics_from_config,
+    validate_dependencies
+)
+from scripts.gcp.discovery_graph import convert_to_neo4j_format, build_write_plan
+from scripts.gcp.pubsub_publisher import BatchingPublisher
+from google.cloud.pubsub_v1.publisher.exceptions import FlowControlLimitError
+
+
+def load_function_module(name):
+    """Import a Cloud Function's main.py under its own module name (module state is fresh each call)"""
+    path = Path(__file__).parent.parent / 'cloud_functions' / name / 'main.py'
+    spec = importlib.util.spec_from_file_location(f'{name}_main', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_simulation_service(tmp_path):
+    """
+    Import the simulation service app backed by the sample graph held in memory,
+    with a fresh result cache and a SQLite result store (no Neo4j, no Pub/Sub)
+    """
+    path = Path(__file__).parent.parent / 'cloud_run' / 'simulation-service' / 'app.py'
+    spec = importlib.util.spec_from_file_location('simulation_service_app', path)
+    service = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(service)
+    
+    service.simulator = VendorFailureSimulator(backend=InMemoryGraphBackend.from_files(
+        'data/sample/sample_dependencies.json',
+        'data/sample/compliance_controls.json'
+    ))
+    service.graph_version = Mock(current=Mock(return_value='v1'))
+    service.result_cache = SimulationResultCache(max_entries=100, ttl_seconds=60)
+    service.result_store = SQLiteResultStore(str(tmp_path / 'results.db'))
+    service._result_store_ready = True
+    return service
+
+
+def read_ndjson(response):
+    """Parse an NDJSON response body into a list of objects"""
+    body = response.get_data(as_text=True)
+    assert body.endswith('\n')
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def build_sample_snapshot():
+    """Build a small in-memory graph snapshot for testing"""
+    return DependencyGraphSnapshot.from_records(
+        vendors=[
+            {'name': 'stripe', 'display_name': 'Stripe'},
+            {'name': 'auth0', 'display_name': 'Auth0'},
+        ],
+        services=[
+            {'service_key': 's1', 'service_name': 'payment-api', 'service_type': 'cloud_function',
+             'rpm': 500, 'customers_affected': 50000, 'business_processes': ['checkout', 'refunds']},
+            {'service_key': 's2', 'service_name': 'checkout-service', 'service_type': 'cloud_run',
+             'rpm': 800, 'customers_affected': 50000, 'business_processes': ['checkout']},
+            {'service_key': 's3', 'service_name': 'auth-service', 'service_type': 'cloud_run',
+             'rpm': None, 'customers_affected': 100000, 'business_processes': ['user_login']},
+        ],
+        depends_on=[
+            {'service_key': 's1', 'vendor_name': 'stripe'},
+            {'service_key': 's2', 'vendor_name': 'stripe'},
+            {'service_key': 's3', 'vendor_name': 'auth0'},
+            {'service_key': 's2', 'vendor_name': 'auth0'},
+        ]
+    )
 
 
 class TestVendorFailureSimulator:
@@ -164,6 +245,612 @@ class TestVendorFailureSimulator:
         assert 0.0 <= result['overall_impact_score'] <= 1.0
 
 
+class TestDependencyGraphSnapshot:
+    """Test in-memory snapshot mode"""
+    
+    def test_snapshot_adjacency(self):
+        """Test snapshot builds vendor -> service adjacency"""
+        snapshot = build_sample_snapshot()
+        
+        services = snapshot.affected_services('stripe')
+        assert [s['name'] for s in services] == ['payment-api', 'checkout-service']
+        assert services[0]['business_processes'] == ['checkout', 'refunds']
+        assert snapshot.affected_services('unknown') == []
+        assert snapshot.stats()['depends_on'] == 4
+    
+    def test_operational_impact_from_snapshot(self):
+        """Test operational impact is answered from memory without Neo4j"""
+        with patch('scripts.simulation.simulate_failure.GraphDatabase.driver'):
+            simulator = VendorFailureSimulator('bolt://localhost:7687', 'neo4j', 'password')
+        simulator.snapshot = build_sample_snapshot()
+        
+        impact = simulator._calculate_operational_impact('Stripe')
+        
+        simulator.driver.session.assert_not_called()
+        assert impact['service_count'] == 2
+        assert impact['total_rpm'] == 1300
+        assert impact['customers_affected'] == 50000
+        assert impact['business_processes'] == ['checkout', 'refunds']
+        
+        auth_impact = simulator._calculate_operational_impact('auth0')
+        assert auth_impact['total_rpm'] == 800  # Missing rpm counts as 0
+    
+    def test_sweep_matches_single_vendor_simulation(self):
+        """Test vectorized sweep agrees with per-vendor simulations"""
+        with patch('scripts.simulation.simulate_failure.GraphDatabase.driver'):
+            simulator = VendorFailureSimulator('bolt://localhost:7687', 'neo4j', 'password')
+        simulator.snapshot = build_sample_snapshot()
+        
+        sweep = simulator.sweep_all_vendors(durations=[1, 4, 24])
+        
+        assert sweep['vendor_count'] == 2
+        for entry in sweep['results']:
+            assert entry['operational_impact']['business_process_count'] > 0
+            for scenario in entry['scenarios']:
+                single = simulator.simulate_vendor_failure(entry['vendor'], scenario['duration_hours'])
+                assert scenario['total_cost'] == pytest.approx(single['financial_impact']['total_cost'])
+                assert scenario['failed_transactions'] == single['financial_impact']['failed_transactions']
+                assert scenario['overall_impact_score'] == pytest.approx(single['overall_impact_score'])
+
+
+class TestMultiVendorSimulation:
+    """Test correlated multi-vendor failures"""
+    
+    @pytest.fixture
+    def simulator(self):
+        """Create simulator answering from an in-memory snapshot"""
+        with patch('scripts.simulation.simulate_failure.GraphDatabase.driver'):
+            sim = VendorFailureSimulator('bolt://localhost:7687', 'neo4j', 'password')
+        sim.snapshot = build_sample_snapshot()
+        return sim
+    
+    def test_union_does_not_double_count_shared_services(self, simulator):
+        """Test that a service depending on both vendors is counted once"""
+        result = simulator.simulate_vendor_failure(['Stripe', 'auth0'], 4)
+        
+        assert result['vendors'] == ['Stripe', 'Auth0']
+        assert result['operational_impact']['service_count'] == 3  # checkout-service is shared
+        assert result['operational_impact']['total_rpm'] == 1300
+        assert result['operational_impact']['vendor_service_counts'] == {'stripe': 2, 'auth0': 2}
+        assert 'soc2' in result['compliance_impact']['affected_frameworks']
+    
+    def test_single_vendor_list_matches_string(self, simulator):
+        """Test a one-element vendor list behaves like a single vendor"""
+        from_list = simulator.simulate_vendor_failure(['Stripe', 'STRIPE '], 4)
+        from_str = simulator.simulate_vendor_failure('Stripe', 4)
+        
+        assert from_list['overall_impact_score'] == from_str['overall_impact_score']
+        assert 'vendors' not in from_list
+    
+    def test_worst_combination_search(self, simulator):
+        """Test branch-and-bound search finds the worst pair"""
+        search = simulator.find_worst_vendor_combinations(k=2, top_n=1)
+        
+        assert search['results'][0]['service_count'] == 3
+        assert sorted(search['results'][0]['vendors']) == ['Auth0', 'Stripe']
+        assert search['search']['total_combinations'] == 1
+
+
+class TestMonteCarloSimulation:
+    """Test Monte Carlo outage-duration engine"""
+
+    @pytest.fixture
+    def simulator(self):
+        """Create simulator answering from an in-memory snapshot"""
+        with patch('scripts.simulation.simulate_failure.GraphDatabase.driver'):
+            sim = VendorFailureSimulator('bolt://localhost:7687', 'neo4j', 'password')
+        sim.snapshot = build_sample_snapshot()
+        return sim
+
+    def test_fixed_duration_matches_deterministic_model(self, simulator):
+        """Test a fixed-duration model reproduces the single-scenario financial impact"""
+        simulator.config['simulation']['monte_carlo'] = {
+            'percentiles': [50, 99],
+            'duration': {'distribution': 'fixed', 'hours': 4},
+            'revenue_per_hour': {'distribution': 'fixed'}
+        }
+        distribution = simulator.simulate_loss_distribution(['Stripe'], samples=100, seed=1)
+        expected = simulator.simulate_vendor_failure('Stripe', 4)['financial_impact']['total_cost']
+
+        entry = distribution['results'][0]
+        assert entry['loss_percentiles']['p50'] == pytest.approx(expected)
+        assert entry['loss_percentiles']['p99'] == pytest.approx(expected)
+
+    def test_seeded_percentiles_are_reproducible_and_ordered(self, simulator):
+        """Test the same seed gives the same percentiles regardless of vendor list"""
+        first = simulator.simulate_loss_distribution(samples=5000, seed=7)
+        second = simulator.simulate_loss_distribution(['Auth0', 'Stripe'], samples=5000, seed=7)
+
+        by_vendor = {entry['vendor']: entry['loss_percentiles'] for entry in second['results']}
+        for entry in first['results']:
+            assert entry['loss_percentiles'] == by_vendor[entry['vendor']]
+            assert entry['loss_percentiles']['p50'] <= entry['loss_percentiles']['p90'] <= entry['loss_percentiles']['p99']
+
+    def test_unknown_distribution_rejected(self, simulator):
+        """Test invalid distribution names raise ValueError"""
+        simulator.config['simulation']['monte_carlo'] = {'duration': {'distribution': 'pareto'}}
+        with pytest.raises(ValueError):
+            simulator.simulate_loss_distribution(samples=10)
+
+
+class TestComplianceIndex:
+    """Test precomputed compliance impact index"""
+
+    def test_lookup_is_case_insensitive(self):
+        """Test every casing of a vendor resolves to the same precomputed impact"""
+        index = ComplianceIndex()
+
+        for name in ['MongoDB Atlas', 'mongodb atlas', ' MONGODB ATLAS ']:
+            impact = index.impact(name)
+            assert set(impact['affected_frameworks']) == {'soc2', 'nist', 'iso27001'}
+        assert index.impact('UnknownVendor')['impact_score'] == 0.0
+
+    def test_rebuilds_when_file_changes(self, tmp_path):
+        """Test the index picks up edits to compliance_controls.json"""
+        controls_file = tmp_path / 'compliance_controls.json'
+        data = {
+            'compliance_baseline': {'soc2_score': 0.9},
+            'control_mappings': {'Stripe': {'soc2_controls': ['CC6.6']}},
+            'impact_weights': {'soc2': {'CC6.6': 0.1}}
+        }
+        controls_file.write_text(json.dumps(data))
+        index = ComplianceIndex(str(controls_file))
+        assert index.impact('stripe')['affected_frameworks']['soc2']['score_change'] == pytest.approx(0.1)
+
+        data['control_mappings']['Stripe']['soc2_controls'].append('CC7.2')
+        controls_file.write_text(json.dumps(data))
+        os.utime(controls_file, ns=(0, 10 ** 9))
+
+        assert index.impact('stripe')['affected_frameworks']['soc2']['score_change'] == pytest.approx(0.15)
+
+
+class TestSimulationResultCache:
+    """Test versioned LRU+TTL result cache"""
+
+    def test_key_normalizes_vendor_and_includes_graph_version(self):
+        """Test keys ignore vendor casing but change with the graph version"""
+        assert make_cache_key('Stripe ', 4, 'v1') == make_cache_key('stripe', 4, 'v1')
+        assert make_cache_key('stripe', 4, 'v1') != make_cache_key('stripe', 4, 'v2')
+        assert make_cache_key(['Stripe', 'auth0'], 4, 'v1') != make_cache_key(['auth0', 'Stripe'], 4, 'v1')
+
+    def test_lru_eviction_and_counters(self):
+        """Test least recently used entries are evicted and counted"""
+        cache = SimulationResultCache(max_entries=2, ttl_seconds=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        assert cache.get('a') == 1  # 'b' is now least recently used
+        cache.put('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+        stats = cache.stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['evictions'] == 1
+
+    def test_expired_entries_are_misses(self):
+        """Test entries past their TTL are dropped"""
+        cache = SimulationResultCache(max_entries=2, ttl_seconds=0)
+        cache.put('a', 1)
+
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+
+
+class TestSQLiteResultStore:
+    """Test persistent simulation result store"""
+
+    def test_ids_are_unique_within_a_second(self):
+        """Test IDs for the same vendor do not collide"""
+        ids = {new_simulation_id('stripe') for _ in range(1000)}
+        assert len(ids) == 1000
+
+    def test_get_and_paginated_listing(self, tmp_path):
+        """Test results round-trip by ID and list newest first across pages"""
+        store = SQLiteResultStore(str(tmp_path / 'results.db'))
+        for i in range(5):
+            store.put(f'sim-{i}', 'stripe' if i % 2 else 'auth0', {'duration_hours': i, 'overall_impact_score': 0.1})
+
+        assert store.get('sim-3')['duration_hours'] == 3
+        assert store.get('missing') is None
+
+        first = store.list_results(limit=3)
+        second = store.list_results(limit=3, cursor=first['next_cursor'])
+        listed = [r['simulation_id'] for r in first['results'] + second['results']]
+        assert listed == ['sim-4', 'sim-3', 'sim-2', 'sim-1', 'sim-0']
+        assert second['next_cursor'] is None
+        assert [r['simulation_id'] for r in store.list_results(vendor='stripe')['results']] == ['sim-3', 'sim-1']
+
+
+class TestInMemoryGraphBackend:
+    """Test the in-process graph backend"""
+    
+    @pytest.fixture
+    def backend(self):
+        """Load the sample dependencies and compliance controls into memory"""
+        return InMemoryGraphBackend.from_files(
+            'data/sample/sample_dependencies.json',
+            'data/sample/compliance_controls.json'
+        )
+    
+    def test_simulation_without_neo4j(self, backend):
+        """Test a simulator backed by the in-memory graph answers like the snapshot"""
+        simulator = VendorFailureSimulator(backend=backend)
+        
+        direct = simulator._calculate_operational_impact('Stripe')
+        simulator.refresh_snapshot()
+        from_snapshot = simulator._calculate_operational_impact('Stripe')
+        
+        assert direct['service_count'] == from_snapshot['service_count'] == 2
+        assert direct['total_rpm'] == 1300
+        assert backend.counts()['Vendor_count'] == 5
+    
+    def test_compliance_scoring_uses_given_controls_file(self, backend, tmp_path):
+        """Test compliance scoring reads the compliance file passed in, not the sample one"""
+        controls = json.loads(Path('data/sample/compliance_controls.json').read_text())
+        controls['control_mappings'] = {'Stripe': controls['control_mappings']['Stripe']}
+        controls_file = tmp_path / 'controls.json'
+        controls_file.write_text(json.dumps(controls))
+        
+        simulator = VendorFailureSimulator(backend=backend, compliance_file=str(controls_file))
+        
+        assert simulator._calculate_compliance_impact('Stripe')['impact_score'] > 0
+        assert simulator._calculate_compliance_impact('Auth0')['affected_frameworks'] == {}
+    
+    def test_writes_merge_on_identity_keys_and_duplicates_merge(self, backend):
+        """Test re-writing the same vendor is a MERGE, and case duplicates merge into one node"""
+        version = backend.graph_version()
+        counts = backend.counts()
+        
+        backend.write_dependencies([{'name': 'STRIPE', 'services': [
+            {'service_id': 'svc_001', 'gcp_resource': 'projects/demo-project/locations/us-central1/functions/payment-api'}
+        ]}])
+        assert backend.counts() == counts
+        assert backend.graph_version() != version
+        
+        duplicate = backend.add_node('Vendor', {'name': 'Stripe', 'tier': 1})
+        backend.add_relationship(backend.add_node('Service', {'name': 'legacy-billing'}), 'DEPENDS_ON', duplicate)
+        
+        report = backend.merge_duplicates('vendor')
+        
+        assert report['merged'] == 1
+        assert backend.counts()['Vendor_count'] == 5
+        kept = backend.nodes[backend.find_node('Vendor', 'name', 'stripe')]
+        assert kept['tier'] == 1 and kept['display_name'] == 'Stripe'
+        assert len(backend.affected_services('stripe')) == 3
+    
+    def test_discovery_sync_overwrites_fingerprinted_properties(self):
+        """Test discovery writes replace changed service values, other loads only fill gaps"""
+        backend = InMemoryGraphBackend()
+        gcp_resource = 'projects/p/locations/us-central1/functions/pay'
+        vendor = {'name': 'Stripe', 'services': [
+            {'service_id': 'svc_001', 'name': 'pay', 'type': 'cloud_function', 'gcp_resource': gcp_resource,
+             'rpm': 100, 'customers_affected': 10, 'business_processes': []}
+        ]}
+        backend.write_dependencies([vendor], project_id='p')
+        
+        vendor['services'][0]['rpm'] = 250
+        backend.write_dependencies([vendor], project_id='p')
+        service = backend.nodes[backend.find_node('Service', 'gcp_resource', gcp_resource)]
+        assert service['rpm'] == 250
+        
+        vendor['services'][0]['rpm'] = 999
+        backend.write_dependencies([vendor])
+        assert service['rpm'] == 250
+
+
+class TestSyntheticGraph:
+    """Test the synthetic dependency graph generator"""
+    
+    def generate(self, seed=7):
+        """Generate a small graph with duplicates"""
+        return generate_synthetic_graph(
+            vendors=40, services=500, business_processes=30, seed=seed,
+            vendor_duplicate_rate=0.2, service_duplicate_rate=0.1,
+            business_metrics=business_metrics_from_config({'revenue_per_hour': 100000})
+        )
+    
+    def test_seeded_output_is_deterministic(self):
+        """Test the same seed gives identical output and another seed does not"""
+        assert json.dumps(self.generate()) == json.dumps(self.generate())
+        assert json.dumps(self.generate()) != json.dumps(self.generate(seed=8))
+    
+    def test_load_format_and_discovery_describe_the_same_graph(self):
+        """Test both outputs load to the same services and edges, with duplicates collapsed"""
+        graph = self.generate()
+        vendors = graph['dependencies']['vendors']
+        
+        plan = build_write_plan(vendors)
+        discovered = build_write_plan(convert_to_neo4j_format(graph['discovery'], 'synthetic-project')['vendors'])
+        
+        assert len(vendors) > 40
+        assert len(plan['vendors']) == 40 and len(plan['services']) == 500
+        assert {(r['gcp_resource'], tuple(r['vendors'])) for r in plan['services']} == \
+            {(r['gcp_resource'], tuple(r['vendors'])) for r in discovered['services']}
+        assert set(graph['compliance']['control_mappings']) <= {v['name'] for v in vendors}
+    
+    def test_dependencies_conform_to_schema(self):
+        """Test the load-format output validates against vendor_schema.json"""
+        pytest.importorskip('jsonschema')
+        assert validate_dependencies(self.generate()['dependencies']) == []
+
+
+class TestBigQueryRowBatcher:
+    """Test group-commit writes of the BigQuery loader function"""
+    
+    @pytest.fixture
+    def loader(self):
+        """bigquery_loader function module"""
+        return load_function_module('bigquery_loader')
+    
+    def rows(self, loader, count):
+        """Simulation rows with their insertIds"""
+        rows = [loader.simulation_row({'simulation_id': f'sim-{i}', 'vendor': 'Stripe', 'duration_hours': i,
+                                       'timestamp': '2025-01-01T00:00:00Z'}) for i in range(count)]
+        return [(row, loader.row_insert_id(row)) for row in rows]
+    
+    def test_full_batch_is_written_once_without_waiting(self, loader):
+        """Test concurrent rows join one insert that is written as soon as max_rows is reached"""
+        client = Mock()
+        client.insert_rows_json.return_value = []
+        batcher = loader.RowBatcher(client, 'p.vendor_risk.simulations', max_rows=3, max_age_seconds=30)
+        rows = self.rows(loader, 3)
+        
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            for future in [pool.submit(batcher.submit, row, row_id) for row, row_id in rows]:
+                future.result(timeout=10)
+        
+        assert time.monotonic() - started < 5
+        client.insert_rows_json.assert_called_once()
+        call = client.insert_rows_json.call_args
+        assert sorted(call.kwargs['row_ids']) == sorted(row_id for _, row_id in rows)
+        assert len(call.args[1]) == 3
+    
+    def test_partial_batch_is_written_after_max_age(self, loader):
+        """Test a lone row is written once it has waited max_age_seconds"""
+        client = Mock()
+        client.insert_rows_json.return_value = []
+        batcher = loader.RowBatcher(client, 'p.vendor_risk.simulations', max_rows=100, max_age_seconds=0.05)
+        (row, row_id), = self.rows(loader, 1)
+        
+        started = time.monotonic()
+        batcher.submit(row, row_id)
+        
+        assert time.monotonic() - started >= 0.05
+        assert client.insert_rows_json.call_args.kwargs['row_ids'] == [row_id]
+    
+    def test_failed_batch_raises_and_retry_reuses_insert_ids(self, loader):
+        """Test insert errors fail every waiter (so Pub/Sub redelivers) and the retry sends the same insertIds"""
+        client = Mock()
+        client.insert_rows_json.side_effect = [[{'index': 0, 'errors': ['backendError']}], []]
+        batcher = loader.RowBatcher(client, 'p.vendor_risk.simulations', max_rows=1)
+        (row, row_id), = self.rows(loader, 1)
+        
+        with pytest.raises(Exception, match='BigQuery insert errors'):
+            batcher.submit(row, row_id)
+        
+        # Redelivery rebuilds the row from the same message
+        redelivered = loader.simulation_row({'simulation_id': 'sim-0', 'vendor': 'Stripe', 'duration_hours': 0,
+                                             'timestamp': '2025-01-01T00:00:00Z'})
+        batcher.submit(redelivered, loader.row_insert_id(redelivered))
+        
+        first, second = client.insert_rows_json.call_args_list
+        assert first.kwargs['row_ids'] == second.kwargs['row_ids'] == [row_id]
+
+
+class TestSimulationServiceBatch:
+    """Test POST /simulate/batch NDJSON streaming"""
+    
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        """Flask test client of the simulation service (Pub/Sub disabled)"""
+        monkeypatch.delenv('GCP_PROJECT_ID', raising=False)
+        self.service = load_simulation_service(tmp_path)
+        return self.service.app.test_client()
+    
+    def test_summary_stream_framing_and_per_cell_errors(self, client):
+        """Test the stream is a batch header, one line per cell (errors inline) and a closing summary"""
+        response = client.post('/simulate/batch', json={
+            'vendors': ['Stripe', 'Unknown Vendor'], 'durations': [1, 4, 4], 'publish': False
+        })
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = read_ndjson(response)
+        assert [line['type'] for line in lines] == ['batch', 'result', 'result', 'error', 'error', 'summary']
+        assert lines[0]['durations'] == [1, 4] and lines[0]['detail'] == 'summary'
+        assert lines[3]['vendor'] == 'Unknown Vendor' and lines[3]['duration_hours'] == 1
+        assert {k: lines[-1][k] for k in ('results', 'errors', 'stored')} == {'results': 2, 'errors': 2, 'stored': 0}
+        assert lines[-1]['batch_id'] == lines[0]['batch_id']
+    
+    def test_full_detail_matches_summary_scores(self, client):
+        """Test full-detail cells are complete simulation results scoring the same as the vectorized summary"""
+        request = {'vendors': ['Stripe', 'Auth0'], 'durations': [4], 'publish': False}
+        summary = read_ndjson(client.post('/simulate/batch', json=request))[1:-1]
+        full = read_ndjson(client.post('/simulate/batch', json={**request, 'detail': 'full'}))[1:-1]
+        
+        assert [line['result']['vendor'] for line in full] == ['Stripe', 'Auth0']
+        assert 'recommendations' in full[0]['result'] and 'recommendations' not in summary[0]['result']
+        for brief, complete in zip(summary, full):
+            assert brief['result']['overall_impact_score'] == pytest.approx(complete['result']['overall_impact_score'])
+    
+    def test_failing_full_cell_does_not_stop_the_stream(self, client):
+        """Test an exception in one full-detail cell becomes an error line and later cells still run"""
+        simulate = self.service.simulator.simulate_vendor_failure
+        
+        def flaky(vendor, duration):
+            if vendor == 'Auth0':
+                raise RuntimeError('graph unavailable')
+            return simulate(vendor, duration)
+        
+        with patch.object(self.service.simulator, 'simulate_vendor_failure', side_effect=flaky):
+            lines = read_ndjson(client.post('/simulate/batch', json={
+                'vendors': ['Auth0', 'Stripe'], 'durations': [4], 'detail': 'full', 'publish': False
+            }))
+        
+        assert lines[1] == {'type': 'error', 'vendor': 'Auth0', 'duration_hours': 4, 'error': 'graph unavailable'}
+        assert lines[2]['result']['vendor'] == 'Stripe'
+        assert lines[-1]['errors'] == 1
+    
+    def test_request_validation_and_cell_limit(self, client):
+        """Test malformed requests and grids over MAX_BATCH_CELLS are rejected before streaming"""
+        assert client.post('/simulate/batch', data='x').status_code == 400
+        assert client.post('/simulate/batch', json={'vendors': 'Stripe'}).status_code == 400
+        assert client.post('/simulate/batch', json={'durations': [4, -1]}).status_code == 400
+        assert client.post('/simulate/batch', json={'durations': [True]}).status_code == 400
+        assert client.post('/simulate/batch', json={'detail': 'verbose'}).status_code == 400
+        
+        self.service.MAX_BATCH_CELLS = 9
+        response = client.post('/simulate/batch', json={'vendors': 'all', 'durations': [1, 4]})
+        assert response.status_code == 400
+        assert '9 vendor x duration cells' in response.get_json()['error']
+        assert client.post('/simulate/batch', json={'vendors': ['Stripe'], 'durations': [1, 4], 'publish': False}).status_code == 200
+    
+    def test_summary_batch_leaves_live_graph_mode_alone(self, client):
+        """Test a summary batch reads its own snapshot instead of switching /simulate to a stale one"""
+        self.service.result_cache = None
+        lines = read_ndjson(client.post('/simulate/batch', json={'vendors': 'all', 'durations': [4], 'publish': False}))
+        
+        assert lines[-1]['results'] == 5 and lines[-1]['errors'] == 0
+        assert self.service.simulator.snapshot is None
+    
+    def test_loaded_snapshot_follows_graph_version_without_cache(self, client):
+        """Test /simulate reloads a loaded snapshot on a version change even with the result cache off"""
+        self.service.result_cache = None
+        self.service.simulator.refresh_snapshot()
+        self.service.snapshot_version = 'v1'
+        self.service.graph_version.current.return_value = 'v2'
+        
+        with patch.object(self.service.simulator, 'refresh_snapshot') as refresh:
+            response = client.post('/simulate', json={'vendor': 'Stripe', 'duration': 4})
+        
+        assert response.status_code == 200
+        refresh.assert_called_once()
+        assert self.service.snapshot_version == 'v2'
+
+
+class TestSimulationServiceResults:
+    """Test POST /simulate results round-tripping through GET /simulate/<id>"""
+    
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        """Flask test client of the simulation service (Pub/Sub disabled)"""
+        monkeypatch.delenv('GCP_PROJECT_ID', raising=False)
+        self.service = load_simulation_service(tmp_path)
+        return self.service.app.test_client()
+    
+    def test_multi_word_vendor_ids_round_trip(self, client):
+        """Test IDs issued for 'MongoDB Atlas' (single and batch runs) are accepted by GET /simulate/<id>"""
+        response = client.post('/simulate', json={'vendor': 'MongoDB Atlas', 'duration': 4})
+        simulation_id = response.get_json()['simulation_id']
+        assert simulation_id.startswith('mongodb_atlas-')
+        assert client.get(response.headers['Location']).get_json()['vendor'] == 'MongoDB Atlas'
+        
+        lines = read_ndjson(client.post('/simulate/batch', json={
+            'vendors': ['MongoDB Atlas'], 'durations': [4], 'store': True, 'publish': False
+        }))
+        batch_id = lines[1]['result']['simulation_id']
+        assert batch_id.endswith('-mongodb_atlas-4h')
+        assert client.get(f'/simulate/{batch_id}').status_code == 200
+        
+        assert new_simulation_id('a/b c').startswith('a_b_c-')
+    
+    def test_cache_hit_on_batch_result_is_stored_before_linking(self, client):
+        """Test a /simulate cache hit on a result cached by a full-detail batch gets stored under its own ID"""
+        read_ndjson(client.post('/simulate/batch', json={
+            'vendors': ['Stripe'], 'durations': [4], 'detail': 'full', 'publish': False
+        }))
+        
+        response = client.post('/simulate', json={'vendor': 'Stripe', 'duration': 4, 'inline': False})
+        
+        assert response.status_code == 200
+        assert response.headers['X-Cache'] == 'HIT'
+        body = response.get_json()
+        assert set(body) == {'simulation_id', 'vendor', 'duration_hours', 'overall_impact_score'}
+        assert response.headers['Location'] == f"/simulate/{body['simulation_id']}"
+        assert client.get(response.headers['Location']).get_json()['vendor'] == 'Stripe'
+        
+        # The stored ID is cached with the result and reused by the next hit
+        again = client.post('/simulate', json={'vendor': 'Stripe', 'duration': 4})
+        assert again.get_json()['simulation_id'] == body['simulation_id']
+    
+    def test_cache_hit_without_store_is_returned_inline(self, client):
+        """Test a cache hit that cannot be stored returns the full result and no Location"""
+        self.service.result_store = None
+        client.post('/simulate', json={'vendor': 'Stripe', 'duration': 4})
+        
+        response = client.post('/simulate', json={'vendor': 'Stripe', 'duration': 4, 'inline': False})
+        
+        assert response.headers['X-Cache'] == 'HIT'
+        assert 'Location' not in response.headers
+        assert 'operational_impact' in response.get_json()
+
+
+class TestBatchingPublisher:
+    """Test the shared Pub/Sub publisher with a mocked PublisherClient"""
+    
+    @pytest.fixture
+    def publisher(self):
+        """Publisher built from the simulation.publisher config section"""
+        with patch('scripts.gcp.pubsub_publisher.pubsub_v1.PublisherClient') as client_class:
+            client_class.return_value.topic_path.return_value = 'projects/p/topics/simulation-results'
+            publisher = BatchingPublisher.from_config('p', 'simulation-results', {
+                'batch_max_messages': 50, 'batch_max_latency_seconds': 0.01, 'max_backlog_messages': 2
+            })
+        self.client_class = client_class
+        return publisher
+    
+    def test_batching_and_flow_control_settings(self, publisher):
+        """Test config values reach the client's batch settings and a dropping (ERROR) flow control"""
+        options = self.client_class.call_args.kwargs
+        assert options['batch_settings'].max_messages == 50
+        assert options['batch_settings'].max_latency == 0.01
+        flow_control = options['publisher_options'].flow_control
+        assert flow_control.message_limit == 2
+        assert flow_control.limit_exceeded_behavior.name == 'ERROR'
+    
+    def test_publish_returns_immediately_and_counts_outcomes(self, publisher):
+        """Test publish() queues without waiting, and completion callbacks update the counters"""
+        sent, lost = Future(), Future()
+        publisher.client.publish.side_effect = [sent, lost]
+        
+        assert publisher.publish({'simulation_id': 'a'}) is True
+        assert publisher.publish({'simulation_id': 'b'}) is True
+        assert publisher.stats()['pending'] == 2
+        assert json.loads(publisher.client.publish.call_args_list[0].args[1]) == {'simulation_id': 'a'}
+        
+        sent.set_result('message-1')
+        lost.set_exception(RuntimeError('deadline exceeded'))
+        stats = publisher.stats()
+        assert (stats['pending'], stats['published'], stats['failed']) == (0, 1, 1)
+    
+    def test_full_backlog_drops_instead_of_blocking(self, publisher):
+        """Test a flow-control rejection is counted as dropped and not tracked as pending"""
+        rejected = Future()
+        rejected.set_exception(FlowControlLimitError('too many messages'))
+        publisher.client.publish.return_value = rejected
+        
+        assert publisher.publish({'simulation_id': 'a'}) is False
+        assert publisher.stats()['dropped'] == 1
+        assert publisher.stats()['pending'] == 0
+    
+    def test_close_sends_open_batches_and_waits(self, publisher):
+        """Test close() commits open batches, waits for them and then refuses new messages"""
+        future = Future()
+        publisher.client.publish.return_value = future
+        publisher.client.stop.side_effect = lambda: future.set_result('message-1')
+        publisher.publish({'simulation_id': 'a'})
+        
+        assert publisher.flush(timeout=0) == 1
+        publisher.close(timeout=1)
+        
+        publisher.client.stop.assert_called_once()
+        assert publisher.stats()['published'] == 1
+        assert publisher.publish({'simulation_id': 'b'}) is False
+        assert publisher.client.publish.call_count == 1
+
+
 class TestImpactScoreCalculation:
     """Test impact score calculation logic"""
     